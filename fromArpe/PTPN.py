@@ -8,13 +8,21 @@
 
 #Simona Bernardi: 12/7/2024 Added export_pnml method to have a reference schema for the PTPN
 
+import bisect
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timedelta
+import heapq
+import itertools
 import math
 import random
 
 import dijkstar
 import graphviz
 
+import numpy
+from scipy import stats
+
 import string  #to generate random IDs
 from collections.abc import Mapping
 
@@ -33,7 +41,14 @@ class ProbabilisticTimePetriNet:
         self.places = []  # dict or sommeting to get places by name ?
         self.initial_time = initial_time
         self.time = initial_time
+        self.start_time = initial_time  # time of the last reset
         self.unit_time_increment = unit_time_increment
+        self.histogram_bins = None  # bin edges of the histograms of the waiting times (None: no histogram)
+        self.firable = IndexedSet()  # firable transitions at the current time (maintained since the last reset)
+        self.schedule = []  # heap of (fire time, counter, transition) of the enabled timed transitions
+        self.schedule_counter = itertools.count()
+        self.transition_index = {}  # position of each transition (order of the choice in play)
+        self.event_order = False  # order of the choice of play_events (see choice_order)
         # TODO initial marking is a distibution
 
     def __repr__(self):
@@ -127,27 +142,337 @@ class ProbabilisticTimePetriNet:
 
     def firable_transitions(self):
         """
-        Select the firable transition
-        return: filter of Transition
+        Select the firable transition (maintained incrementally since the last reset)
+        return: list of Transition
+        """
+        return list(self.firable)
+
+    def update_firable(self, transitions):
+        """
+        Update the firable set after a change of the enabling of transitions: the enabled immediate
+        transitions and the enabled timed ones at their fire time are firable, the other enabled
+        timed ones are scheduled
+        transitions: iterable of Transition
+        """
+        for transition in transitions:
+            if not transition.is_enabled():
+                self.firable.discard(transition)
+                continue
+            if transition.fire_time is not None:
+                transition.schedule_id = next(self.schedule_counter)
+            if transition.fire_time is None or transition.fire_time <= self.time:  # immediate or due
+                self.firable.add(transition)
+            else:
+                self.firable.discard(transition)
+                heapq.heappush(self.schedule, (transition.fire_time, transition.schedule_id, transition))
+
+    def next_fire_time(self):
+        """
+        Return the next fire time of the scheduled transitions (None if none)
+        The entries of the transitions disabled or rescheduled since are dropped
         """
-        return filter(lambda transition: transition.is_firable(self.time), self.transitions)
+        while self.schedule and self.schedule[0][2].fire_time != self.schedule[0][0]:
+            heapq.heappop(self.schedule)
+        return self.schedule[0][0] if self.schedule else None
+
+    def advance_time(self, time):
+        """
+        Set the time and make firable the scheduled transitions with a fire time until time
+        time: integer
+        """
+        self.time = time
+        next_time = self.next_fire_time()
+        while next_time is not None and next_time <= time:
+            self.firable.add(heapq.heappop(self.schedule)[2])
+            next_time = self.next_fire_time()
 
     def fire_transition(self, transition):
         """
         Fire a given transition
+        The transitions whose enabling changed and the fired transition (if still enabled, it fires
+        again at the same fire time) are updated in the firable set
         transition: Transition
         """
-        transition.fire(self.time)
+        self.update_firable(dict.fromkeys(transition.fire(self.time) + [transition]))
+
+    def choice_order(self, transition):
+        """
+        Order of the firable transitions for the random choice, so that seeded plays repeat the same
+        traces: the position of the transitions in play, the immediate transitions (by position)
+        then the timed ones by fire time and scheduling order in play_events
+        transition: Transition
+        return: tuple
+        """
+        if not self.event_order:
+            return (self.transition_index[transition],)
+        if transition.fire_time is None:
+            return (0, self.transition_index[transition], 0)
+        return (1, transition.fire_time, transition.schedule_id)
 
     def fire(self):
         """
         Fire a random transition in the firable transitions
         return: Transition, the fired transition
         """
-        transition = random.choice(list(self.firable_transitions()))
-        transition.fire(self.time)
+        transition = self.firable.choice(self.choice_order)
+        self.fire_transition(transition)
         return transition
 
+    def compile_arrays(self):
+        """
+        Compile the PTPN into arrays for the batch simulation (places and transitions are indexed
+        by their position in self.places and self.transitions)
+        return: dict with
+            "pre": (T, P) array of the input weights
+            "in_idx", "in_weight": (T, K) arrays of the input places and weights of each transition
+                (padded with weight 0)
+            "m0": (P,) array of the initial marking
+            "immediate": (T,) boolean array of the transitions without time function
+            "distributions": list of (transition index, cumulative probabilities, (outcomes, P) array
+                of the output weights)
+        """
+        place_index = {place: i for i, place in enumerate(self.places)}
+        nb_places = len(self.places)
+        nb_transitions = len(self.transitions)
+        pre = numpy.zeros((nb_transitions, nb_places), dtype=numpy.int64)
+        degree = max([len(transition.pre) for transition in self.transitions] + [1])
+        in_idx = numpy.zeros((nb_transitions, degree), dtype=numpy.int64)
+        in_weight = numpy.zeros((nb_transitions, degree), dtype=numpy.int64)
+        distributions = []
+        for t, transition in enumerate(self.transitions):
+            for k, place in enumerate(transition.pre):
+                pre[t, place_index[place]] = transition.pre[place]
+                in_idx[t, k] = place_index[place]
+                in_weight[t, k] = transition.pre[place]
+            for distribution in transition.post:
+                outcomes = numpy.zeros((len(distribution.outcomes), nb_places), dtype=numpy.int64)
+                for i, outcome in enumerate(distribution.outcomes):
+                    for place in outcome:
+                        if place in place_index:
+                            outcomes[i, place_index[place]] += outcome[place]
+                distributions.append((t, numpy.cumsum(distribution.probabilities), outcomes))
+        return {
+            "pre": pre,
+            "in_idx": in_idx,
+            "in_weight": in_weight,
+            "m0": numpy.array([place.initial_marking for place in self.places], dtype=numpy.int64),
+            "immediate": numpy.array([transition.time_function_type is None for transition in self.transitions]),
+            "distributions": distributions
+        }
+
+    def sample_replications(self, replications, max_time, final_marking=None, rng=None):
+        """
+        Play independent replications of the PTPN in lockstep with NumPy (same semantics as
+        play_events): the markings are a (replications, P) array, the firing times and the enabled
+        masks (replications, T) arrays, and at each step every running replication fires its next
+        transition (chosen at random among the ones with the earliest firing time). The durations
+        are sampled in batches for each time function.
+        A replication ends at max_time, when no transition is enabled or when final_marking is reached.
+        replications: integer
+        max_time: number (or timedelta)
+        final_marking: dict of place with a minimal marking to reach (default None)
+        rng: numpy.random.Generator (default a new unseeded one)
+        return: dict of arrays with a row per replication: "fire_sum" and "throughput" (T columns),
+            "waiting_time" (average sampled duration by fire, NaN if none, T columns) and
+            "queue_length" (time-weighted average marking, P columns)
+        """
+        if rng is None:
+            rng = numpy.random.default_rng()
+        if type(max_time) is timedelta:
+            max_time = max_time.total_seconds()
+        arrays = self.compile_arrays()
+        in_idx = arrays["in_idx"]
+        in_weight = arrays["in_weight"]
+        pre = arrays["pre"]
+        immediate = arrays["immediate"]
+        nb_transitions = len(self.transitions)
+        final = [(self.places.index(place), weight) for place, weight in (final_marking or {}).items()]
+        marking = numpy.tile(arrays["m0"], (replications, 1))
+        fire_time = numpy.full((replications, nb_transitions), numpy.inf)
+        now = numpy.zeros(replications)
+        elapsed = numpy.full(replications, float(max_time))
+        fire_sum = numpy.zeros((replications, nb_transitions), dtype=numpy.int64)
+        duration_sum = numpy.zeros((replications, nb_transitions))
+        duration_count = numpy.zeros((replications, nb_transitions), dtype=numpy.int64)
+        mark_integral = numpy.zeros(marking.shape)
+        active = numpy.arange(replications)
+        while active.size:
+            mark = marking[active]
+            clock = fire_time[active]
+            # End condition: final marking reached
+            if final:
+                reached = numpy.all([mark[:, p] >= weight for p, weight in final], axis=0)
+                elapsed[active[reached]] = now[active[reached]]
+                active, mark, clock = active[~reached], mark[~reached], clock[~reached]
+            # Enabling: disabled transitions lose their firing time, newly enabled ones sample it
+            enabled = numpy.all(mark[:, in_idx] >= in_weight, axis=2)
+            clock[~enabled] = numpy.inf
+            clock[:, immediate] = numpy.where(enabled[:, immediate], now[active, None], numpy.inf)
+            new = enabled & numpy.isinf(clock)
+            for t in numpy.nonzero(new.any(axis=0))[0]:
+                rows = numpy.nonzero(new[:, t])[0]
+                durations = self.transitions[t].sample_fire_durations(rows.size, rng)
+                clock[rows, t] = now[active[rows]] + durations
+                duration_sum[active[rows], t] += durations
+                duration_count[active[rows], t] += 1
+            fire_time[active] = clock
+            # Next firing of each replication (end of the replication if after max_time)
+            next_time = clock.min(axis=1)
+            running = next_time <= max_time
+            mark_integral[active[~running]] += mark[~running] * (max_time - now[active[~running]])[:, None]
+            active, mark, clock, next_time = active[running], mark[running], clock[running], next_time[running]
+            if not active.size:
+                break
+            key = numpy.where(clock <= next_time[:, None], rng.random(clock.shape), -1.0)
+            fired = key.argmax(axis=1)
+            mark_integral[active] += mark * (next_time - now[active])[:, None]
+            now[active] = next_time
+            fire_sum[active, fired] += 1
+            marking[active] -= pre[fired]
+            # The transitions disabled by the removal of the tokens lose their firing time (sampled
+            # again if the outcome enables them, as in play_events)
+            clock[~numpy.all(marking[active][:, in_idx] >= in_weight, axis=2)] = numpy.inf
+            fire_time[active] = clock
+            for t, cumulative, outcomes in arrays["distributions"]:
+                rows = active[fired == t]
+                if rows.size:
+                    choice = numpy.searchsorted(cumulative, rng.random(rows.size), side="right")
+                    marking[rows] += outcomes[numpy.minimum(choice, len(outcomes) - 1)]
+        horizon = numpy.where(elapsed > 0, elapsed, numpy.inf)[:, None]
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            waiting_time = duration_sum / duration_count
+        return {
+            "fire_sum": fire_sum,
+            "throughput": fire_sum / horizon,
+            "waiting_time": waiting_time,
+            "queue_length": mark_integral / horizon
+        }
+
+    def play_batch(self, replications, max_time, final_marking=None, seed=None, rng=None):
+        """
+        Play independent replications of the PTPN in lockstep (see sample_replications)
+        replications: integer
+        max_time: number (or timedelta)
+        final_marking: dict of place with a minimal marking to reach (default None)
+        seed: seed of the random generator (used if rng is None)
+        rng: numpy.random.Generator
+        return: dict of transition with dict: "throughput" (mean of the replications), "std"
+            (standard deviation), "samples" (throughput of each replication), "fire_sum" (firings
+            of each replication)
+        """
+        if rng is None:
+            rng = numpy.random.default_rng(seed)
+        samples = self.sample_replications(replications, max_time, final_marking, rng)
+        throughput = samples["throughput"]
+        std = throughput.std(axis=0, ddof=1) if replications > 1 else numpy.zeros(len(self.transitions))
+        return {transition: {
+            "throughput": throughput[:, t].mean(),
+            "std": std[t],
+            "samples": throughput[:, t],
+            "fire_sum": samples["fire_sum"][:, t]
+        } for t, transition in enumerate(self.transitions)}
+
+    def play_replications(self, max_time, final_marking=None, replications=100, batch_size=10, jobs=None,
+                          seed=None, confidence=0.95, precision=None):
+        """
+        Play independent replications of the PTPN on a process pool, by batches of batch_size
+        replications (sample_replications). Each batch draws from its own numpy.random.Generator,
+        spawned from numpy.random.SeedSequence(seed) with the batch number: the results only depend
+        on seed and batch_size (not on jobs), and are repeatable bit for bit if seed is set (the
+        "function" time functions are excluded, they draw from the random module).
+        The net is pickled to the worker processes: a net with "function" time functions (e.g.,
+        lambdas, which cannot be pickled) is played in the process.
+        The batches are aggregated in order; with precision, the replications stop at the first
+        batch for which the confidence intervals of all the (non-zero) estimates have a half width
+        smaller than precision times the estimate.
+        max_time: number (or timedelta)
+        final_marking: dict of place with a minimal marking to reach (default None)
+        replications: integer, maximal number of replications
+        batch_size: integer
+        jobs: integer, number of worker processes (default os.cpu_count(), 1 to play in the process)
+        seed: integer (default None, not repeatable)
+        confidence: float, level of the confidence intervals
+        precision: float, relative half width of the confidence intervals (default None, all the replications)
+        return: dict with "replications" (number played), "transitions" (dict of transition with
+            "throughput" and "waiting_time") and "places" (dict of place with "queue_length"): each
+            estimate is a tuple (mean, lower bound, upper bound)
+        """
+        if replications < 1 or batch_size < 1:
+            raise Exception("replications and batch_size must be at least 1: {0}, {1}".format(replications, batch_size))
+        if any(transition.time_function_type == "function" for transition in self.transitions):
+            jobs = 1
+        sizes = [min(batch_size, replications - start) for start in range(0, replications, batch_size)]
+        seeds = numpy.random.SeedSequence(seed).spawn(len(sizes))
+        final = [(self.places.index(place), weight) for place, weight in (final_marking or {}).items()]
+        samples = {key: [] for key in ["throughput", "waiting_time", "queue_length"]}
+        if jobs == 1:
+            executor = None
+            batches = map(_sample_replications, itertools.repeat(self), sizes, itertools.repeat(max_time),
+                          itertools.repeat(final), seeds)
+        else:
+            executor = ProcessPoolExecutor(jobs)
+            batches = executor.map(_sample_replications, itertools.repeat(self), sizes, itertools.repeat(max_time),
+                                   itertools.repeat(final), seeds)
+        try:
+            for batch in batches:
+                for key in samples:
+                    samples[key].append(batch[key])
+                estimates = {key: self.confidence_intervals(numpy.concatenate(samples[key]), confidence)
+                             for key in samples}
+                if precision is not None and self.precision_reached(estimates, precision):
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        return {
+            "replications": len(numpy.concatenate(samples["throughput"])),
+            "transitions": {transition: {
+                "throughput": estimates["throughput"][t],
+                "waiting_time": estimates["waiting_time"][t]
+            } for t, transition in enumerate(self.transitions)},
+            "places": {place: {
+                "queue_length": estimates["queue_length"][p]
+            } for p, place in enumerate(self.places)}
+        }
+
+    @staticmethod
+    def confidence_intervals(samples, confidence=0.95):
+        """
+        Student confidence intervals of the mean of each column (the NaN are ignored)
+        samples: 2D array with a row per replication
+        confidence: float
+        return: list of tuple (mean, lower bound, upper bound), the bounds are NaN with less than 2 values
+        """
+        intervals = []
+        for column in samples.T:
+            values = column[~numpy.isnan(column)]
+            if values.size == 0:
+                intervals.append((math.nan, math.nan, math.nan))
+                continue
+            mean = float(values.mean())
+            if values.size < 2:
+                intervals.append((mean, math.nan, math.nan))
+                continue
+            half_width = float(stats.t.ppf((1 + confidence) / 2, values.size - 1) * values.std(ddof=1) / math.sqrt(values.size))
+            intervals.append((mean, mean - half_width, mean + half_width))
+        return intervals
+
+    @staticmethod
+    def precision_reached(estimates, precision):
+        """
+        Check the relative half width of the confidence intervals
+        estimates: dict of list of tuple (mean, lower bound, upper bound)
+        precision: float
+        return: boolean, True if all the non-zero estimates have a relative half width below precision
+        """
+        for intervals in estimates.values():
+            for mean, low, high in intervals:
+                if math.isnan(mean) or mean == 0:
+                    continue
+                if math.isnan(low) or (high - low) / 2 > precision * abs(mean):
+                    return False
+        return True
+
     def find_most_probable_pathway(self, start, end, return_only_transitions=True):
         """
         Find the most probable pathway attribut of the PTPN between start and end
@@ -371,23 +696,47 @@ class ProbabilisticTimePetriNet:
             if place.marking > 0 or show_null:
                 print('Place ', place, ': ', place.marking, 'token')
 
-    def reset(self):
+    def reset(self, time=None):
         """
         Reset the PTPN
+        time: initial time of the play (default initial_time)
         """
+        if time is None:
+            time = self.initial_time
+        zero = time - time  # 0 or timedelta(0)
         for place in self.places:
             place.marking = place.initial_marking
             place.analysis = {
                 "arrival_sum": 0,
                 "departure_sum": 0,
-                "presence_time": [],
-                "presence_time_start": [self.initial_time]*place.initial_marking,
-                "number_mark": []
+                "presence_time": OnlineStatistic(self.histogram_bins),
+                "presence_time_start": deque([time]*place.initial_marking),  # FIFO of the arrival times
+                "number_mark": OnlineStatistic(),  # marking at each time increment
+                "mark_integral": zero,  # integral of the marking over time
+                "mark_since": time
             }
-        self.time = self.initial_time
+        self.time = time
+        self.start_time = time
         for transition in self.transitions:
+            transition.fire_time = None
+            transition.enabled_since = None
+            transition.count_missing()
             transition.check_enable(self.time)
-            transition.analysis = {"fire_sum": 0, "waiting_time": [], "enabled_time": 0}
+            transition.analysis = {"fire_sum": 0, "waiting_time": OnlineStatistic(self.histogram_bins), "enabled_time": zero}
+        self.firable = IndexedSet()
+        self.schedule = []
+        self.transition_index = {transition: i for i, transition in enumerate(self.transitions)}
+        self.event_order = False
+        self.update_firable(self.transitions)
+
+    def update_analysis(self):
+        """
+        Accumulate the time-weighted statistics (queue lengths, enabled times) up to the current time
+        """
+        for place in self.places:
+            place.update_mark_integral(self.time)
+        for transition in self.transitions:
+            transition.update_enabled_time(self.time)
 
     def increment_time(self, increment=None):  # TODO incremente to next change
         """
@@ -397,11 +746,9 @@ class ProbabilisticTimePetriNet:
         """
         if not increment:
             increment = self.unit_time_increment
-        self.time += increment
+        self.advance_time(self.time + increment)
         for place in self.places:
-            place.analysis["number_mark"].append(place.marking)
-        for transition in self.enabled_transitions():
-            transition.analysis["enabled_time"] += increment
+            place.analysis["number_mark"].add(place.marking)
 
     def is_minimal_marking(self, minimal_marking):
         """
@@ -417,17 +764,12 @@ class ProbabilisticTimePetriNet:
     def display_analysis(self):
         """
         Display the analysis of the PTPN since the last reset
+        (with the quantiles of the waiting times if histogram_bins is set)
         """
-        def avg(numbers):
-            """
-            Calculate the average of a list
-            Return None for an empty list
-            numbers: list of numbers
-            """
-            if not numbers:
-                return None
-            else:
-                return sum(numbers)/len(numbers)
+        def quantiles(statistic):
+            return [statistic.quantile(q) for q in (0.5, 0.95)]
+
+        elapsed = self.time - self.start_time
 
         print("Global analysis:")
         print("Total time:", self.time)
@@ -437,14 +779,18 @@ class ProbabilisticTimePetriNet:
             print(place)
             print("\tArrival sum:", place.analysis["arrival_sum"])
             print("\tThroughput sum:", place.analysis["departure_sum"])
-            print("\tWaiting time average (by token):", avg(place.analysis["presence_time"]))
-            print("\tQueue length average (by time unit):", avg(place.analysis["number_mark"]))
+            print("\tWaiting time average (by token):", place.analysis["presence_time"].get_mean())
+            if self.histogram_bins is not None:
+                print("\tWaiting time quantiles 50%/95% (by token):", *quantiles(place.analysis["presence_time"]))
+            print("\tQueue length average (by time unit):", place.analysis["mark_integral"]/elapsed if elapsed else place.analysis["number_mark"].get_mean())
         print("-"*20)
         print("Transitions analysis:")
         for transition in self.transitions:
             print(transition)
             print("\tService sum:", transition.analysis["fire_sum"])
-            print("\tWaiting time average (by fire):", avg(transition.analysis["waiting_time"]))
+            print("\tWaiting time average (by fire):", transition.analysis["waiting_time"].get_mean())
+            if self.histogram_bins is not None:
+                print("\tWaiting time quantiles 50%/95% (by fire):", *quantiles(transition.analysis["waiting_time"]))
             print("\tEnabled time:", transition.analysis["enabled_time"])
 
     def play(self, max_time, final_marking, analysis=True):
@@ -463,16 +809,13 @@ class ProbabilisticTimePetriNet:
         print("="*20)
         while self.time <= max_time and not self.is_minimal_marking(final_marking):
             print("Time =", self.time)
-            firable_transitions = list(self.firable_transitions())
-            while firable_transitions:
+            while self.firable:
                 print("-"*20)
                 print("Fire", self.fire())
                 self.current_marking(show_null=False)
-                firable_transitions = list(self.firable_transitions())
             self.increment_time()
-            for transition in self.transitions:
-                transition.check_enable(self.time)
             print("="*20)
+        self.update_analysis()
         print("Final time:", self.time)
         print("Final marking:")
         self.current_marking(show_null=True)
@@ -482,6 +825,55 @@ class ProbabilisticTimePetriNet:
             print("="*20)
         self.reset()
 
+    def play_events(self, max_time, final_marking, analysis=True, verbose=False):
+        """
+        Play the PTPN until the end condition with a next-event engine: the time jumps to the next
+        fire time of the scheduled transitions, so the cost depends on the number of firings and not
+        on max_time/unit_time_increment.
+        The clock is a float (timedelta initial time and durations are converted to seconds) and the
+        transitions fire at their firing time. The statistics are the ones of play.
+        max_time: number (or timedelta)
+        final_marking: dict of place with a minimal marking to reach
+        analysis: boolean (default=True) which enable the display of analysis at the end
+        verbose: boolean (default=False) which enable the display of each firing
+        """
+        def to_float(time):
+            return time.total_seconds() if type(time) is timedelta else float(time)
+
+        max_time = to_float(max_time)
+        self.reset(to_float(self.initial_time))
+        self.event_order = True
+        print("="*20)
+        print("Play", self.name, "(next-event)")
+        print("-"*20)
+        print("Initial marking:")
+        self.current_marking(show_null=True)
+        print("="*20)
+        firings = 0
+        while not self.is_minimal_marking(final_marking):
+            if not self.firable:
+                # Jump to the next firing (or to the end of the play)
+                next_time = self.next_fire_time()
+                if next_time is None or next_time > max_time:
+                    self.time = max(self.time, max_time)
+                    break
+                self.advance_time(next_time)
+                continue
+            transition = self.fire()
+            firings += 1
+            if verbose:
+                print("Time =", self.time, "fire", transition)
+        self.update_analysis()
+        print("Final time:", self.time)
+        print("Firings:", firings)
+        print("Final marking:")
+        self.current_marking(show_null=True)
+        print("="*20)
+        if analysis:
+            self.display_analysis()
+            print("="*20)
+        self.reset()
+
 
 class Transition:
     """
@@ -501,7 +893,10 @@ class Transition:
         self.time_function_type = self.function_type(function_type, time_function)  # None, "time", "interval", "function"
         self.time_function = time_function  # None, int/float, list/tuple with 2 int/floats, function
         self.fire_time = None
-        self.analysis = {"fire_sum": 0, "waiting_time": [], "enabled_time": 0}
+        self.enabled_since = None  # time since the transition is enabled (None if not enabled)
+        self.schedule_id = 0  # order of the scheduling of the fire time
+        self.missing = 0  # number of places before the transition with less mark than weight
+        self.analysis = {"fire_sum": 0, "waiting_time": OnlineStatistic(), "enabled_time": 0}
 
     def __repr__(self):
         return self.name
@@ -559,12 +954,29 @@ class Transition:
         """
         Check is the transition is enable:
         It need to have more mark than weight in each place before the transition
+        (no missing place, the counter is updated by the places)
         return: boolean
         """
-        for place in self.pre:
-            if place.marking < self.pre[place]:
-                return False  # not enough tokens
-        return True  # good to go
+        return self.missing == 0
+
+    def count_missing(self):
+        """
+        Count the places before the transition with less mark than weight
+        """
+        self.missing = sum(1 for place in self.pre if place.marking < self.pre[place])
+
+    def update_missing(self, place, previous_marking):
+        """
+        Update the missing counter after a change of the marking of a place before the transition
+        place: Place
+        previous_marking: integer
+        return: boolean, True if the enabling of the transition changed
+        """
+        weight = self.pre[place]
+        missing = self.missing + (place.marking < weight) - (previous_marking < weight)
+        changed = (missing == 0) != (self.missing == 0)
+        self.missing = missing
+        return changed
 
     def get_fire_duration(self):
         """
@@ -589,12 +1001,45 @@ class Transition:
             return self.time_function()  # TODO args (self, time ?)
         raise Exception("cannot determine fire duration for transition" + self.name)
 
+    def sample_fire_durations(self, size, rng):
+        """
+        Return a batch of durations before fire transition (same time functions as get_fire_duration)
+        size: integer
+        rng: numpy.random.Generator
+        return: numpy array of float (durations in seconds for timedelta)
+        """
+        def seconds(value):
+            return value.total_seconds() if type(value) is timedelta else value
+
+        if self.time_function_type is None:
+            return numpy.zeros(size)
+        if self.time_function_type == "time":
+            return numpy.full(size, float(seconds(self.time_function)))
+        if self.time_function_type == "interval":
+            return rng.uniform(seconds(self.time_function[0]), seconds(self.time_function[1]), size)
+        if self.time_function_type == "lognormal":
+            return rng.lognormal(self.time_function["mu"], self.time_function["sigma"], size)
+        if self.time_function_type == "normal":
+            return rng.normal(self.time_function["mu"], self.time_function["sigma"], size)
+        if self.time_function_type == "exponential":
+            return rng.exponential(1/self.time_function["lambda"], size)
+        if self.time_function_type == "gamma":
+            return rng.gamma(self.time_function["k"], self.time_function["theta"], size)
+        if self.time_function_type == "function":
+            return numpy.array([seconds(self.time_function()) for _ in range(size)], dtype=float)
+        raise Exception("cannot determine fire duration for transition" + self.name)
+
     def check_enable(self, time):
         """
         Upade the enable state of the transtion
         time: integer
         """
         is_enabled = self.is_enabled()
+        if is_enabled and self.enabled_since is None:
+            self.enabled_since = time
+        elif not is_enabled and self.enabled_since is not None:
+            self.update_enabled_time(time)
+            self.enabled_since = None
         if not is_enabled:
             self.fire_time = None
         elif self.time_function_type is not None and self.fire_time is None:
@@ -602,11 +1047,22 @@ class Transition:
             if fire_duration is not None:
                 if type(time) is timedelta and type(fire_duration) is not timedelta:
                     fire_duration = timedelta(seconds=fire_duration)
+                elif type(time) is not timedelta and type(fire_duration) is timedelta:
+                    fire_duration = fire_duration.total_seconds()  # float clock
                 self.fire_time = time + fire_duration
-                self.analysis["waiting_time"].append(fire_duration)
+                self.analysis["waiting_time"].add(fire_duration)
             else:
                 self.fire_time = time
 
+    def update_enabled_time(self, time):
+        """
+        Accumulate the enabled time up to time (if the transition is enabled)
+        time: integer
+        """
+        if self.enabled_since is not None:
+            self.analysis["enabled_time"] += time - self.enabled_since
+            self.enabled_since = time
+
     def is_firable(self, time):
         """
         Check if the transition is firable:
@@ -631,16 +1087,19 @@ class Transition:
         Fire the transition
         time: integer
         Tokens are first removed then added, so if a token is removed and added to the same transition, this transition time is reinitialized
+        return: list of Transition whose enabling changed
         """
         self.analysis["fire_sum"] += 1
+        changed = []
         for place in self.pre:
-            place.remove_token(self.pre[place], time)
+            changed += place.remove_token(self.pre[place], time)
             place.analysis["departure_sum"] += 1
         for distibution in self.post:
             outcome = distibution.choose_outcome()
             for place in outcome:
-                place.add_token(outcome[place], time)
+                changed += place.add_token(outcome[place], time)
                 place.analysis["arrival_sum"] += 1
+        return changed
 
     def add_pre_place(self, place, weight):
         """
@@ -649,6 +1108,7 @@ class Transition:
         weight: integer
         """
         self.pre[place] = weight
+        self.count_missing()
 
     def add_post_distibution(self, distribution):
         """
@@ -707,11 +1167,12 @@ class Place:
         Add a number of tokens to the place and update state of transitions
         number: integer
         time: integer
+        return: list of Transition whose enabling changed
         """
+        self.update_mark_integral(time)
         self.marking += number
-        for transition in self.post_transitions:
-            transition.check_enable(time)
         self.analysis["presence_time_start"].append(time)
+        return self.update_post_transitions(self.marking - number, time)
 
     def remove_token(self, number, time):
         """
@@ -719,14 +1180,37 @@ class Place:
         Raise error if the is not enought tokens
         number: integer
         time: integer
+        return: list of Transition whose enabling changed
         """
         if self.marking < number:
             raise Exception("Impossible : No enought token in place " + str(self))
         else:
+            self.update_mark_integral(time)
             self.marking -= number
-            for transition in self.post_transitions:
+            self.analysis["presence_time"].add(time - self.analysis["presence_time_start"].popleft())
+            return self.update_post_transitions(self.marking + number, time)
+
+    def update_post_transitions(self, previous_marking, time):
+        """
+        Update the state of the transitions after the place whose enabling changed with the marking
+        previous_marking: integer
+        time: integer
+        return: list of Transition whose enabling changed
+        """
+        changed = []
+        for transition in self.post_transitions:
+            if transition.update_missing(self, previous_marking):
                 transition.check_enable(time)
-            self.analysis["presence_time"].append(time - self.analysis["presence_time_start"].pop(0))
+                changed.append(transition)
+        return changed
+
+    def update_mark_integral(self, time):
+        """
+        Accumulate the integral of the marking (queue length by time) up to time
+        time: integer
+        """
+        self.analysis["mark_integral"] += self.marking * (time - self.analysis["mark_since"])
+        self.analysis["mark_since"] = time
 
     def add_pre_transition(self, transition):
         """
@@ -851,3 +1335,157 @@ class Distribution:
 #            for j in range(i):
 #                if self.outcomes(i) == self.outcomes(j):
 #                    raise Exception('Outcomes are duplicate in distibution')
+
+
+class OnlineStatistic:
+    """
+    Statistic of a stream of values in constant memory: count, mean and variance (Welford's
+    algorithm), minimum, maximum and optionally a histogram with fixed bins (approximate quantiles).
+    Durations (timedelta) are accumulated in seconds and the mean and quantiles returned as timedelta.
+
+    bins: sorted list of bin edges (default None, no histogram)
+    """
+
+    def __init__(self, bins=None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of the squared differences to the mean
+        self.minimum = None
+        self.maximum = None
+        self.duration = False
+        self.bins = None if bins is None else [b.total_seconds() if type(b) is timedelta else b for b in bins]
+        self.histogram = None if bins is None else [0]*(len(self.bins) + 1)
+
+    def __repr__(self):
+        return "Statistic of " + str(self.count) + " values"
+
+    def __str__(self):
+        return "Statistic of " + str(self.count) + " values"
+
+    def add(self, value):
+        """
+        Add a value to the statistic
+        value: number (or timedelta)
+        """
+        if type(value) is timedelta:
+            self.duration = True
+            value = value.total_seconds()
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta/self.count
+        self.m2 += delta*(value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if self.histogram is not None:
+            self.histogram[bisect.bisect_right(self.bins, value)] += 1
+
+    def to_value(self, value):
+        """
+        Return value as timedelta for a statistic of durations
+        """
+        return timedelta(seconds=value) if self.duration else value
+
+    def get_mean(self):
+        """
+        Return the mean (None without value)
+        """
+        if self.count == 0:
+            return None
+        return self.to_value(self.mean)
+
+    def get_variance(self):
+        """
+        Return the sample variance (None with less than two values, in seconds^2 for durations)
+        """
+        if self.count < 2:
+            return None
+        return self.m2/(self.count - 1)
+
+    def get_std(self):
+        """
+        Return the sample standard deviation (None with less than two values)
+        """
+        if self.count < 2:
+            return None
+        return self.to_value(math.sqrt(self.get_variance()))
+
+    def quantile(self, q):
+        """
+        Return an approximate quantile from the histogram (linear interpolation in the bin, the
+        outer bins are bounded by the minimum and the maximum)
+        q: float in [0, 1]
+        return: value (None without value or histogram)
+        """
+        if self.count == 0 or self.histogram is None:
+            return None
+        target = q*self.count
+        cumulative = 0
+        for i, number in enumerate(self.histogram):
+            if number and cumulative + number >= target:
+                lower = max(self.bins[i - 1], self.minimum) if i > 0 else self.minimum
+                upper = min(self.bins[i], self.maximum) if i < len(self.bins) else self.maximum
+                return self.to_value(lower + (upper - lower)*(target - cumulative)/number)
+            cumulative += number
+        return self.to_value(self.maximum)
+
+
+class IndexedSet:
+    """
+    Set with constant time add, discard and random choice (list of the items and index of each item)
+
+    items: iterable (default empty)
+    """
+
+    def __init__(self, items=()):
+        self.items = []
+        self.index = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, item):
+        """
+        Add an item (if not in the set)
+        """
+        if item not in self.index:
+            self.index[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        """
+        Remove an item (if in the set): the last item takes its position
+        """
+        position = self.index.pop(item, None)
+        if position is not None:
+            last = self.items.pop()
+            if position < len(self.items):
+                self.items[position] = last
+                self.index[last] = position
+
+    def choice(self, key=None):
+        """
+        Choose a random item
+        key: function (default None), order of the items for the choice (sorted, for repeatable choices)
+        return: item
+        """
+        return random.choice(self.items if key is None else sorted(self.items, key=key))
+
+
+def _sample_replications(ptpn, replications, max_time, final, seed_sequence):
+    """
+    Worker of ProbabilisticTimePetriNet.play_replications (module level to be run in a process pool)
+    final: list of (place index, weight) of the final marking (the places are copies in the worker)
+    seed_sequence: numpy.random.SeedSequence of the batch
+    """
+    final_marking = {ptpn.places[p]: weight for p, weight in final}
+    return ptpn.sample_replications(replications, max_time, final_marking, numpy.random.default_rng(seed_sequence))
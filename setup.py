@@ -6,7 +6,7 @@ with open("README.txt", "r") as fh:
 
 setup(
     name='PTPNperfbound',
-    packages=find_packages(include=['net','solver']),
+    packages=find_packages(include=['net','solver','perf','generator','batch','daemon']),
     version='0.0.1',
     entry_points={
         'console-script' : [
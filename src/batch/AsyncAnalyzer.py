@@ -0,0 +1,136 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import os
+import asyncio
+import threading
+from collections import OrderedDict #LRU of the nets loaded by a worker
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from src.net.PTPN import PTPN
+from src.solver.LPsolver import LPsolver
+from src.solver.SolverProfile import SolverProfile
+
+class AsyncAnalyzer:
+	"""
+	asyncio facade of the bound computation: the parsing of the nets and the solution of the
+	LPs run in a pool of worker processes (or threads), so the event loop is never blocked.
+	Each transition is a future (submit); analyze gathers the futures of several transitions.
+	Each worker keeps the nets it has loaded and their populated solvers: the bounds of other
+	transitions of the same net only change the objective of the LP models (set_reference).
+	A timeout (or a cancellation) cancels the future: a job already started in a worker is not
+	interrupted, but it is bounded by the solver time limit, if any.
+	"""
+
+	def __init__(self, jobs=None, backend='cplex', solver_profile='quiet', executor='process', time_limit=None):
+		self.__jobs = jobs if jobs != None else os.cpu_count()
+		self.__backend = backend
+		self.__solver_profile = solver_profile
+		self.__time_limit = time_limit #solver time limit (seconds)
+		self.__pending = set() #jobs not yet completed
+		if executor == 'process':
+			self.__executor = ProcessPoolExecutor(max_workers=self.__jobs)
+		elif executor == 'thread':
+			self.__executor = ThreadPoolExecutor(max_workers=self.__jobs)
+		else:
+			raise Exception("Unknown executor: {0} (process, thread)".format(executor))
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, *exc):
+		self.close()
+
+	def close(self):
+		"""Shuts down the pool (the pending jobs are cancelled)"""
+		for job in list(self.__pending):
+			job.cancel()
+		self.__executor.shutdown(wait=False)
+
+	def __run(self, func, *args):
+		job = asyncio.get_running_loop().run_in_executor(self.__executor, func, *args)
+		self.__pending.add(job)
+		job.add_done_callback(self.__pending.discard)
+		return job
+
+	async def transitions(self, net):
+		"""Names of the transitions of a net (pnml pathname), parsed by a worker"""
+		return await self.__run(_transition_names, os.path.abspath(net))
+
+	def submit(self, net, tname, timeout=None):
+		"""Future (asyncio task) of the BoundResult of transition tname of a net"""
+		job = self.__run(_solve, os.path.abspath(net), tname, self.__backend, self.__solver_profile, self.__time_limit)
+		return asyncio.ensure_future(asyncio.wait_for(job, timeout) if timeout != None else job)
+
+	async def analyze(self, net, transitions=None, timeout=None, return_exceptions=False):
+		"""
+		BoundResults of the transitions (names; None: all the transitions) of a net:
+		{name: BoundResult (or the exception of the job, if return_exceptions)}
+		"""
+		if transitions == None:
+			transitions = await self.transitions(net)
+		futures = [self.submit(net, t, timeout) for t in transitions]
+		try:
+			results = await asyncio.gather(*futures, return_exceptions=return_exceptions)
+		except BaseException:
+			#A failure (or the cancellation of analyze) cancels the other jobs
+			for f in futures:
+				f.cancel()
+			raise
+		return dict(zip(transitions, results))
+
+
+async def analyze(net, transitions=None, backend='cplex', jobs=None, timeout=None, solver_profile='quiet', executor='process'):
+	"""Bounds of the transitions of a net (see AsyncAnalyzer.analyze) with a temporary pool"""
+	async with AsyncAnalyzer(jobs, backend, solver_profile, executor, timeout) as analyzer:
+		return await analyzer.analyze(net, transitions, timeout)
+
+
+#Nets loaded by a worker: {pathname: {'stamp', 'ptpn', 'solvers': {backend: solver}, 'lock'}}
+_nets = OrderedDict()
+_nets_lock = threading.Lock()
+_MAX_NETS = 8
+
+def _net_entry(net):
+	#Loaded net of the worker (reloaded if the file has changed)
+	stat = os.stat(net)
+	stamp = (stat.st_mtime_ns, stat.st_size)
+	with _nets_lock:
+		entry = _nets.get(net)
+		if entry != None and entry['stamp'] == stamp:
+			_nets.move_to_end(net)
+			return entry
+	ptpn = PTPN(os.path.splitext(os.path.basename(net))[0])
+	ptpn.import_pnml(net)
+	entry = dict({'stamp': stamp, 'ptpn': ptpn, 'solvers': dict(), 'lock': threading.Lock()})
+	with _nets_lock:
+		_nets.update({net: entry})
+		_nets.move_to_end(net)
+		while len(_nets) > _MAX_NETS:
+			_nets.popitem(last=False)
+	return entry
+
+
+def _transition_names(net):
+	return [t.get_name() for t in _net_entry(net)['ptpn'].get_transitions()]
+
+
+def _solve(net, tname, backend, solver_profile, time_limit):
+	#Worker: bound of a transition, reusing the solver of the net (one job at a time per net)
+	entry = _net_entry(net)
+	with entry['lock']:
+		ptpn = entry['ptpn']
+		trans = [t for t in ptpn.get_transitions() if t.get_name() == tname]
+		if not trans:
+			raise KeyError("The transition {0} does not exists".format(tname))
+		solver = entry['solvers'].get(backend)
+		if solver == None:
+			profile = SolverProfile.preset(solver_profile, time_limit=time_limit)
+			solver = LPsolver.get_backend(backend)(tname, trans[0].get_id(), 'max', None, profile)
+			solver.populate_lp(ptpn)
+			entry['solvers'].update({backend: solver})
+		else:
+			solver.set_reference(tname, trans[0].get_id())
+		return solver.solve_lp(ptpn)
@@ -0,0 +1,207 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import io
+import os
+import csv
+import json
+import time
+import contextlib
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.solver.BoundResult import BoundResult
+from src.solver.LPcache import LPcache
+from src.solver.ResultCache import ResultCache
+from src.solver.SolverProfile import SolverProfile
+
+class BatchRunner:
+	"""
+	Bound computation of a batch of nets and reference transitions, described by a manifest:
+	- YAML: a list of nets (or {'nets': [...]}), each one {'net': path, 'transitions': [names],
+	  'output': annotated pnml path (optional)}
+	- CSV: one row per job with columns net, transition (and output, optional)
+	Paths are relative to the manifest directory; the '.pnml' extension is optional.
+	The transitions of a net are split among the worker processes in proportion to their number
+	(a single large net uses all the workers); each worker loads the net once and solves its
+	transitions with the same LP model (only the objective changes, warm re-solve). A failure
+	(e.g., missing net or transition, solver error) is reported in the results of the job and does
+	not stop the batch. The annotated PNML of a net carries the bounds of all its transitions and
+	their critical subnets (ranked by cycle time).
+	"""
+
+	def __init__(self, workers=1, solver_profile='quiet', threads=None, subnets=1, cache=None, cache_size=256,
+		result_cache=None, result_cache_size=64, result_cache_age=30):
+		self.__workers = max(1, workers)
+		self.__solver_profile = solver_profile
+		#Several worker processes: one solver thread each (unless specified)
+		self.__threads = threads if threads != None else (1 if self.__workers > 1 else None)
+		self.__subnets = subnets
+		self.__cache = cache
+		self.__cache_size = cache_size
+		#Result cache shared by the workers (size in MB, age in days)
+		self.__result_cache = result_cache
+		self.__result_cache_size = result_cache_size
+		self.__result_cache_age = result_cache_age
+
+	@staticmethod
+	def read_manifest(filename):
+		"""Jobs of the manifest: [{'net': pnml path, 'transitions': [names], 'output': pnml path or None}]"""
+		base = os.path.dirname(os.path.abspath(filename))
+		nets = dict() #{net: job} (the order of the manifest is kept)
+		if filename.endswith(".csv"):
+			with open(filename, newline='') as f:
+				for row in csv.DictReader(f):
+					job = nets.setdefault(row['net'].strip(), dict({'transitions': [], 'output': None}))
+					job['transitions'].append(row['transition'].strip())
+					if row.get('output'):
+						job['output'] = row['output'].strip()
+		else:
+			try:
+				import yaml #optional dependency (YAML manifests only)
+			except ImportError:
+				raise Exception("PyYAML is required to read YAML manifests (pip install pyyaml)")
+			with open(filename) as f:
+				entries = yaml.safe_load(f)
+			if isinstance(entries, dict):
+				entries = entries.get('nets', [])
+			for e in entries:
+				transitions = e.get('transitions', e.get('transition', []))
+				job = nets.setdefault(str(e['net']), dict({'transitions': [], 'output': None}))
+				job['transitions'] += [str(t) for t in (transitions if isinstance(transitions, list) else [transitions])]
+				if e.get('output'):
+					job['output'] = str(e['output'])
+		jobs = []
+		for net, job in nets.items():
+			path = net if net.endswith(".pnml") else net + ".pnml"
+			output = job['output']
+			if output != None and not output.endswith(".pnml"):
+				output += ".pnml"
+			jobs.append(dict({'net': os.path.join(base, path), 'transitions': job['transitions'],
+				'output': os.path.join(base, output) if output != None else None}))
+		return jobs
+
+	def run(self, jobs):
+		"""Solves the jobs; returns the results (one entry per net and transition)"""
+		tasks = self.__tasks(jobs)
+		if self.__workers == 1 or len(tasks) == 1:
+			task_results = [_solve_net(task) for task in tasks]
+		else:
+			with ProcessPoolExecutor(max_workers=min(self.__workers, len(tasks))) as pool:
+				task_results = list(pool.map(_solve_net, tasks))
+		results = []
+		for i, job in enumerate(jobs):
+			job_results = [r for task, rs in zip(tasks, task_results) if task['job'] == i for r in rs]
+			if job['output'] != None:
+				_export_net(job, job_results)
+			results += job_results
+		return results
+
+	def __tasks(self, jobs):
+		#Tasks of the workers: the transitions of each net split in proportion to their number
+		total = sum(len(job['transitions']) for job in jobs)
+		tasks = []
+		for i, job in enumerate(jobs):
+			transitions = job['transitions']
+			chunks = max(1, min(len(transitions), round(self.__workers * len(transitions) / total))) if total else 1
+			for c in range(chunks):
+				tasks.append(dict(job, job=i, transitions=transitions[c * len(transitions) // chunks:(c + 1) * len(transitions) // chunks],
+					config=self.__config()))
+		return tasks
+
+	def __config(self):
+		return dict({'solver_profile': self.__solver_profile, 'threads': self.__threads, 'subnets': self.__subnets,
+			'cache': self.__cache, 'cache_size': self.__cache_size, 'result_cache': self.__result_cache,
+			'result_cache_size': self.__result_cache_size, 'result_cache_age': self.__result_cache_age})
+
+	@staticmethod
+	def write_results(results, filename):
+		"""Consolidated results file: JSON, or CSV (one row per job, without subnets) if filename ends with .csv"""
+		if filename.endswith(".csv"):
+			fields = ['net', 'transition', 'ok', 'error', 'elapsed', 'status', 'throughput', 'cycle_time']
+			with open(filename, "w", newline='') as f:
+				writer = csv.DictWriter(f, fieldnames=fields)
+				writer.writeheader()
+				for r in results:
+					res = r['result'] if r['result'] != None else dict()
+					writer.writerow(dict({'net': r['net'], 'transition': r['transition'], 'ok': r['ok'], 'error': r['error'],
+						'elapsed': r['elapsed'], 'status': res.get('status'), 'throughput': res.get('throughput'),
+						'cycle_time': res.get('cycle_time')}))
+		else:
+			with open(filename, "w") as f:
+				json.dump(results, f, indent=1)
+
+
+def _solve_net(task):
+	#Worker: loads a net once and solves the transitions of the task with the same LP model
+	#(errors are reported per job)
+	config = task['config']
+	results = []
+	start = time.perf_counter()
+	try:
+		ptpn = PTPN(os.path.splitext(os.path.basename(task['net']))[0])
+		ptpn.import_pnml(task['net'])
+	except Exception as exc:
+		return [_job_result(task['net'], t, None, "Error loading the net: {0}".format(exc), time.perf_counter() - start)
+			for t in task['transitions']]
+	cache = LPcache(config['cache'], config['cache_size']*1024*1024) if config['cache'] else None
+	rcache = None
+	if config['result_cache']:
+		rcache = ResultCache(config['result_cache'], config['result_cache_size']*1024*1024, config['result_cache_age']*24*3600)
+	lpgen = None
+	profile = SolverProfile.preset(config['solver_profile'], threads=config['threads'])
+	for tname in task['transitions']:
+		start = time.perf_counter()
+		trans = []
+		try:
+			trans = [t for t in ptpn.get_transitions() if t.get_name() == tname]
+			if not trans:
+				raise Exception("The transition {0} does not exists".format(tname))
+			if lpgen == None:
+				lpgen = CPLEX_LPsolver(tname, trans[0].get_id(), 'max', cache, profile, results=rcache)
+				lpgen.populate_lp(ptpn)
+			else:
+				#Only the objective changes: re-solve from the last optimal basis
+				lpgen.set_reference(tname, trans[0].get_id())
+			result = lpgen.solve_lp(ptpn)
+			if config['subnets'] > 1 and result.get_cycle_time() != None:
+				lpgen.rank_slowest_subnets(ptpn, config['subnets'])
+			results.append(_job_result(task['net'], tname, result.to_dict(), None, time.perf_counter() - start))
+		except Exception as exc:
+			if trans:
+				lpgen = None #solver error: the LP model is populated again for the next transition
+			results.append(_job_result(task['net'], tname, None, "{0}: {1}".format(type(exc).__name__, exc),
+				time.perf_counter() - start, traceback.format_exc()))
+	profile.save_history()
+	return results
+
+
+def _export_net(job, results):
+	#PTPN model annotated with the bounds of all the transitions of the net (solved by one or more
+	#workers) and the critical subnets of all of them, ranked by cycle time
+	try:
+		ptpn = PTPN(os.path.splitext(os.path.basename(job['net']))[0])
+		ptpn.import_pnml(job['net'])
+		trans = dict({t.get_id(): t for t in ptpn.get_transitions()})
+		solved = [r['result'] for r in results if r['ok']]
+		for res in solved:
+			trans[res['transition_id']].set_bounds(dict({'Throughput': ['max', res['throughput']]}))
+			if res['cycle_time'] != None:
+				trans[res['transition_id']].set_bounds(dict({'Cycle time': ['min', res['cycle_time']]}))
+		subnets = BoundResult.critical_subnets(solved, ptpn)
+		if subnets:
+			ptpn.set_critical_subnets(subnets)
+		with contextlib.redirect_stdout(io.StringIO()):
+			ptpn.export_pnml(job['output'])
+	except Exception as exc:
+		for r in results:
+			r.update({'ok': False, 'error': r['error'] or "Error exporting {0}: {1}".format(job['output'], exc)})
+
+
+def _job_result(net, transition, result, error, elapsed, trace=None):
+	return dict({'net': net, 'transition': transition, 'ok': error == None, 'error': error,
+		'elapsed': elapsed, 'result': result, 'traceback': trace})
@@ -0,0 +1,64 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import os
+import json
+
+class BoundClient:
+	"""
+	Thin client of the bound computation daemon (BoundServer): JSON requests over HTTP.
+	It does not import the solver, so that repeated queries only pay the request time.
+	"""
+
+	HOST = "127.0.0.1"
+	PORT = 8765
+
+	def __init__(self, url=None, timeout=600):
+		self.__url = (url if url != None else "http://{0}:{1}".format(BoundClient.HOST, BoundClient.PORT)).rstrip("/")
+		self.__timeout = timeout
+
+	def get_url(self):
+		return self.__url
+
+	def __request(self, path, body=None):
+		#POST (json body) or GET request: returns the json response
+		import urllib.request #imported at the first request (startup of the CLI)
+		import urllib.error
+		data = json.dumps(body).encode() if body != None else None
+		req = urllib.request.Request(self.__url + path, data=data, headers={'Content-Type': 'application/json'})
+		try:
+			with urllib.request.urlopen(req, timeout=self.__timeout) as resp:
+				return json.loads(resp.read())
+		except urllib.error.HTTPError as exc:
+			#Errors of the requests are returned as json responses ({'ok': False, 'error'})
+			return json.loads(exc.read())
+
+	@staticmethod
+	def net_path(name):
+		"""Absolute pathname of the net NAME (.pnml), as the daemon may run in another directory"""
+		return os.path.abspath(name if name.endswith(".pnml") else name + ".pnml")
+
+	def bound(self, net, transition=None, all_transitions=False, edits=None):
+		"""
+		Bounds of a transition (or of all the transitions) of a net, after the parameter edits, if any:
+		{'ok', 'results': [BoundResult.to_dict()], 'elapsed', 'cached'} or {'ok': False, 'error'}
+		"""
+		return self.__request("/bound", dict({'net': BoundClient.net_path(net), 'transition': transition,
+			'all': all_transitions, 'edits': edits}))
+
+	def edit(self, net, edits):
+		"""Parameter edits: {'transitions': {name: {param: value}}, 'places': {name: m0}, 'arcs': {id: prob}}"""
+		return self.__request("/edit", dict({'net': BoundClient.net_path(net), 'edits': edits}))
+
+	def reload(self, net):
+		"""Discards the edits and the models of a net (reloaded at the next request)"""
+		return self.__request("/reload", dict({'net': BoundClient.net_path(net)}))
+
+	def status(self):
+		return self.__request("/status")
+
+	def shutdown(self):
+		return self.__request("/shutdown", dict())
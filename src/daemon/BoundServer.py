@@ -0,0 +1,219 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import os
+import json
+import time
+import threading
+import traceback
+from collections import OrderedDict #LRU of the loaded nets
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.solver.SolverProfile import SolverProfile
+from src.daemon.BoundClient import BoundClient
+
+class BoundServer:
+	"""
+	Local daemon of the bound computation (HTTP/JSON API, see BoundClient).
+	The loaded nets are kept in memory (least recently used eviction beyond max_nets), each one
+	with its populated solver: the GSPN structure and the LP models are built at the first
+	request and reused by the later ones, which change the reference transition (objective only)
+	or the net parameters (LPmodel.diff) and re-solve from the last optimal basis.
+	A net is reloaded when its file changes. Requests are served one at a time.
+	API (POST, json body):
+	- /bound {net, transition, all, edits}: bounds of a transition (or of all of them)
+	- /edit {net, edits}: parameter edits {'transitions': {name: {param: value}},
+	  'places': {name: m0}, 'arcs': {id: prob}}, applied only if all of them are valid
+	- /reload {net}: discards the edits and the models of the net
+	- /shutdown
+	GET /status: loaded nets and counters
+	"""
+
+	def __init__(self, max_nets=8, solver_profile='quiet', verbose=False):
+		self.__max_nets = max(1, max_nets)
+		self.__solver_profile = solver_profile
+		self.__verbose = verbose #log of the requests
+		#{net pathname: {'ptpn', 'mtime', 'solver', 'results': {tid: result dict}, 'edited'}}
+		self.__nets = OrderedDict()
+		self.__counters = dict({'requests': 0, 'loads': 0, 'hits': 0, 'evictions': 0, 'solutions': 0, 'edits': 0})
+		self.__httpd = None
+
+	def get_nets(self):
+		return list(self.__nets.keys())
+
+	def get_counters(self):
+		return self.__counters
+
+	def __entry(self, net):
+		#Loaded net (LRU): reloaded if the file has changed since it was loaded
+		mtime = os.path.getmtime(net)
+		entry = self.__nets.get(net)
+		if entry != None and entry['mtime'] == mtime:
+			self.__nets.move_to_end(net)
+			self.__counters['hits'] += 1
+			return entry
+		ptpn = PTPN(os.path.splitext(os.path.basename(net))[0])
+		ptpn.import_pnml(net)
+		entry = dict({'ptpn': ptpn, 'mtime': mtime, 'solver': None, 'results': dict(), 'edited': False})
+		self.__nets.update({net: entry})
+		self.__nets.move_to_end(net)
+		self.__counters['loads'] += 1
+		while len(self.__nets) > self.__max_nets:
+			self.__nets.popitem(last=False)
+			self.__counters['evictions'] += 1
+		return entry
+
+	def __solve(self, entry, tr):
+		#Bound of transition tr, reusing the solver of the net (populated at the first request)
+		if tr.get_id() in entry['results']:
+			return entry['results'][tr.get_id()]
+		if entry['solver'] == None:
+			entry['solver'] = CPLEX_LPsolver(tr.get_name(), tr.get_id(), 'max', None, SolverProfile.preset(self.__solver_profile))
+			entry['solver'].populate_lp(entry['ptpn'])
+		else:
+			entry['solver'].set_reference(tr.get_name(), tr.get_id())
+		result = entry['solver'].solve_lp(entry['ptpn']).to_dict()
+		self.__counters['solutions'] += 1
+		entry['results'].update({tr.get_id(): result})
+		return result
+
+	def bound(self, net, transition=None, all_transitions=False, edits=None):
+		"""Bounds (BoundResult dictionaries) of a transition name or of all the transitions of a net"""
+		entry = self.__entry(net)
+		if edits:
+			self.__edit(entry, edits)
+		trans = entry['ptpn'].get_transitions()
+		if not all_transitions:
+			trans = [t for t in trans if t.get_name() == transition]
+			if not trans:
+				raise KeyError("The transition {0} does not exists".format(transition))
+		return [self.__solve(entry, t) for t in trans]
+
+	def edit(self, net, edits):
+		"""Parameter edits of a net (kept until the net is reloaded)"""
+		self.__edit(self.__entry(net), edits)
+
+	def __edit(self, entry, edits):
+		#The edits are resolved and validated first: an invalid edit leaves the net unchanged
+		ptpn = entry['ptpn']
+		trans = dict({t.get_name(): t for t in ptpn.get_transitions()})
+		places = dict({p.get_name(): p for p in ptpn.get_places()})
+		arcs = dict({a.get_id(): a for a in ptpn.get_arcs()})
+		changes = []
+		for name, params in edits.get('transitions', dict()).items():
+			if name not in trans:
+				raise KeyError("The transition {0} does not exists".format(name))
+			if trans[name].get_params() == None:
+				raise ValueError("The transition {0} has no time function parameters".format(name))
+			for k in params:
+				if k not in trans[name].get_params():
+					raise KeyError("The transition {0} has no parameter {1}".format(name, k))
+			changes.append((trans[name].set_params, dict({k: float(v) for k, v in params.items()})))
+		for name, m0 in edits.get('places', dict()).items():
+			if name not in places:
+				raise KeyError("The place {0} does not exists".format(name))
+			changes.append((places[name].set_initial_marking, int(m0)))
+		for aid, prob in edits.get('arcs', dict()).items():
+			if aid not in arcs:
+				raise KeyError("The arc {0} does not exists".format(aid))
+			changes.append((arcs[aid].set_prob, float(prob)))
+		for setter, value in changes:
+			setter(value)
+		if entry['solver'] != None:
+			#Same structure: the changed coefficients are set in the loaded LP (warm re-solve)
+			entry['solver'].update_lp(ptpn)
+		entry['results'] = dict()
+		entry['edited'] = True
+		self.__counters['edits'] += 1
+
+	def reload(self, net):
+		"""Discards the loaded net (edits and models)"""
+		self.__nets.pop(net, None)
+
+	def status(self):
+		return dict({'nets': [dict({'net': net, 'edited': e['edited'], 'solved': len(e['results'])})
+			for net, e in self.__nets.items()], 'max_nets': self.__max_nets, 'counters': self.__counters})
+
+	def handle(self, method, path, body):
+		"""Serves a request: returns (http code, json response)"""
+		self.__counters['requests'] += 1
+		start = time.perf_counter()
+		try:
+			if method == "GET" and path == "/status":
+				response = self.status()
+			elif method == "POST" and path == "/bound":
+				solutions = self.__counters['solutions']
+				results = self.bound(body['net'], body.get('transition'), body.get('all', False), body.get('edits'))
+				response = dict({'results': results, 'cached': solutions == self.__counters['solutions']})
+			elif method == "POST" and path == "/edit":
+				self.edit(body['net'], body['edits'])
+				response = dict()
+			elif method == "POST" and path == "/reload":
+				self.reload(body['net'])
+				response = dict()
+			elif method == "POST" and path == "/shutdown":
+				if self.__httpd != None:
+					#The server loop is stopped once the response has been sent
+					threading.Thread(target=self.__httpd.shutdown).start()
+				response = dict()
+			else:
+				return 404, dict({'ok': False, 'error': "Unknown request: {0} {1}".format(method, path)})
+		except (KeyError, ValueError, FileNotFoundError) as exc:
+			return 400, dict({'ok': False, 'error': "{0}: {1}".format(type(exc).__name__, exc)})
+		except Exception as exc:
+			if self.__verbose:
+				traceback.print_exc()
+			return 500, dict({'ok': False, 'error': "{0}: {1}".format(type(exc).__name__, exc)})
+		response.update({'ok': True, 'elapsed': time.perf_counter() - start})
+		return 200, response
+
+	def serve(self, host=BoundClient.HOST, port=BoundClient.PORT, ready=None):
+		"""Serves the requests until /shutdown (ready: callback with the bound (host, port))"""
+		self.__httpd = _HTTPServer((host, port), _RequestHandler)
+		self.__httpd.bound_server = self
+		if ready != None:
+			ready(self.__httpd.server_address)
+		try:
+			self.__httpd.serve_forever()
+		finally:
+			self.__httpd.server_close()
+			self.__httpd = None
+
+	def is_verbose(self):
+		return self.__verbose
+
+
+class _HTTPServer(HTTPServer):
+	allow_reuse_address = True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+	def __reply(self, method):
+		length = int(self.headers.get('Content-Length', 0))
+		try:
+			body = json.loads(self.rfile.read(length)) if length > 0 else dict()
+		except ValueError:
+			code, response = 400, dict({'ok': False, 'error': "Invalid json request"})
+		else:
+			code, response = self.server.bound_server.handle(method, self.path, body)
+		data = json.dumps(response).encode()
+		self.send_response(code)
+		self.send_header('Content-Type', 'application/json')
+		self.send_header('Content-Length', str(len(data)))
+		self.end_headers()
+		self.wfile.write(data)
+
+	def do_GET(self):
+		self.__reply("GET")
+
+	def do_POST(self):
+		self.__reply("POST")
+
+	def log_message(self, format, *args):
+		if self.server.bound_server.is_verbose():
+			super().log_message(format, *args)
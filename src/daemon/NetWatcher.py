@@ -0,0 +1,125 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import os
+import io
+import time
+import contextlib
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.solver.SolverProfile import SolverProfile
+
+class NetWatcher:
+	"""
+	Watch mode: the bounds of a reference transition are re-computed whenever the PNML file
+	of the net changes (polling of its modification time and size).
+	The new net is compared with the loaded one through their LP models (LPmodel.diff):
+	- only parameters changed (delays, probabilities, markings): the changed coefficients and
+	  right-hand sides are set in the loaded LP, which is re-solved from the last optimal basis
+	- the structure changed (or the reference transition changed id): the LP is rebuilt
+	- nothing changed (e.g., the file has been saved again): the last result is kept
+	"""
+
+	#Kinds of update
+	PARAMETERS = "parameters"
+	STRUCTURE = "structure"
+	UNCHANGED = "unchanged"
+
+	def __init__(self, filename, tname, profile=None, subnets=1, dot=None):
+		self.__filename = filename
+		self.__tname = tname
+		self.__profile = profile if profile != None else SolverProfile.preset('quiet')
+		self.__subnets = subnets #number of slowest subnets to rank
+		self.__dot = dot #DOT view refreshed after each update (file name)
+		self.__stamp = None #(modification time, size) of the loaded file
+		self.__ptpn = None
+		self.__tid = None
+		self.__solver = None
+		self.__result = None #BoundResult
+
+	def get_ptpn(self):
+		return self.__ptpn
+
+	def get_result(self):
+		return self.__result
+
+	def __file_stamp(self):
+		stat = os.stat(self.__filename)
+		return (stat.st_mtime_ns, stat.st_size)
+
+	def __load_net(self):
+		ptpn = PTPN(os.path.splitext(os.path.basename(self.__filename))[0])
+		ptpn.import_pnml(self.__filename)
+		trans = [t for t in ptpn.get_transitions() if t.get_name() == self.__tname]
+		if not trans:
+			raise Exception("The transition {0} does not exists".format(self.__tname))
+		return ptpn, trans[0].get_id()
+
+	def load(self):
+		"""Loads the net and computes the bounds (LP built from scratch): returns the BoundResult"""
+		self.__stamp = self.__file_stamp()
+		self.__ptpn, self.__tid = self.__load_net()
+		self.__solver = CPLEX_LPsolver(self.__tname, self.__tid, 'max', None, self.__profile)
+		self.__solver.populate_lp(self.__ptpn)
+		return self.__solve()
+
+	def __solve(self):
+		self.__result = self.__solver.solve_lp(self.__ptpn)
+		if self.__subnets > 1 and self.__result.get_cycle_time() != None:
+			self.__solver.rank_slowest_subnets(self.__ptpn, self.__subnets)
+		if self.__dot != None:
+			with contextlib.redirect_stdout(io.StringIO()):
+				self.__ptpn.export_dot(self.__dot)
+		return self.__result
+
+	def changed(self):
+		"""True if the file has changed since it was loaded"""
+		return self.__file_stamp() != self.__stamp
+
+	def refresh(self):
+		"""
+		Re-computes the bounds after a change of the file: returns {'kind', 'changes' (number of
+		changed LP coefficients, right-hand sides and bounds), 'result' (BoundResult), 'elapsed'}
+		"""
+		start = time.perf_counter()
+		self.__stamp = self.__file_stamp()
+		ptpn, tid = self.__load_net()
+		if tid != self.__tid:
+			#The reference transition has a new id: the structure has changed
+			self.__ptpn = ptpn
+			self.__tid = tid
+			self.__solver = CPLEX_LPsolver(self.__tname, self.__tid, 'max', None, self.__profile)
+			self.__solver.populate_lp(self.__ptpn)
+			kind, n = NetWatcher.STRUCTURE, None
+		else:
+			changes = self.__solver.update_lp(ptpn)
+			n = sum(len(c) for c in changes.values()) if changes != None else None
+			kind = NetWatcher.STRUCTURE if changes == None else (NetWatcher.PARAMETERS if n > 0 else NetWatcher.UNCHANGED)
+			if kind != NetWatcher.UNCHANGED:
+				#Same LP model otherwise: the loaded net and the last result are kept
+				self.__ptpn = ptpn
+		if kind != NetWatcher.UNCHANGED:
+			self.__solve()
+		return dict({'kind': kind, 'changes': n, 'result': self.__result, 'elapsed': time.perf_counter() - start})
+
+	def watch(self, callback, interval=0.5, errors=None, max_updates=None):
+		"""
+		Polls the file every interval seconds and calls callback(refresh result) after each change
+		(errors(exception) for a change that cannot be processed, e.g. a partially saved file).
+		It stops after max_updates changes (None: never).
+		"""
+		updates = 0
+		while max_updates == None or updates < max_updates:
+			time.sleep(interval)
+			try:
+				if not self.changed():
+					continue
+				updates += 1
+				callback(self.refresh())
+			except Exception as exc:
+				if errors == None:
+					raise
+				errors(exc)
@@ -0,0 +1,250 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import random
+
+class PTPNgenerator:
+	"""
+	Generator of synthetic PTPN models (pnml format) for benchmarking.
+	Families:
+	- ring: cycle of places and transitions
+	- forkjoin: fork of parallel branches (chains) joined by a synchronization
+	- pipeline: sequence of stages sharing a pool of resources
+	- freechoice: random strongly connected free-choice net with probabilistic routing
+	  (distributions over the output places) and timed conflicts
+	The models are generated node by node and written in streaming, so that large nets
+	(up to millions of nodes) can be produced with a small memory footprint.
+	The same seed produces the same model.
+	"""
+
+	FAMILIES = ['ring', 'forkjoin', 'pipeline', 'freechoice']
+
+	#Time functions and ranges of the (random) parameters
+	TIME_FUNCTIONS = dict({
+		'exponential': dict({'lambda': (0.1, 2.0)}),
+		'constant': dict({'k': (0.5, 10.0)}),
+		'uniform': dict({'min': (0.5, 5.0), 'max': (5.0, 10.0)}),
+		'interval': dict({'min': (0.5, 5.0), 'max': (5.0, 10.0)}),
+		'normal': dict({'mu': (1.0, 10.0), 'sigma': (0.1, 1.0)}),
+		'lognormal': dict({'mu': (0.0, 2.0), 'sigma': (0.1, 1.0)}),
+		'gamma': dict({'k': (1.0, 5.0), 'theta': (0.5, 2.0)})
+	})
+
+	#Probabilities are multiples of 1/PROB_UNITS (exactly representable: their sum is 1)
+	PROB_UNITS = 1024
+
+	def __init__(self, seed=None, time_functions=None, outcomes=2, prob_ratio=0.3, conflict_ratio=0.1):
+		"""
+		seed: seed of the random generator
+		time_functions: {time function: weight} mix of the transition time functions
+		outcomes: number of outcomes of the distributions (size of the ECS of the GSPN)
+		prob_ratio: fraction of transitions with probabilistic routing (freechoice)
+		conflict_ratio: fraction of places with a timed conflict (freechoice)
+		"""
+		self.__random = random.Random(seed)
+		if time_functions == None:
+			time_functions = dict({'exponential': 1.0})
+		for tf in time_functions.keys():
+			if tf not in PTPNgenerator.TIME_FUNCTIONS:
+				raise Exception("Unknown time function: {0}".format(tf))
+		self.__tfs = list(time_functions.keys())
+		self.__tf_weights = list(time_functions.values())
+		if outcomes < 1 or outcomes > PTPNgenerator.PROB_UNITS:
+			raise Exception("The number of outcomes must be between 1 and {0}".format(PTPNgenerator.PROB_UNITS))
+		self.__outcomes = outcomes
+		self.__prob_ratio = prob_ratio
+		self.__conflict_ratio = conflict_ratio
+		self.__arc_counter = 0
+
+	##############################################################
+	#Elements of the models:
+	#('place', id, m0), ('transition', id, time_function, params),
+	#('arc', source, target, mult, dist_id, prob)
+	def __transition(self, tid):
+		tf = self.__random.choices(self.__tfs, weights=self.__tf_weights)[0]
+		params = dict()
+		for p, (low, high) in PTPNgenerator.TIME_FUNCTIONS[tf].items():
+			params.update({p: round(self.__random.uniform(low, high), 4)})
+		return ('transition', tid, tf, params)
+
+	def __probabilities(self, n):
+		#n random probabilities (multiples of 1/PROB_UNITS, at least one unit each) summing up to 1
+		cuts = sorted(self.__random.sample(range(1, PTPNgenerator.PROB_UNITS), n - 1))
+		units = [b - a for a, b in zip([0] + cuts, cuts + [PTPNgenerator.PROB_UNITS])]
+		return [u / PTPNgenerator.PROB_UNITS for u in units]
+
+	def __arc(self, source, target, mult=1, dist_id=None, prob=None):
+		return ('arc', source, target, mult, dist_id, prob)
+
+	##############################################################
+	#Families
+	def ring(self, n, tokens=1):
+		"""Ring of n places and n transitions, with 'tokens' tokens in the first place"""
+		for i in range(n):
+			yield ('place', "P" + str(i), tokens if i == 0 else 0)
+			yield self.__transition("T" + str(i))
+			yield self.__arc("P" + str(i), "T" + str(i))
+			yield self.__arc("T" + str(i), "P" + str((i + 1) % n))
+
+	def forkjoin(self, branches, length, tokens=1):
+		"""
+		Fork (T0) of 'branches' parallel chains of 'length' places, joined by a synchronization (T1)
+		that returns the tokens to the initial place (P0)
+		"""
+		yield ('place', "P0", tokens)
+		yield self.__transition("T0")
+		yield self.__transition("T1")
+		yield self.__arc("P0", "T0")
+		yield self.__arc("T1", "P0")
+		for b in range(branches):
+			for i in range(length):
+				pid = "P{0}_{1}".format(b, i)
+				yield ('place', pid, 0)
+				if i == 0:
+					yield self.__arc("T0", pid)
+				else:
+					tid = "T{0}_{1}".format(b, i)
+					yield self.__transition(tid)
+					yield self.__arc("P{0}_{1}".format(b, i - 1), tid)
+					yield self.__arc(tid, pid)
+				if i == length - 1:
+					yield self.__arc(pid, "T1")
+
+	def pipeline(self, stages, resources=1, tokens=1, capacity=1):
+		"""
+		Closed pipeline of 'stages' stages (waiting place, acquisition, busy place, release) with
+		'tokens' jobs; the stage i uses the resource i % resources, which has 'capacity' units
+		"""
+		for r in range(resources):
+			yield ('place', "R" + str(r), capacity)
+		for i in range(stages):
+			wait, busy, res = "P" + str(2*i), "P" + str(2*i + 1), "R" + str(i % resources)
+			acq, rel = "T" + str(2*i), "T" + str(2*i + 1)
+			yield ('place', wait, tokens if i == 0 else 0)
+			yield ('place', busy, 0)
+			yield self.__transition(acq)
+			yield self.__transition(rel)
+			yield self.__arc(wait, acq)
+			yield self.__arc(res, acq)
+			yield self.__arc(acq, busy)
+			yield self.__arc(busy, rel)
+			yield self.__arc(rel, res)
+			yield self.__arc(rel, "P" + str(2*((i + 1) % stages)))
+
+	def freechoice(self, n, tokens=1):
+		"""
+		Random free-choice net with n places: a ring of places/transitions (strong connectivity)
+		where a fraction of the transitions routes the tokens according to a distribution over
+		the next place and other random places, and a fraction of the places has a second
+		(conflicting) output transition towards a random place
+		"""
+		marked = set(self.__random.sample(range(n), min(n, tokens)))
+		t = n
+		for i in range(n):
+			pid, tid, succ = "P" + str(i), "T" + str(i), "P" + str((i + 1) % n)
+			yield ('place', pid, 1 if i in marked else 0)
+			yield self.__transition(tid)
+			yield self.__arc(pid, tid)
+			if self.__outcomes > 1 and self.__random.random() < self.__prob_ratio:
+				others = set()
+				while len(others) < min(self.__outcomes - 1, n - 1):
+					j = self.__random.randrange(n)
+					if j != (i + 1) % n:
+						others.add(j)
+				targets = [succ] + ["P" + str(j) for j in sorted(others)]
+				for target, prob in zip(targets, self.__probabilities(len(targets))):
+					yield self.__arc(tid, target, 1, 0, prob)
+			else:
+				yield self.__arc(tid, succ)
+			if self.__random.random() < self.__conflict_ratio:
+				tid = "T" + str(t)
+				t += 1
+				yield self.__transition(tid)
+				yield self.__arc(pid, tid)
+				yield self.__arc(tid, "P" + str(self.__random.randrange(n)))
+
+	def generate(self, family, size, tokens=1, branches=4, resources=2, capacity=1):
+		"""Elements of a model of the family with about 'size' nodes (places and transitions)"""
+		if family == 'ring':
+			return self.ring(max(1, size // 2), tokens)
+		elif family == 'forkjoin':
+			return self.forkjoin(branches, max(1, (size - 3 + branches) // (2*branches)), tokens)
+		elif family == 'pipeline':
+			return self.pipeline(max(1, (size - resources) // 4), resources, tokens, capacity)
+		elif family == 'freechoice':
+			return self.freechoice(max(2, int(size / (2 + self.__conflict_ratio))), tokens)
+		else:
+			raise Exception("Unknown family: {0}".format(family))
+
+	##############################################################
+	#PNML output (streaming)
+	def write_pnml(self, elements, filename, net_id="PT1"):
+		"""Writes the elements of a model to filename (pnml); returns {'places','transitions','arcs'}"""
+		counts = dict({'places': 0, 'transitions': 0, 'arcs': 0})
+		with open(filename, "w") as f:
+			f.write('<?xml version="1.0" encoding="iso-8859-1"?>\n')
+			f.write('<pnml xmlns="http://www.pnml.org/version-2009/grammar/pnml">\n')
+			f.write(' <net id="{0}" type="http://www.pnml.org/version-2009/grammar/ptnet">\n'.format(net_id))
+			f.write('  <page id="page0">\n')
+			for e in elements:
+				if e[0] == 'place':
+					f.write(self.__place_pnml(*e[1:]))
+					counts['places'] += 1
+				elif e[0] == 'transition':
+					f.write(self.__transition_pnml(*e[1:]))
+					counts['transitions'] += 1
+				else:
+					f.write(self.__arc_pnml(*e[1:]))
+					counts['arcs'] += 1
+			f.write('  </page>\n')
+			f.write(' </net>\n')
+			f.write('</pnml>')
+		return counts
+
+	def __place_pnml(self, pid, m0):
+		place = '    <place id="{0}">\n'.format(pid)
+		place += '     <name>\n'
+		place += '      <text>{0}</text>\n'.format(pid)
+		place += '     </name>\n'
+		place += '     <initialMarking>\n'
+		place += '      <text>{0}</text>\n'.format(m0)
+		place += '     </initialMarking>\n'
+		place += '    </place>\n'
+		return place
+
+	def __transition_pnml(self, tid, time_function, params):
+		trans = '    <transition id="{0}">\n'.format(tid)
+		trans += '     <name>\n'
+		trans += '      <text>{0}</text>\n'.format(tid)
+		trans += '     </name>\n'
+		trans += '     <toolspecific tool="PTPNperfbound" version="0.1">\n'
+		trans += '      <time_function type="{0}">\n'.format(time_function)
+		for p, value in params.items():
+			trans += '       <param name="{0}">\n'.format(p)
+			trans += '         <text>{0}</text>\n'.format(value)
+			trans += '       </param>\n'
+		trans += '      </time_function>\n'
+		trans += '     </toolspecific>\n'
+		trans += '    </transition>\n'
+		return trans
+
+	def __arc_pnml(self, source, target, mult, dist_id, prob):
+		aid = "A" + str(self.__arc_counter)
+		self.__arc_counter += 1
+		arc = '    <arc id="{0}" source="{1}" target="{2}">\n'.format(aid, source, target)
+		arc += '     <inscription>\n'
+		arc += '      <text>{0}</text>\n'.format(mult)
+		arc += '     </inscription>\n'
+		if dist_id != None:
+			arc += '     <toolspecific tool="PTPNperfbound" version="0.1">\n'
+			arc += '      <distribution id="{0}">\n'.format(dist_id)
+			arc += '        <probability>\n'
+			arc += '          <text>{0}</text>\n'.format(prob)
+			arc += '        </probability>\n'
+			arc += '      </distribution>\n'
+			arc += '     </toolspecific>\n'
+		arc += '    </arc>\n'
+		return arc
@@ -28,6 +28,9 @@ class Arc:
 	def get_prob(self):
 		return self.__probability
 
+	def set_prob(self,probability):
+		self.__probability = probability
+
 	def get_source(self):
 		return self.__source
 
@@ -6,11 +6,14 @@
 
 import string  #to generate random IDs
 from xml.dom import minidom
-import graphviz
 
 from src.net.Transition import Transition
 from src.net.Place import Place
 from src.net.Arc import Arc
+from src.perf.Profiler import Profiler
+
+#Colors of the slowest subnets in the dot export (by rank)
+SUBNET_COLORS = ["red", "orange", "blue", "green", "purple", "brown"]
 
 class PTPN:
 	"""PTPNet container (includes also de page, assuming one page in a model)
@@ -27,6 +30,8 @@ class PTPN:
 		# @AssociationKind Composition"""
 		self.__arcs = []
 		self.__subnet = None
+		self.__subnets = [] #ranking of the slowest subnets
+		self.__modules = [] #[(instance, PTPNmodule)] of a composite net
 
 	def set_critical_subnet(self,subnet):
 		self.__subnet = subnet
@@ -34,6 +39,15 @@ class PTPN:
 	def get_critical_subnet(self):
 		return self.__subnet
 
+	def set_critical_subnets(self,subnets):
+		"""Ranking of the slowest subnets (the first one is the critical subnet)"""
+		self.__subnets = subnets
+		if subnets:
+			self.__subnet = subnets[0]
+
+	def get_critical_subnets(self):
+		return self.__subnets
+
 	def get_name(self):
 		return self.__name
 
@@ -45,6 +59,64 @@ class PTPN:
 
 	def get_transitions(self):
 		return self.__transitions
+
+	def subnet(self, node_ids, name):
+		"""PTPN with the places and transitions with ids in node_ids (the same objects) and the arcs among them"""
+		net = PTPN(name)
+		net.__net_id = self.__net_id
+		net.__page_id = self.__page_id
+		net.__places = [p for p in self.__places if p.get_id() in node_ids]
+		net.__transitions = [t for t in self.__transitions if t.get_id() in node_ids]
+		net.__arcs = [a for a in self.__arcs if a.get_source().get_id() in node_ids and a.get_target().get_id() in node_ids]
+		return net
+
+	def get_modules(self):
+		"""Module instances of a composite net: [(instance, PTPNmodule)] (empty if the net is not composite)"""
+		return self.__modules
+
+	@staticmethod
+	def compose(name, instances, marking=None):
+		"""
+		Composite PTPN of the module instances [(instance, PTPNmodule)]: the interface places with
+		the same id are fused, the other places, the transitions and the arcs of each instance are
+		copied with ids and names prefixed by "instance.". The places are ordered as the interface
+		places (in order of appearance) followed by the places of each instance, the transitions
+		instance by instance.
+		marking: initial marking of the interface places {id: m0}; by default, the initial marking
+		of the place in the first module declaring it.
+		The nodes are copies: a changed module is composed again (its LP fragment is rebuilt, see
+		ModularLPbuilder).
+		"""
+		net = PTPN(name)
+		net.__net_id = name
+		net.__page_id = "page0"
+		if len(set(i for i, _ in instances)) != len(instances):
+			raise Exception("Duplicated module instances in the composite net {0}".format(name))
+		marking = marking if marking != None else dict()
+		interface = dict() #{id: Place}
+		for _, module in instances:
+			for p in module.get_net().get_places():
+				if p.get_id() in module.get_interface() and p.get_id() not in interface:
+					interface.update({p.get_id(): Place(p.get_id(), p.get_name(), marking.get(p.get_id(), p.get_initial_marking()))})
+		net.__places = list(interface.values())
+		for instance, module in instances:
+			prefix = instance + "."
+			nodes = dict()
+			for p in module.get_net().get_places():
+				if p.get_id() in module.get_interface():
+					nodes.update({p.get_id(): interface[p.get_id()]})
+				else:
+					nodes.update({p.get_id(): Place(prefix + p.get_id(), prefix + p.get_name(), p.get_initial_marking())})
+					net.__places.append(nodes[p.get_id()])
+			for t in module.get_net().get_transitions():
+				params = dict(t.get_params()) if t.get_params() != None else None
+				nodes.update({t.get_id(): Transition(prefix + t.get_id(), prefix + t.get_name(), t.get_time_function(), params)})
+				net.__transitions.append(nodes[t.get_id()])
+			for a in module.get_net().get_arcs():
+				net.__arcs.append(Arc(prefix + a.get_id(), a.get_mult(), a.get_dist_id(), a.get_prob(),
+					nodes[a.get_source().get_id()], nodes[a.get_target().get_id()]))
+		net.__modules = list(instances)
+		return net
 	
 	def __get_text(self,element):
 		"""Returns 'data' from <element><text>data</text></element>"""
@@ -58,8 +130,11 @@ class PTPN:
 				return node
 		return None
 
+	@Profiler.timed("pnml_parse")
 	def import_pnml(self, filename):
 		"""Parses 'filename' and loads the PTPN model"""
+		if Profiler.get_active() != None:
+			Profiler.check_budget("pnml_parse", Profiler.estimate_dom(filename))
 		model = minidom.parse(filename)
 
 		#Load net and page id
@@ -133,6 +208,8 @@ class PTPN:
 
 			arc = Arc(aid,mult,did,prob,source,target)
 			self.__arcs.append(arc)
+		Profiler.set_info("ptpn", dict({'places': len(self.__places), 'transitions': len(self.__transitions),
+			'arcs': len(self.__arcs)}))
 		
 		#Debug
 		#print("PTPN model loaded.")	
@@ -175,6 +252,7 @@ class PTPN:
 			print("source_id: ", source_id, " target_id: ", target_id, " mult: ", mult)
 			print("dist_id: ", dist_id, " prob: ", prob)
 
+	@Profiler.timed("export_pnml")
 	def export_pnml(self,filename):
 		"""
 		Export the PTPN model to  pnml (if bounds are computed it exports the bound results)
@@ -243,7 +321,18 @@ class PTPN:
 				ptpn += '      </distribution>\n'
 				ptpn += '     </toolspecific>\n'
 			ptpn += '    </arc>\n'
-		if self.__subnet:
+		if len(self.__subnets) > 1:
+			#Ranking of the slowest subnets
+			ptpn += '  <toolspecific tool="PTPNperfbound" version="0.1">\n'
+			for i in range(len(self.__subnets)):
+				ptpn += '   <critical_subnet rank="{0}" cycle_time="{1}">\n'.format(i+1, self.__subnets[i]['cycle_time'])
+				for p in self.__subnets[i]['places']:
+					ptpn += '    <pl id="{0}"/>\n'.format(p.get_id())
+				for t in self.__subnets[i]['trans']:
+					ptpn += '    <tr id="{0}"/>\n'.format(t.get_id())
+				ptpn += '   </critical_subnet>\n'
+			ptpn += '  </toolspecific>\n'
+		elif self.__subnet:
 			ptpn += '  <toolspecific tool="PTPNperfbound" version="0.1">\n'
 			ptpn += '   <critical_subnet>\n'
 			for p in self.__subnet['places']:
@@ -261,21 +350,38 @@ class PTPN:
 		f.write(ptpn)
 		f.close()
 
+	def __get_subnet_color(self, node, key):
+		"""Color of the slowest subnet (in the ranking) including the node, None otherwise"""
+		subnets = self.__subnets if self.__subnets else ([self.__subnet] if self.__subnet else [])
+		for i in range(len(subnets)):
+			if node in subnets[i][key]:
+				return SUBNET_COLORS[i % len(SUBNET_COLORS)]
+		return None
+
+	@Profiler.timed("export_dot")
 	def export_dot(self,filename):
+		import graphviz #optional export: imported only when used
 		dot = graphviz.Digraph(comment=self.__name)
 		dot.attr(rankdir='TB')  # vertical
-		for p in self.__places:			
-			if p in self.__subnet['places']:
-				dot.node(p.get_name(), shape='circle', label="•"*p.get_initial_marking(), xlabel=p.get_name(), color="red")
+		if len(self.__subnets) > 1:
+			legend = ""
+			for i in range(len(self.__subnets)):
+				legend += "Subnet {0} ({1}): CT {2}\n".format(i+1, SUBNET_COLORS[i % len(SUBNET_COLORS)], self.__subnets[i]['cycle_time'])
+			dot.attr(label=legend)
+		for p in self.__places:
+			color = self.__get_subnet_color(p, 'places')
+			if color:
+				dot.node(p.get_name(), shape='circle', label="•"*p.get_initial_marking(), xlabel=p.get_name(), color=color)
 			else:
 				dot.node(p.get_name(), shape='circle', label="point"*p.get_initial_marking(), xlabel=p.get_name())
 		for t in self.__transitions:
-			if t in self.__subnet['trans']:
+			color = self.__get_subnet_color(t, 'trans')
+			if color:
 				if t.get_bounds():
 					label = "bounds:\n Thr:" + str(t.get_bounds()['Throughput']) + "\n CT:" + str(t.get_bounds()['Cycle time'])
-					dot.node(t.get_name(), shape='rect', color="red", xlabel=label)
+					dot.node(t.get_name(), shape='rect', color=color, xlabel=label)
 				else:
-					dot.node(t.get_name(), shape='rect', color="red")
+					dot.node(t.get_name(), shape='rect', color=color)
 			else:
 				dot.node(t.get_name(), shape='rect')
 		for a in self.__arcs:
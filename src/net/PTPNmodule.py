@@ -0,0 +1,56 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import hashlib #module hash
+from src.net.PTPN import PTPN
+
+class PTPNmodule:
+	"""
+	Reusable sub-model of composite PTPNs (e.g., a resource pool, a care pathway): a net whose
+	interface places are fused with the interface places with the same id of the other modules
+	(PTPN.compose). The other places, the transitions and the arcs are private to each instance
+	of the module.
+	"""
+
+	def __init__(self, name, ptpn: PTPN, interface):
+		self.__name = name
+		self.__ptpn = ptpn
+		self.__interface = set(interface) #interface place ids
+		pids = set(p.get_id() for p in ptpn.get_places())
+		if not self.__interface.issubset(pids):
+			raise Exception("Interface places not in the module {0}: {1}".format(name, " ".join(sorted(self.__interface - pids))))
+
+	@staticmethod
+	def from_pnml(name, filename, interface):
+		"""Module of the net of filename (pnml)"""
+		ptpn = PTPN(name)
+		ptpn.import_pnml(filename)
+		return PTPNmodule(name, ptpn, interface)
+
+	def get_name(self):
+		return self.__name
+
+	def get_net(self):
+		return self.__ptpn
+
+	def get_interface(self):
+		return self.__interface
+
+	def module_hash(self):
+		"""
+		Hash of the module structure and parameters (local ids, initial markings of the private
+		places, delays, arcs and routing probabilities): the key of its cached LP fragment.
+		The initial marking of the interface places is set by the composite net and not hashed.
+		"""
+		h = hashlib.sha256()
+		h.update(repr(sorted(self.__interface)).encode())
+		for p in self.__ptpn.get_places():
+			h.update(repr((p.get_id(), None if p.get_id() in self.__interface else p.get_initial_marking())).encode())
+		for t in self.__ptpn.get_transitions():
+			h.update(repr((t.get_id(), t.get_delay())).encode())
+		for a in self.__ptpn.get_arcs():
+			h.update(repr((a.get_source().get_id(), a.get_target().get_id(), a.get_mult(), a.get_dist_id(), a.get_prob())).encode())
+		return h.hexdigest()
@@ -21,3 +21,6 @@ class Place:
 	def get_initial_marking(self):
 		return self.__initial_marking
 
+	def set_initial_marking(self,m0):
+		self.__initial_marking = m0
+
@@ -33,6 +33,10 @@ class Transition:
 	def get_params(self):
 		return self.__params
 
+	def set_params(self,params):
+		"""Updates (some of) the parameters of the time function"""
+		self.__params.update(params)
+
 	def get_delay(self):
 		"""
 		Returns the firing <mean> delay depending on the time function.
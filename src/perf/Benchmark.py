@@ -0,0 +1,194 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import io
+import os
+import math
+import time
+import tempfile
+import contextlib
+from cplex.exceptions import CplexError
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.solver.SolverProfile import SolverProfile
+from src.generator.PTPNgenerator import PTPNgenerator
+from src.perf.Profiler import Profiler
+
+class Benchmark:
+	"""
+	Benchmark of the phases of the bound computation (import, GSPN transformation, ECS,
+	LP build, solution of LP max X and LP min CT, subnet extraction and export) on the bundled
+	examples and on generated nets of increasing size (scaling curves).
+	The report can be stored as a baseline and later reports are compared against it:
+	- a phase regresses if its (machine-normalized) time exceeds the baseline time by more than
+	  a threshold
+	- a phase regresses in complexity if the exponent of its scaling curve (time against
+	  |P|+|T|+|A|, log-log least squares) grows beyond a tolerance (e.g., a new O(n^2) loop)
+	The peak memory of the phases and its scaling exponents are compared in the same way.
+	"""
+
+	PHASES = ['pnml_parse', 'gspn_transformation', 'ecs', 'lp_build_X', 'lp_load', 'solve_X',
+		'lp_build_CT', 'solve_CT', 'subnet_extraction', 'export_pnml']
+
+	#Bundled examples: {net: reference transition name (None: the first transition)}
+	EXAMPLES = dict({'example1_distrib': 'T9', 'assessmentdata': None, 'HCUdatabaseLCA_closed': None})
+
+	#Phases faster than this (seconds) are not used in the scaling exponents
+	MIN_TIME = 0.001
+
+	def __init__(self, repeats=3, memory=True):
+		self.__repeats = repeats #timing: minimum over the repetitions
+		self.__memory = memory #an additional run with memory accounting
+
+	@staticmethod
+	def calibrate(rounds=5):
+		"""Time (seconds) of a fixed Python workload, used to normalize times across machines"""
+		best = None
+		for r in range(rounds):
+			start = time.perf_counter()
+			d = dict()
+			for i in range(200000):
+				d.update({str(i): i * 0.5})
+			sum(v for v in d.values())
+			elapsed = time.perf_counter() - start
+			best = elapsed if best == None else min(best, elapsed)
+		return best
+
+	def __run_once(self, filename, tname, profiler):
+		#Returns the profiler and whether the LPs have been solved
+		solved = True
+		ptpn = PTPN(os.path.basename(filename))
+		with profiler, contextlib.redirect_stdout(io.StringIO()):
+			ptpn.import_pnml(filename)
+			trans = ptpn.get_transitions()
+			tr = trans[0] if tname == None else [t for t in trans if t.get_name() == tname][0]
+			lpgen = CPLEX_LPsolver(tr.get_name(), tr.get_id(), 'max', None, SolverProfile.preset('quiet'))
+			lpgen.populate_lp(ptpn)
+			try:
+				lpgen.solve_lp(ptpn)
+			except CplexError:
+				#e.g., size limits of the solver edition: the solution phases are not measured
+				solved = False
+			with tempfile.TemporaryDirectory() as tmp:
+				ptpn.export_pnml(os.path.join(tmp, "results.pnml"))
+		if not solved:
+			profiler.get_phases().pop('solve_X', None)
+		return profiler, solved
+
+	def run_net(self, filename, tname=None):
+		"""
+		Measures the phases on a net: {'size': {'places','transitions','arcs','nodes'},
+		'solved', 'time': {phase: seconds}, 'calibration', 'memory': {phase: peak bytes}}
+		The calibration is measured before and after the net, to follow the load of the machine.
+		"""
+		times = dict()
+		calibration = Benchmark.calibrate(3)
+		for r in range(self.__repeats):
+			prof, solved = self.__run_once(filename, tname, Profiler())
+			for phase in Benchmark.PHASES:
+				if phase in prof.get_phases():
+					wall = prof.get_phases()[phase]['wall']
+					times.update({phase: min(times.get(phase, wall), wall)})
+		ptpn = prof.get_info()['ptpn']
+		result = dict({'size': dict({'places': ptpn['places'], 'transitions': ptpn['transitions'], 'arcs': ptpn['arcs'],
+			'nodes': ptpn['places'] + ptpn['transitions'] + ptpn['arcs']}), 'solved': solved, 'time': times,
+			'calibration': min(calibration, Benchmark.calibrate(3))})
+		if self.__memory:
+			prof, _ = self.__run_once(filename, tname, Profiler(memory=True))
+			result.update({'memory': {p: prof.get_phases()[p]['peak_mem'] for p in Benchmark.PHASES if p in prof.get_phases()}})
+		return result
+
+	def run_examples(self, directory):
+		"""Measures the phases on the bundled examples: {net: run_net result}"""
+		results = dict()
+		for net, tname in Benchmark.EXAMPLES.items():
+			filename = os.path.join(directory, net + ".pnml")
+			if os.path.isfile(filename):
+				results.update({net: self.run_net(filename, tname)})
+		return results
+
+	def run_scaling(self, sizes, family='freechoice', seed=1):
+		"""Measures the phases on generated nets of increasing size: list of run_net results"""
+		points = []
+		with tempfile.TemporaryDirectory() as tmp:
+			for size in sizes:
+				filename = os.path.join(tmp, "{0}_{1}.pnml".format(family, size))
+				gen = PTPNgenerator(seed)
+				gen.write_pnml(gen.generate(family, size), filename)
+				points.append(self.run_net(filename, 'T0'))
+		return points
+
+	@staticmethod
+	def scaling_exponents(points, metric='time'):
+		"""Exponents b of the scaling curves metric ~ a * nodes^b per phase (log-log least squares)"""
+		exponents = dict()
+		for phase in Benchmark.PHASES:
+			xs = []
+			ys = []
+			for p in points:
+				value = p.get(metric, dict()).get(phase)
+				if value != None and value > (Benchmark.MIN_TIME if metric == 'time' else 0):
+					xs.append(math.log(p['size']['nodes']))
+					ys.append(math.log(value))
+			if len(xs) >= 2 and max(xs) > min(xs):
+				mx = sum(xs) / len(xs)
+				my = sum(ys) / len(ys)
+				exponents.update({phase: sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)})
+		return exponents
+
+	def run(self, examples_dir, sizes, family='freechoice', seed=1):
+		"""Full benchmark report"""
+		points = self.run_scaling(sizes, family, seed)
+		return dict({'calibration': Benchmark.calibrate(),
+			'examples': self.run_examples(examples_dir),
+			'scaling': dict({'family': family, 'seed': seed, 'points': points,
+				'exponents': dict({'time': Benchmark.scaling_exponents(points, 'time'),
+					'memory': Benchmark.scaling_exponents(points, 'memory')})})})
+
+	@staticmethod
+	def compare(baseline, report, threshold=0.25, slack=0.005, exponent_tolerance=0.3, memory_slack=65536):
+		"""
+		Regressions of a report with respect to a baseline (list of messages, empty if none).
+		Times are normalized by the calibration of the machine; slack (seconds) absorbs the noise
+		of the fastest phases, memory_slack (bytes) the one of the smallest peaks of memory.
+		"""
+		regressions = []
+		def check(where, base, current):
+			scale = current['calibration'] / base['calibration']
+			for phase, t in base['time'].items():
+				if phase in current['time'] and current['time'][phase] / scale > t * (1 + threshold) + slack:
+					regressions.append("{0}: {1} {2:.4f}s (baseline {3:.4f}s)".format(where, phase, current['time'][phase] / scale, t))
+			for phase, m in base.get('memory', dict()).items():
+				peak = current.get('memory', dict()).get(phase)
+				if peak != None and peak > m * (1 + threshold) + memory_slack:
+					regressions.append("{0}: {1} memory {2} bytes (baseline {3} bytes)".format(where, phase, peak, m))
+		for net, base in baseline['examples'].items():
+			if net in report['examples']:
+				check(net, base, report['examples'][net])
+		base_points = dict({p['size']['nodes']: p for p in baseline['scaling']['points']})
+		for p in report['scaling']['points']:
+			if p['size']['nodes'] in base_points:
+				check("{0} nodes".format(p['size']['nodes']), base_points[p['size']['nodes']], p)
+		for metric in ['time', 'memory']:
+			for phase, b in baseline['scaling']['exponents'].get(metric, dict()).items():
+				current = report['scaling']['exponents'].get(metric, dict()).get(phase)
+				if current != None and current > b + exponent_tolerance:
+					regressions.append("scaling: {0} {1} exponent {2:.2f} (baseline {3:.2f})".format(phase, metric, current, b))
+		return regressions
+
+	@staticmethod
+	def print_report(report):
+		print("Calibration (s): ", report['calibration'])
+		for net, result in report['examples'].items():
+			print(net, result['size'], "" if result['solved'] else "(not solved)")
+			for phase, t in result['time'].items():
+				print("  ", phase.ljust(25), "{0:10.4f}".format(t))
+		print("Scaling (", report['scaling']['family'], "):")
+		print("nodes".rjust(10), *[p[:12].rjust(12) for p in Benchmark.PHASES])
+		for p in report['scaling']['points']:
+			print(str(p['size']['nodes']).rjust(10), *["{0:12.4f}".format(p['time'].get(ph, 0.0)) for ph in Benchmark.PHASES])
+		for metric, exponents in report['scaling']['exponents'].items():
+			print("Exponents (", metric, "): ", {k: round(v, 2) for k, v in exponents.items()})
@@ -0,0 +1,268 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import os
+import json
+import time
+import functools
+import tracemalloc #memory accounting (optional)
+from contextlib import nullcontext
+
+class Profiler:
+	"""
+	Per-phase instrumentation of the bound computation (PNML parse, GSPN transformation,
+	ECS computation, LP build, solution, subnet extraction, export).
+	For each phase it records the number of calls, the wall-clock and CPU times; nested
+	phases are named by their path (e.g., 'lp_build_X/routing').
+	With memory accounting (memory=True) it also records, per phase, the peak and retained
+	Python memory (tracemalloc) and the RSS variation (which includes the solver memory).
+	With a memory budget (bytes), the memory of the expensive stages is estimated before
+	they start and a warning is issued if the estimate exceeds the budget.
+	When no profiler is active the instrumentation points do nothing.
+	Usage:
+		with Profiler(memory=True) as prof:
+			...
+		prof.get_report()
+	"""
+
+	#Active profiler (None: instrumentation off)
+	__active = None
+	#No-op phase returned when the instrumentation is off
+	__NULL_PHASE = nullcontext()
+
+	#Memory model of the budget estimates (bytes)
+	DOM_BYTES_PER_FILE_BYTE = 60 #minidom DOM per byte of the PNML file
+	LP_BYTES_PER_NNZ = 200 #LP model (sparse arrays, CPLEX rows) per non-zero
+	LP_BYTES_PER_DIM = 400 #LP model (names, bounds, rhs) per row/column
+
+	def __init__(self, memory=False, budget=None):
+		self.__phases = dict() #{path: {'calls', 'wall', 'cpu'[, 'peak_mem', 'retained_mem', 'rss_delta']}}
+		self.__counters = dict() #{name: value}
+		self.__info = dict() #{name: value} (e.g., net and LP dimensions)
+		self.__warnings = [] #memory budget warnings
+		self.__stack = [] #paths of the open phases
+		self.__start = None #(wall, cpu) at start
+		self.__total = None #{'wall', 'cpu'[, 'peak_mem', 'max_rss']} from start to stop
+		self.__memory = memory
+		self.__budget = budget
+		self.__mem_stack = [] #peak memory so far of the open phases
+		self.__tracing = False #tracemalloc started by the profiler
+
+	##############################################################
+	#Instrumentation points
+	@staticmethod
+	def get_active():
+		return Profiler.__active
+
+	@staticmethod
+	def phase(name):
+		"""Context manager measuring a phase of the active profiler"""
+		if Profiler.__active == None:
+			return Profiler.__NULL_PHASE
+		return Profiler.__active.__phase(name)
+
+	@staticmethod
+	def timed(name):
+		"""Decorator measuring each call of a function as a phase"""
+		def decorator(func):
+			@functools.wraps(func)
+			def wrapper(*args, **kwargs):
+				if Profiler.__active == None:
+					return func(*args, **kwargs)
+				with Profiler.__active.__phase(name):
+					return func(*args, **kwargs)
+			return wrapper
+		return decorator
+
+	@staticmethod
+	def set_info(name, value):
+		"""Sets an information item of the report of the active profiler"""
+		if Profiler.__active != None:
+			Profiler.__active.__info.update({name: value})
+
+	@staticmethod
+	def check_budget(stage, estimate):
+		"""
+		Checks the memory estimate (bytes) of a stage against the budget of the active profiler:
+		returns False (and warns) if the budget is exceeded
+		"""
+		prof = Profiler.__active
+		if prof == None:
+			return True
+		prof.__info.setdefault('memory_estimates', dict()).update({stage: estimate})
+		if prof.__budget == None or estimate <= prof.__budget:
+			return True
+		msg = "Warning: the {0} stage is predicted to use {1:.1f} MB (memory budget: {2:.1f} MB)".format(
+			stage, estimate / 2**20, prof.__budget / 2**20)
+		print(msg)
+		prof.__warnings.append(dict({'stage': stage, 'estimate': estimate, 'budget': prof.__budget}))
+		return False
+
+	@staticmethod
+	def estimate_lp(rows, cols, nnz):
+		"""Memory estimate (bytes) of an LP model"""
+		return nnz * Profiler.LP_BYTES_PER_NNZ + (rows + cols) * Profiler.LP_BYTES_PER_DIM
+
+	@staticmethod
+	def estimate_dom(filename):
+		"""Memory estimate (bytes) of the DOM of a PNML file"""
+		return os.path.getsize(filename) * Profiler.DOM_BYTES_PER_FILE_BYTE
+
+	@staticmethod
+	def count(name, value=1):
+		"""Increments a counter of the active profiler"""
+		if Profiler.__active != None:
+			counters = Profiler.__active.__counters
+			counters.update({name: counters.get(name, 0) + value})
+
+	##############################################################
+	#Profiler activation
+	def start(self):
+		Profiler.__active = self
+		if self.__memory and not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self.__tracing = True
+		self.__start = (time.perf_counter(), time.process_time())
+		return self
+
+	def stop(self):
+		if Profiler.__active is self:
+			Profiler.__active = None
+		wall, cpu = self.__start
+		self.__total = dict({'wall': time.perf_counter() - wall, 'cpu': time.process_time() - cpu})
+		if self.__memory:
+			self.__total.update({'peak_mem': tracemalloc.get_traced_memory()[1], 'max_rss': _max_rss()})
+			if self.__tracing:
+				tracemalloc.stop()
+				self.__tracing = False
+		return self
+
+	def get_memory(self):
+		return self.__memory
+
+	def __enter__(self):
+		return self.start()
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.stop()
+		return False
+
+	def __phase(self, name):
+		return _Phase(self, name)
+
+	def _push(self, name):
+		path = self.__stack[-1] + "/" + name if self.__stack else name
+		self.__stack.append(path)
+		return path
+
+	def _pop(self, path, wall, cpu):
+		self.__stack.pop()
+		record = self.__phases.setdefault(path, dict({'calls': 0, 'wall': 0.0, 'cpu': 0.0}))
+		record['calls'] += 1
+		record['wall'] += wall
+		record['cpu'] += cpu
+		return record
+
+	def _mem_enter(self):
+		#The peak of the parent phase is saved before resetting the peak for the nested phase
+		current, peak = tracemalloc.get_traced_memory()
+		if self.__mem_stack:
+			self.__mem_stack[-1] = max(self.__mem_stack[-1], peak)
+		tracemalloc.reset_peak()
+		self.__mem_stack.append(current)
+		return current, _rss()
+
+	def _mem_exit(self, record, start):
+		current, peak = tracemalloc.get_traced_memory()
+		peak = max(peak, self.__mem_stack.pop())
+		if self.__mem_stack:
+			self.__mem_stack[-1] = max(self.__mem_stack[-1], peak)
+		start_mem, start_rss = start
+		rss = _rss()
+		record.update({'peak_mem': max(record.get('peak_mem', 0), peak - start_mem),
+			'retained_mem': record.get('retained_mem', 0) + current - start_mem,
+			'rss_delta': record.get('rss_delta', 0) + (rss - start_rss if rss != None and start_rss != None else 0)})
+
+	##############################################################
+	#Report
+	def get_phases(self):
+		return self.__phases
+
+	def get_counters(self):
+		return self.__counters
+
+	def get_info(self):
+		return self.__info
+
+	def get_warnings(self):
+		return self.__warnings
+
+	def get_report(self):
+		"""
+		{'total': {'wall','cpu'[,'peak_mem','max_rss']}, 'phases': {path: {'calls','wall','cpu'
+		[,'peak_mem','retained_mem','rss_delta']}}, 'counters': {...}, 'info': {...}, 'warnings': [...]}
+		Memory values are in bytes.
+		"""
+		return dict({'total': self.__total, 'phases': self.__phases, 'counters': self.__counters,
+			'info': self.__info, 'warnings': self.__warnings})
+
+	def save(self, filename):
+		"""Writes the report (JSON)"""
+		with open(filename, "w") as f:
+			json.dump(self.get_report(), f, indent=1)
+
+	def print_report(self):
+		print("Phase".ljust(40), "calls".rjust(6), "wall (s)".rjust(10), "cpu (s)".rjust(10),
+			*(["peak (MB)".rjust(10), "kept (MB)".rjust(10), "rss (MB)".rjust(10)] if self.__memory else []))
+		for path, record in self.__phases.items():
+			mem = []
+			if 'peak_mem' in record:
+				mem = ["{0:10.3f}".format(record[k] / 2**20) for k in ['peak_mem', 'retained_mem', 'rss_delta']]
+			print(path.ljust(40), str(record['calls']).rjust(6), "{0:10.4f}".format(record['wall']),
+				"{0:10.4f}".format(record['cpu']), *mem)
+		for name, value in self.__counters.items():
+			print(name.ljust(40), value)
+		for name, value in self.__info.items():
+			print(name.ljust(40), value)
+
+
+class _Phase:
+	"""A running phase of a profiler"""
+
+	def __init__(self, profiler, name):
+		self.__profiler = profiler
+		self.__name = name
+
+	def __enter__(self):
+		self.__path = self.__profiler._push(self.__name)
+		self.__mem = self.__profiler._mem_enter() if self.__profiler.get_memory() else None
+		self.__wall = time.perf_counter()
+		self.__cpu = time.process_time()
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		record = self.__profiler._pop(self.__path, time.perf_counter() - self.__wall, time.process_time() - self.__cpu)
+		if self.__mem != None:
+			self.__profiler._mem_exit(record, self.__mem)
+		return False
+
+
+def _rss():
+	#Resident set size (bytes) of the process, None if not available (non-Linux systems)
+	try:
+		with open("/proc/self/statm") as f:
+			return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+	except (OSError, ValueError, AttributeError):
+		return None
+
+
+def _max_rss():
+	#Maximum resident set size (bytes) of the process, None if not available
+	try:
+		import resource
+		return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 #kilobytes on Linux
+	except ImportError:
+		return None
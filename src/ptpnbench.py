@@ -0,0 +1,50 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+Entry point of the benchmark suite of the PTPN performance bound solver
+"""
+
+import os
+import sys
+import json
+import click #CLI
+
+from src.perf.Benchmark import Benchmark
+
+@click.command()
+@click.option('-b','--baseline', type=str, default="tests/benchmark/baseline.json", show_default=True, help="Baseline file (JSON)")
+@click.option('-u','--update', is_flag=True, default=False, help="Store the results as the new baseline")
+@click.option('-e','--examples', type=str, default="examples", show_default=True, help="Directory of the bundled examples")
+@click.option('-n','--sizes', type=str, default="100,300,1000,3000", show_default=True, help="Sizes (nodes) of the generated nets")
+@click.option('-r','--repeats', type=int, default=3, show_default=True, help="Repetitions of each measure (minimum time)")
+@click.option('-t','--threshold', type=float, default=0.25, show_default=True, help="Relative time increase considered a regression")
+@click.option('-o','--output', type=str, help="Report file (JSON)")
+@click.option('--no-memory', is_flag=True, default=False, help="Skip the memory accounting runs")
+def ptpnbench(baseline, update, examples, sizes, repeats, threshold, output, no_memory):
+
+    bench = Benchmark(repeats, not no_memory)
+    report = bench.run(os.path.join(os.getcwd(), examples), [int(s) for s in sizes.split(",")])
+    Benchmark.print_report(report)
+    if output:
+        with open(os.path.join(os.getcwd(), output), "w") as f:
+            json.dump(report, f, indent=1)
+    filename = os.path.join(os.getcwd(), baseline)
+    if update:
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, "w") as f:
+            json.dump(report, f, indent=1)
+        click.echo(f"Baseline updated: {filename}")
+    elif os.path.isfile(filename):
+        with open(filename) as f:
+            regressions = Benchmark.compare(json.load(f), report, threshold)
+        for r in regressions:
+            click.echo(f"Regression: {r}")
+        if regressions:
+            sys.exit(1)
+        click.echo("No regressions with respect to the baseline")
+    else:
+        click.echo(f"Oops!  The baseline {filename} does not exists.")
+
+
+if __name__ == '__main__':
+    ptpnbench()
@@ -5,10 +5,19 @@ Entry point of PTPN performance bound solver
 """
 
 import os
+import json
+import time
 import click #CLI
 
-from src.net.PTPN import PTPN
-from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+#Light modules only: the net, the solver backend (cplex, scipy, numpy) and graphviz are
+#imported by the commands that use them, to keep the startup of the CLI fast
+from src.solver.LPsolver import LPsolver
+from src.solver.SolverProfile import SolverProfile
+from src.solver.SolverHistory import SolverHistory
+from src.solver.LPcache import LPcache
+from src.solver.ResultCache import ResultCache
+from src.perf.Profiler import Profiler
+from src.daemon.BoundClient import BoundClient
 
 def transition_exist(ptpn,tname):
     #Check existence of transition with name "tname" in "ptpn"
@@ -25,46 +34,142 @@ def get_transition_id(ptpn,tname):
             return tr.get_id()
     return -1
 
+def print_result(result):
+    #Format the bound computation results (BoundResult)
+    click.echo(f"Solution status: {result.get_status()} ({result.get_status_string()})")
+    click.echo(f"Throughput of {result.get_transition_name()}: {result.get_throughput()}")
+    if not result.is_live():
+        click.echo("The net is not live.")
+    elif result.get_cycle_time() != None:
+        click.echo(f"Min cycle time {result.get_transition_name()}: {result.get_cycle_time()}")
+        subnets = result.get_subnets()
+        for i in range(len(subnets)):
+            click.echo(f"Subnet {i+1}: cycle time {subnets[i]['cycle_time']}")
+    for d in result.get_diagnostics():
+        click.echo(f"Pre-check: {d}")
 
-@click.command()
+
+class DefaultGroup(click.Group):
+    #Group of commands where the single net bound computation is the default command:
+    #"ptpnbound NAME TNAME" is equivalent to "ptpnbound bound NAME TNAME"
+
+    def parse_args(self, ctx, args):
+        if args and args[0] not in self.commands and args[0] not in ('--help', '-h'):
+            args.insert(0, 'bound')
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultGroup)
+def ptpnbound():
+    """PTPN performance bounds: single net (bound, default command) or batch of nets (batch)"""
+
+
+@ptpnbound.command()
 @click.argument('name')
-@click.argument('tname')
+@click.argument('tname', required=False)
+@click.option('-a','--all', 'all_transitions', is_flag=True, default=False, help="Bounds of all the transitions (TNAME is not needed)")
+@click.option('-t','--table', type=str, help="Table of the bounds of all the transitions (json, or csv if the name ends with .csv)  [default: NAME_bounds.csv]")
 @click.option('-lp','--lpmodel', type=str, help="LP model files (CPLEX  models - lp format)")
+@click.option('-f','--lpformat', type=click.Choice(['lp','mps']), default='lp', show_default=True, help="Format of the LP model files (CPLEX lp/free MPS)")
 @click.option('-lpo','--lpoutput', type=str, help="Result files (CPLEX model results - xml format)")
 @click.option('-o','--output', type=(str,str), help="Result file: name format (available formats: pnml, dot)")
+@click.option('-k','--subnets', type=int, default=1, show_default=True, help="Number of slowest subnets to rank")
+@click.option('-c','--cache', type=str, help="Cache directory of LP models and solutions")
+@click.option('--cache-size', type=int, default=256, show_default=True, help="Maximum size of the cache (MB)")
+@click.option('-r','--result-cache', type=str, help="Cache directory of the bound results (a hit skips the LPs)")
+@click.option('--result-cache-size', type=int, default=64, show_default=True, help="Maximum size of the result cache (MB)")
+@click.option('--result-cache-age', type=float, default=30, show_default=True, help="Maximum age of the result cache entries (days since the last use)")
+@click.option('-b','--backend', type=click.Choice(list(LPsolver.BACKENDS.keys())), default='cplex', show_default=True, help="LP solver backend")
+@click.option('--no-precheck', is_flag=True, default=False, help="Solve the LPs even if the structural pre-check proves a zero throughput")
+@click.option('-d','--decompose', is_flag=True, default=False, help="Solve the connected components of the net apart (LP export, caches and verbose output not available)")
+@click.option('-j','--jobs', type=int, default=os.cpu_count(), show_default=True, help="Number of worker processes of --decompose (one component per worker)")
+@click.option('-s','--solver-profile', type=click.Choice(list(SolverProfile.PRESETS.keys())), default='default', show_default=True, help="Solver profile (LP method, tolerances, log); auto: chosen from the LP size and the solution history")
+@click.option('--threads', type=int, help="Number of solver threads (0: chosen by the solver)")
+@click.option('--time-limit', type=float, help="Solver time limit (seconds)")
+@click.option('--solver-history', type=str, help="Solution history file of the auto profile (default: ~/.ptpnbound/solver_history.json)")
+@click.option('--profile', 'profile_file', type=str, help="Per-phase timing profile file (JSON)")
+@click.option('--memory', is_flag=True, default=False, help="Per-phase memory accounting in the profile (tracemalloc/RSS)")
+@click.option('--memory-budget', type=int, help="Memory budget (MB): warns when a stage is predicted to exceed it")
+@click.option('-l','--log', is_flag=True, default=False, help="Print the solver progress and the CPLEX log")
 @click.option('-v','--verbose', is_flag=True, show_default=True, default=False, help="Print results to stdin")
-def ptpnbound(name, tname, lpmodel, lpoutput, output, verbose):
+def bound(name, tname, all_transitions, table, lpmodel, lpformat, lpoutput, output, subnets, cache, cache_size, result_cache, result_cache_size, result_cache_age, backend, no_precheck, decompose, jobs, solver_profile, threads, time_limit, solver_history, profile_file, memory, memory_budget, log, verbose):
+    """Bounds of transition TNAME (or of all the transitions) of the net NAME (pnml)"""
+
+    #Per-phase instrumentation (off by default)
+    profiler = None
+    if profile_file or memory or memory_budget != None:
+        profiler = Profiler(memory, memory_budget*1024*1024 if memory_budget != None else None).start()
 
     #Load net 
     filename = os.path.join(os.getcwd(), name + ".pnml")
     if not os.path.isfile(filename):
         click.echo(f"Oops!  The file {filename} does not exists. Terminate.")
     else:
+        from src.net.PTPN import PTPN
+        from src.solver.BoundResult import BoundResult
         click.echo(f"Loading PTPN net: {filename}")
         ptpn = PTPN(name)
         ptpn.import_pnml(filename)
-        if not transition_exist(ptpn,tname):
+        if all_transitions and tname == None and ptpn.get_transitions():
+            tname = ptpn.get_transitions()[0].get_name()
+        if tname == None:
+            click.echo("Oops!  Neither a transition nor --all has been given. Terminate.")
+        elif not transition_exist(ptpn,tname):
             click.echo(f"Oops!  The transition {tname} does not exists. Terminate.")
         else:
             tid = get_transition_id(ptpn,tname)
-            click.echo(f"Computing max throughput/min cycle time of transition: {tname}")
+            if all_transitions:
+                click.echo("Computing max throughput/min cycle time of all the transitions")
+            else:
+                click.echo(f"Computing max throughput/min cycle time of transition: {tname}")
+            history = SolverHistory(solver_history) if solver_profile == 'auto' else None
+            profile = SolverProfile.preset(solver_profile, threads=threads, time_limit=time_limit, history=history)
+            if decompose:
+                #Independent LPs of the connected components (solved in parallel)
+                from src.solver.ComponentSolver import ComponentSolver
+                lpgen = None
+                csolver = ComponentSolver(ptpn, jobs, profile, subnets, backend)
+                click.echo(f"{len(csolver.get_components())} connected components, {len(csolver.get_sccs())} strongly connected components")
             #Generate LP-max problem
-            lpgen = CPLEX_LPsolver(tname,tid,'max')
-            lpgen.populate_lp(ptpn)
+            lpcache = LPcache(cache, cache_size*1024*1024) if cache else None
+            #The LP models and solutions are not available after a result cache hit
+            rcache = None
+            if result_cache and not (lpmodel or lpoutput or verbose):
+                rcache = ResultCache(result_cache, result_cache_size*1024*1024, result_cache_age*24*3600)
+            #The LP models are exported even if the throughput is zero
+            precheck = not (no_precheck or lpmodel or lpoutput)
+            if not decompose:
+                lpgen = LPsolver.get_backend(backend)(tname,tid,'max',lpcache,profile,log,rcache,precheck)
+                lpgen.populate_lp(ptpn)
             #Solve LP
             click.echo("===============================================================")
-            lpgen.solve_lp(ptpn)
+            if all_transitions:
+                #The LP models are reused: only the objectives change between transitions
+                results = csolver.solve_all() if decompose else lpgen.solve_all(ptpn, subnets)
+                for result in results:
+                    click.echo(f"{result.get_transition_name()}: throughput {result.get_throughput()}, cycle time {result.get_cycle_time()}")
+                filename = os.path.join(os.getcwd(), table if table else name + "_bounds.csv")
+                BoundResult.write_table(results, filename)
+                click.echo(f"Table of the bounds saved: {filename}")
+            else:
+                result = csolver.solve(tname) if decompose else lpgen.solve_lp(ptpn)
+                #Rank the k slowest subnets (LP_CT re-solved with cuts)
+                if not decompose and subnets > 1 and result.get_cycle_time() != None:
+                    lpgen.rank_slowest_subnets(ptpn, subnets)
+                print_result(result)
+            #Save the solution times of the auto profile (once per run)
+            profile.save_history()
 
-            #Save lp models (CPLEX .lp format)
-            if lpmodel:
-                filename = os.path.join(os.getcwd(), name + "_lp_max_X.lp")
+            #Save lp models (CPLEX .lp format or free MPS format)
+            if lpmodel and lpgen != None:
+                filename = os.path.join(os.getcwd(), name + "_lp_max_X." + lpformat)
                 lpgen.export_lp(lpgen.get_LpmaxX(), filename)
                 if lpgen.get_LpminCT() != None:
-                    filename = os.path.join(os.getcwd(), name + "_lp_CT.lp")
+                    filename = os.path.join(os.getcwd(), name + "_lp_CT." + lpformat)
                     lpgen.export_lp(lpgen.get_LpminCT(), filename)
 
             #Save CPLEX model results (xml format)
-            if lpoutput:
+            if lpoutput and lpgen != None:
                 filename = os.path.join(os.getcwd(), name + "_lp_max_X_sol.xml")
                 lpgen.export_lp_solution(lpgen.get_LpmaxX(), filename)
                 if lpgen.get_LpminCT() != None:
@@ -85,12 +190,203 @@ def ptpnbound(name, tname, lpmodel, lpoutput, output, verbose):
                 else:
                     click.echo(f"{output[1]} is not a valid format")
 
-            #Print solutions on stdin
-            if verbose:
+            #Print solutions on stdin (last transition in --all mode)
+            if verbose and lpgen != None:
                 lpgen.print_lp_solution(ptpn,'max')
                 if lpgen.get_LpminCT() != None:
                     lpgen.print_lp_solution(ptpn,'min')
 
+    #Save the per-phase profile (json format)
+    if profiler:
+        profiler.stop()
+        if profile_file:
+            filename = os.path.join(os.getcwd(), profile_file)
+            profiler.save(filename)
+            click.echo(f"Profile saved: {filename}")
+        if verbose:
+            profiler.print_report()
+
+
+@ptpnbound.command()
+@click.argument('manifest')
+@click.option('-w','--workers', type=int, default=os.cpu_count(), show_default=True, help="Number of worker processes (the transitions of the nets are split among them)")
+@click.option('-o','--output', type=str, default="batch_results.json", show_default=True, help="Consolidated results file (json, or csv if the name ends with .csv)")
+@click.option('-k','--subnets', type=int, default=1, show_default=True, help="Number of slowest subnets to rank")
+@click.option('-c','--cache', type=str, help="Cache directory of LP models and solutions")
+@click.option('--cache-size', type=int, default=256, show_default=True, help="Maximum size of the cache (MB)")
+@click.option('-r','--result-cache', type=str, help="Cache directory of the bound results (a hit skips the LPs)")
+@click.option('--result-cache-size', type=int, default=64, show_default=True, help="Maximum size of the result cache (MB)")
+@click.option('--result-cache-age', type=float, default=30, show_default=True, help="Maximum age of the result cache entries (days since the last use)")
+@click.option('-s','--solver-profile', type=click.Choice([p for p in SolverProfile.PRESETS.keys() if p != 'auto']), default='quiet', show_default=True, help="Solver profile (LP method, tolerances, log)")
+@click.option('--threads', type=int, help="Number of solver threads per worker (default: 1 with several workers)")
+def batch(manifest, workers, output, subnets, cache, cache_size, result_cache, result_cache_size, result_cache_age, solver_profile, threads):
+    """Bounds of the nets and transitions of a MANIFEST (yaml or csv)"""
+    if not os.path.isfile(manifest):
+        click.echo(f"Oops!  The file {manifest} does not exists. Terminate.")
+        return
+    from src.batch.BatchRunner import BatchRunner
+    jobs = BatchRunner.read_manifest(manifest)
+    click.echo(f"Batch of {len(jobs)} nets, {sum(len(j['transitions']) for j in jobs)} transitions ({workers} workers)")
+    runner = BatchRunner(workers, solver_profile, threads, subnets, cache, cache_size,
+        result_cache, result_cache_size, result_cache_age)
+    results = runner.run(jobs)
+    for r in results:
+        if r['ok']:
+            click.echo(f"{os.path.basename(r['net'])} {r['transition']}: throughput {r['result']['throughput']}, cycle time {r['result']['cycle_time']}")
+        else:
+            click.echo(f"{os.path.basename(r['net'])} {r['transition']}: FAILED ({r['error']})")
+    filename = os.path.join(os.getcwd(), output)
+    BatchRunner.write_results(results, filename)
+    failed = len([r for r in results if not r['ok']])
+    click.echo(f"{len(results) - failed} jobs solved, {failed} failed. Results saved: {filename}")
+
+
+
+@ptpnbound.command()
+@click.argument('name')
+@click.option('-m','--max-basis', type=int, default=2000, show_default=True, help="Maximum number of rows of the basis of the Farkas algorithm")
+@click.option('-v','--verbose', is_flag=True, default=False, help="Print the semiflows")
+def semiflows(name, max_basis, verbose):
+    """Minimal P- and T-semiflows, conservativeness and consistency of the net NAME (pnml), without LPs"""
+    filename = os.path.join(os.getcwd(), name + ".pnml")
+    if not os.path.isfile(filename):
+        click.echo(f"Oops!  The file {filename} does not exists. Terminate.")
+        return
+    from src.net.PTPN import PTPN
+    from src.solver.ParamsExtractor import ParamsExtractor
+    from src.solver.SemiflowAnalyzer import SemiflowAnalyzer
+    ptpn = PTPN(name)
+    ptpn.import_pnml(filename)
+    pe = ParamsExtractor()
+    pe.retrieve_net_structure(ptpn)
+    analyzer = SemiflowAnalyzer(pe, max_basis)
+    #Names of the PTPN places/transitions (ids of the helper ones of the GSPN)
+    names = dict({o.get_id(): o.get_name() for o in ptpn.get_places() + ptpn.get_transitions()})
+    for kind, label, get, uncovered, prop in [('P', "P-semiflows", analyzer.get_p_semiflows, analyzer.uncovered_places, "conservative"),
+        ('T', "T-semiflows", analyzer.get_t_semiflows, analyzer.uncovered_transitions, "consistent")]:
+        try:
+            flows = get()
+        except Exception as exc:
+            click.echo(f"{label}: {exc}")
+            continue
+        click.echo(f"{len(flows)} minimal {label}")
+        if verbose:
+            for f in flows:
+                ids = analyzer.to_ids(f, kind)
+                click.echo("  " + " + ".join(f"{w}*{names.get(i, i)}" for i, w in sorted(ids.items())))
+        missing = uncovered()
+        if missing:
+            click.echo(f"The net is not {prop}: {len(missing)} not covered ({', '.join(names.get(i, i) for i in missing[:10])}{', ...' if len(missing) > 10 else ''})")
+        else:
+            click.echo(f"The net is {prop}")
+
+
+def parse_edits(param, marking, prob):
+    #Parameter edits of the client: TNAME.PARAM=VALUE, PNAME=M0, ARCID=PROB
+    edits = dict({'transitions': dict(), 'places': dict(), 'arcs': dict()})
+    for e in param:
+        key, value = e.split("=", 1)
+        tname, pname = key.rsplit(".", 1) #composite nets: dotted transition names
+        edits['transitions'].setdefault(tname, dict()).update({pname: float(value)})
+    for e in marking:
+        key, value = e.split("=", 1)
+        edits['places'].update({key: int(value)})
+    for e in prob:
+        key, value = e.split("=", 1)
+        edits['arcs'].update({key: float(value)})
+    return edits if any(edits.values()) else None
+
+
+@ptpnbound.command()
+@click.option('--host', type=str, default=BoundClient.HOST, show_default=True, help="Host address of the daemon")
+@click.option('-p','--port', type=int, default=BoundClient.PORT, show_default=True, help="Port of the daemon")
+@click.option('-n','--max-nets', type=int, default=8, show_default=True, help="Maximum number of nets kept in memory (LRU eviction)")
+@click.option('-s','--solver-profile', type=click.Choice([p for p in SolverProfile.PRESETS.keys() if p != 'auto']), default='quiet', show_default=True, help="Solver profile (LP method, tolerances, log)")
+@click.option('-v','--verbose', is_flag=True, default=False, help="Print the requests")
+def serve(host, port, max_nets, solver_profile, verbose):
+    """Local daemon keeping the nets and their LP models in memory (HTTP/JSON API)"""
+    from src.daemon.BoundServer import BoundServer
+    server = BoundServer(max_nets, solver_profile, verbose)
+    server.serve(host, port, lambda address: click.echo(f"Serving on http://{address[0]}:{address[1]} (stop with Ctrl-C or ptpnbound client --shutdown)"))
+
+
+@ptpnbound.command()
+@click.argument('name', required=False)
+@click.argument('tname', required=False)
+@click.option('-a','--all', 'all_transitions', is_flag=True, default=False, help="Bounds of all the transitions")
+@click.option('--param', type=str, multiple=True, help="Edit of a transition parameter: TNAME.PARAM=VALUE (repeatable)")
+@click.option('--marking', type=str, multiple=True, help="Edit of an initial marking: PNAME=VALUE (repeatable)")
+@click.option('--prob', type=str, multiple=True, help="Edit of an arc probability: ARCID=VALUE (repeatable)")
+@click.option('--reload', is_flag=True, default=False, help="Discard the edits of the net NAME in the daemon")
+@click.option('--status', is_flag=True, default=False, help="Print the status of the daemon")
+@click.option('--shutdown', is_flag=True, default=False, help="Stop the daemon")
+@click.option('-u','--url', type=str, default=f"http://{BoundClient.HOST}:{BoundClient.PORT}", show_default=True, help="URL of the daemon")
+def client(name, tname, all_transitions, param, marking, prob, reload, status, shutdown, url):
+    """Bounds of transition TNAME (or of all the transitions) of the net NAME computed by the daemon"""
+    bclient = BoundClient(url)
+    try:
+        if status:
+            click.echo(json.dumps(bclient.status(), indent=1))
+        if name and reload:
+            bclient.reload(name)
+        if name and (tname or all_transitions):
+            response = bclient.bound(name, tname, all_transitions, parse_edits(param, marking, prob))
+            if not response['ok']:
+                click.echo(f"Oops!  {response['error']}. Terminate.")
+            else:
+                for r in response['results']:
+                    click.echo(f"{r['transition']}: throughput {r['throughput']}, cycle time {r['cycle_time']}")
+        elif name and (param or marking or prob):
+            bclient.edit(name, parse_edits(param, marking, prob))
+        if shutdown:
+            bclient.shutdown()
+    except OSError as exc:
+        click.echo(f"Oops!  The daemon {url} is not reachable ({exc}). Terminate.")
+
+
+@ptpnbound.command()
+@click.argument('name')
+@click.argument('tname')
+@click.option('-i','--interval', type=float, default=0.5, show_default=True, help="Polling interval of the net file (seconds)")
+@click.option('-k','--subnets', type=int, default=1, show_default=True, help="Number of slowest subnets to rank")
+@click.option('-d','--dot', type=str, help="DOT view of the net with the bounds, refreshed after each change (name)")
+@click.option('-s','--solver-profile', type=click.Choice([p for p in SolverProfile.PRESETS.keys() if p != 'auto']), default='quiet', show_default=True, help="Solver profile (LP method, tolerances, log)")
+def watch(name, tname, interval, subnets, dot, solver_profile):
+    """Bounds of transition TNAME re-computed whenever the net NAME (pnml) changes"""
+    filename = os.path.join(os.getcwd(), name + ".pnml")
+    if not os.path.isfile(filename):
+        click.echo(f"Oops!  The file {filename} does not exists. Terminate.")
+        return
+    from src.daemon.NetWatcher import NetWatcher
+    dotfile = os.path.join(os.getcwd(), dot + ".dot") if dot else None
+    watcher = NetWatcher(filename, tname, SolverProfile.preset(solver_profile), subnets, dotfile)
+    try:
+        result = watcher.load()
+    except Exception as exc:
+        click.echo(f"Oops!  {exc}. Terminate.")
+        return
+    click.echo(f"Watching {filename} (stop with Ctrl-C)")
+    print_result(result)
+
+    def refreshed(update):
+        if update['kind'] == NetWatcher.UNCHANGED:
+            change = "no change of the LP model"
+        elif update['kind'] == NetWatcher.PARAMETERS:
+            change = f"parameters changed ({update['changes']} LP coefficients updated)"
+        else:
+            change = "structure changed (LP rebuilt)"
+        click.echo("===============================================================")
+        click.echo(f"{time.strftime('%H:%M:%S')} {change}: updated in {update['elapsed']:.3f} s")
+        print_result(update['result'])
+
+    def failed(exc):
+        click.echo(f"{time.strftime('%H:%M:%S')} Oops!  {exc}. Waiting for the next change.")
+
+    try:
+        watcher.watch(refreshed, interval, failed)
+    except KeyboardInterrupt:
+        click.echo("Stopped.")
+
 
 
 if __name__ == '__main__':
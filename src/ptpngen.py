@@ -0,0 +1,46 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+Entry point of the synthetic PTPN generator (benchmarking)
+"""
+
+import os
+import click #CLI
+
+from src.generator.PTPNgenerator import PTPNgenerator
+
+def parse_time_functions(mix):
+    #"exponential:2,constant:1" -> {'exponential': 2.0, 'constant': 1.0}
+    time_functions = dict()
+    for item in mix.split(","):
+        tf, _, weight = item.partition(":")
+        time_functions.update({tf.strip(): float(weight) if weight else 1.0})
+    return time_functions
+
+
+@click.command()
+@click.argument('family', type=click.Choice(PTPNgenerator.FAMILIES))
+@click.argument('name')
+@click.option('-n','--size', type=int, default=10, show_default=True, help="Approximate number of nodes (places and transitions)")
+@click.option('-s','--seed', type=int, help="Seed of the random generator")
+@click.option('-m','--tokens', type=int, default=1, show_default=True, help="Number of tokens (jobs) of the initial marking")
+@click.option('-t','--time-functions', type=str, default="exponential", show_default=True, help="Mix of time functions, e.g., exponential:2,constant:1")
+@click.option('--outcomes', type=int, default=2, show_default=True, help="Outcomes of the distributions (ECS size), freechoice")
+@click.option('--prob-ratio', type=float, default=0.3, show_default=True, help="Fraction of transitions with probabilistic routing, freechoice")
+@click.option('--conflict-ratio', type=float, default=0.1, show_default=True, help="Fraction of places with a timed conflict, freechoice")
+@click.option('--branches', type=int, default=4, show_default=True, help="Number of parallel branches, forkjoin")
+@click.option('--resources', type=int, default=2, show_default=True, help="Number of shared resources, pipeline")
+@click.option('--capacity', type=int, default=1, show_default=True, help="Units of each shared resource, pipeline")
+def ptpngen(family, name, size, seed, tokens, time_functions, outcomes, prob_ratio, conflict_ratio, branches, resources, capacity):
+
+    filename = os.path.join(os.getcwd(), name + ".pnml")
+    gen = PTPNgenerator(seed, parse_time_functions(time_functions), outcomes, prob_ratio, conflict_ratio)
+    elements = gen.generate(family, size, tokens, branches, resources, capacity)
+    counts = gen.write_pnml(elements, filename)
+    click.echo(f"PTPN {family} net generated: {filename}")
+    click.echo(f"Places: {counts['places']}, transitions: {counts['transitions']}, arcs: {counts['arcs']}")
+    click.echo("Transition of reference (e.g.): T0")
+
+
+if __name__ == '__main__':
+    ptpngen()
@@ -0,0 +1,198 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import csv
+import json
+import numpy
+
+class BoundResult:
+	"""
+	Result of the bound computation of a reference transition:
+	- LP max X: status, throughput bound and solution vector [M, s, x] (GSPN dok ids)
+	- LP min CT: status, cycle time bound, visit ratios and solution vector y (GSPN dok ids)
+	- slowest subnet (place/transition ids of the PTPN) and ranking of the slowest subnets
+	"""
+
+	def __init__(self, tr_name, tr_id, pid_to_dokid, tid_to_dokid):
+		self.__tr_name = tr_name
+		self.__tr_id = tr_id
+		self.__pid_to_dokid = pid_to_dokid
+		self.__tid_to_dokid = tid_to_dokid
+		self.__status = None #status of LP max X (solver code)
+		self.__status_string = None
+		self.__throughput = None
+		self.__x = None #numpy.ndarray
+		self.__ct_status = None #status of LP min CT (solver code)
+		self.__cycle_time = None
+		self.__visit_ratios = None #numpy.ndarray
+		self.__y = None #numpy.ndarray
+		self.__subnet = None #{'places': [ids], 'trans': [ids]}
+		self.__subnets = [] #[{'places': [ids], 'trans': [ids], 'cycle_time'}]
+		self.__diagnostics = [] #messages of the structural pre-check
+
+	def get_transition_name(self):
+		return self.__tr_name
+
+	def get_transition_id(self):
+		return self.__tr_id
+
+	def set_lpX_solution(self, status, status_string, throughput, values):
+		self.__status = status
+		self.__status_string = status_string
+		self.__throughput = throughput
+		self.__x = numpy.asarray(values, dtype=float) if values is not None else None
+
+	def set_lpCT_solution(self, status, cycle_time, values):
+		self.__ct_status = status
+		self.__cycle_time = cycle_time
+		self.__y = numpy.asarray(values, dtype=float)
+
+	def set_visit_ratios(self, v):
+		self.__visit_ratios = numpy.asarray(v, dtype=float)
+
+	def set_subnet(self, subnet):
+		"""subnet: {'places': set of Place, 'trans': set of Transition}"""
+		self.__subnet = BoundResult.__subnet_ids(subnet)
+
+	def set_subnets(self, subnets):
+		"""subnets: [{'places', 'trans', 'cycle_time'}] (ranking)"""
+		self.__subnets = []
+		for s in subnets:
+			ids = BoundResult.__subnet_ids(s)
+			ids.update({'cycle_time': s['cycle_time']})
+			self.__subnets.append(ids)
+
+	@staticmethod
+	def __subnet_ids(subnet):
+		return dict({'places': sorted(p.get_id() for p in subnet['places']),
+			'trans': sorted(t.get_id() for t in subnet['trans'])})
+
+	def get_status(self):
+		return self.__status
+
+	def get_status_string(self):
+		return self.__status_string
+
+	def get_throughput(self):
+		return self.__throughput
+
+	def get_ct_status(self):
+		return self.__ct_status
+
+	def get_cycle_time(self):
+		return self.__cycle_time
+
+	def is_live(self):
+		return self.__throughput != None and self.__throughput > 0
+
+	def get_x(self):
+		"""Solution vector of LP max X: markings M, firings s, throughputs x"""
+		return self.__x
+
+	def get_y(self):
+		"""Solution vector of LP min CT (P-semiflow of the slowest subnet)"""
+		return self.__y
+
+	def get_visit_ratios(self):
+		return self.__visit_ratios
+
+	def get_marking(self):
+		return self.__x[:len(self.__pid_to_dokid)] if self.__x is not None else None
+
+	def get_throughputs(self):
+		n = len(self.__pid_to_dokid) + len(self.__tid_to_dokid)
+		return self.__x[n:] if self.__x is not None else None
+
+	def get_throughput_of(self, tid):
+		"""Throughput of the transition with (PTPN or GSPN) id tid"""
+		return self.get_throughputs()[self.__tid_to_dokid[tid]]
+
+	def get_visit_ratio_of(self, tid):
+		return self.__visit_ratios[self.__tid_to_dokid[tid]]
+
+	def get_pid_to_dokid(self):
+		return self.__pid_to_dokid
+
+	def get_tid_to_dokid(self):
+		return self.__tid_to_dokid
+
+	def get_subnet(self):
+		return self.__subnet
+
+	def get_subnets(self):
+		return self.__subnets
+
+	def set_diagnostics(self, diagnostics):
+		self.__diagnostics = diagnostics
+
+	def get_diagnostics(self):
+		return self.__diagnostics
+
+	def to_dict(self, vectors=False):
+		"""Serializable (json) representation; vectors: include the solution vectors"""
+		result = dict({'transition': self.__tr_name, 'transition_id': self.__tr_id,
+			'status': self.__status, 'status_string': self.__status_string,
+			'throughput': self.__throughput, 'ct_status': self.__ct_status, 'cycle_time': self.__cycle_time,
+			'subnet': self.__subnet, 'subnets': self.__subnets, 'diagnostics': self.__diagnostics})
+		if vectors:
+			for k, v in [('x', self.__x), ('y', self.__y), ('visit_ratios', self.__visit_ratios)]:
+				result.update({k: v.tolist() if v is not None else None})
+		return result
+
+	@staticmethod
+	def from_dict(result, pid_to_dokid, tid_to_dokid):
+		"""BoundResult of its dictionary (to_dict): the solution vectors are restored only if included"""
+		r = BoundResult(result['transition'], result['transition_id'], pid_to_dokid, tid_to_dokid)
+		r.__status = result['status']
+		r.__status_string = result['status_string']
+		r.__throughput = result['throughput']
+		r.__ct_status = result['ct_status']
+		r.__cycle_time = result['cycle_time']
+		r.__subnet = result['subnet']
+		r.__subnets = result['subnets']
+		r.__diagnostics = result.get('diagnostics', [])
+		for k, v in [('x', result.get('x')), ('y', result.get('y')), ('visit_ratios', result.get('visit_ratios'))]:
+			if v != None:
+				setattr(r, "_BoundResult__" + k, numpy.asarray(v, dtype=float))
+		return r
+
+	@staticmethod
+	def write_table(results, filename):
+		"""Table of the bounds of several transitions: JSON, or CSV (without subnets) if filename ends with .csv"""
+		if filename.endswith(".csv"):
+			fields = ['transition', 'transition_id', 'status', 'throughput', 'cycle_time', 'subnet_places', 'subnet_trans']
+			with open(filename, "w", newline='') as f:
+				writer = csv.DictWriter(f, fieldnames=fields)
+				writer.writeheader()
+				for r in results:
+					subnet = r.get_subnet() if r.get_subnet() != None else dict({'places': [], 'trans': []})
+					writer.writerow(dict({'transition': r.get_transition_name(), 'transition_id': r.get_transition_id(),
+						'status': r.get_status(), 'throughput': r.get_throughput(), 'cycle_time': r.get_cycle_time(),
+						'subnet_places': " ".join(subnet['places']), 'subnet_trans': " ".join(subnet['trans'])}))
+		else:
+			with open(filename, "w") as f:
+				json.dump([r.to_dict() for r in results], f, indent=1)
+
+	@staticmethod
+	def critical_subnets(results, ptpn):
+		"""
+		Slowest subnets of several transitions of the PTPN (result dictionaries, to_dict): the
+		rankings (or the slowest subnet) of all of them, without duplicates (the largest cycle
+		time is kept), ranked by cycle time. Returns [{'places', 'trans', 'cycle_time'}]
+		"""
+		trans = dict({t.get_id(): t for t in ptpn.get_transitions()})
+		places = dict({p.get_id(): p for p in ptpn.get_places()})
+		subnets = dict() #{(place ids, transition ids): subnet}
+		for res in results:
+			ranking = res['subnets'] if res['subnets'] else ([dict(res['subnet'], cycle_time=res['cycle_time'])] if res['subnet'] else [])
+			for s in ranking:
+				if s['cycle_time'] == None:
+					continue
+				key = (tuple(s['places']), tuple(s['trans']))
+				if key not in subnets or subnets[key]['cycle_time'] < s['cycle_time']:
+					subnets.update({key: dict({'places': set(places[p] for p in s['places']),
+						'trans': set(trans[t] for t in s['trans']), 'cycle_time': s['cycle_time']})})
+		return sorted(subnets.values(), key=lambda s: -s['cycle_time'])
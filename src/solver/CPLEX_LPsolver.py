@@ -5,36 +5,80 @@
 #from typing import List
 
 
+import os
+import time
+import heapq #ranking of the slowest subnets
+import numpy
 import cplex
 from cplex.exceptions import CplexError
-from scipy.sparse import dok_array #sparse array
 from src.solver.LPsolver import LPsolver
 from src.solver.ParamsExtractor import ParamsExtractor
+from src.solver.LPbuilder import LPbuilder
+from src.solver.ModularLPbuilder import ModularLPbuilder
+from src.solver.LPmodel import LPmodel
+from src.solver.BoundResult import BoundResult
+from src.solver.SolverProfile import SolverProfile
+from src.solver.StructuralCheck import StructuralCheck
+from src.perf.Profiler import Profiler
 from src.net.PTPN import PTPN
 
 class CPLEX_LPsolver(LPsolver):
-	"""Uses CPLEX API"""
+	"""
+	Uses CPLEX API.
+	The progress messages and the CPLEX log are printed only in verbose mode: the results
+	are returned by solve_lp (BoundResult).
+	"""
 
-	def __init__(self, tr_name, tr_id, type_of_prob):
+	BACKEND = "cplex"
+
+	def __init__(self, tr_name, tr_id, type_of_prob, cache=None, profile=None, verbose=False, results=None, precheck=True):
 		self.__tr_name = tr_name
 		self.__tr_id = tr_id
 		#Type of problem: min/max
 		self.__prob_type = type_of_prob
-		self.__prob = cplex.Cplex() #LP max X
+		self.__verbose = verbose
+		self.__prob = self.__new_problem() #LP max X
 		self.__ct_prob = None #LP min CT
+		#Optimal solutions {'status','objective','values'} of LP max X / LP min CT
+		self.__x_sol = None
+		self.__ct_sol = None
 		self.__pe = ParamsExtractor()
+		self.__builder = None #LPbuilder
+		#Solver-independent LP models (LPmodel) of LP max X / LP min CT
+		self.__lpX = None
+		self.__lpCT = None
+		#On-disk cache of LP models and solutions (LPcache)
+		self.__cache = cache
+		self.__cache_key = None
+		self.__cache_hit = None #entry path with the same key
+		self.__cache_similar = None #entry path with the same structure (warm start)
+		#On-disk cache of the bound results (ResultCache): a hit skips the LPs
+		self.__results = results
+		self.__results_key = None
+		self.__results_hit = None #result dictionary with the same key
+		self.__loaded = False #LP max X loaded in the CPLEX problem
+		#Structural pre-check (StructuralCheck): the LPs are skipped if the throughput is zero
+		self.__precheck = precheck
+		self.__check = None
+		#Solver configuration (SolverProfile)
+		self.__profile = profile if profile != None else SolverProfile()
+		if self.__profile.get_history() != None and self.__profile.get_history().get_error() != None:
+			self.__log(self.__profile.get_history().get_error())
+		self.__result = None #BoundResult
 		##############################################################
 
 	def populate_lp(self, ptpn: PTPN):
 		#print("LP population of a ", self.__prob_type, " problem.")		
 		
 		#retrieve_net_structure(self, ptpn : PTPN)
-		self.__pe.retrieve_net_structure(ptpn)
+		self.__pe, self.__builder = self.__new_builder(ptpn)
+		if self.__precheck:
+			self.__check = StructuralCheck(self.__pe, self.__builder.get_ecs())
 
 		#set problem name
 		self.__prob.objective.set_name("obj" + self.__tr_name)
 		#Debug
-		print("Problem name:", self.__prob.objective.get_name())
+		self.__log("Problem name:", self.__prob.objective.get_name())
 
 		#set type of problem
 		if self.__prob_type == "min":
@@ -46,46 +90,214 @@ class CPLEX_LPsolver(LPsolver):
 		#Debug
 		#print("Problem objective sense: ", self.__prob.objective.sense[self.__prob.objective.get_sense()])					
 
-		self.__generate_lpX()
+		if self.__results != None:
+			self.__lookup_result()
+		if self.__results_hit == None and not self.__is_zero():
+			self.__load_lpX()
+		##############################################################
+
+	def __new_builder(self, ptpn: PTPN):
+		#GSPN and LP builder of the net: a composite net is assembled from the (cached) fragments of its modules
+		if ptpn.get_modules():
+			builder = ModularLPbuilder(ptpn, self.__verbose)
+			return builder.get_pe(), builder
+		pe = ParamsExtractor()
+		pe.retrieve_net_structure(ptpn)
+		return pe, LPbuilder(pe, self.__verbose)
+		##############################################################
+
+	def __is_zero(self):
+		#The structural pre-check proves that the throughput of the reference transition is zero
+		return self.__check != None and self.__check.is_zero(self.__tr_id)
+		##############################################################
+
+	def __load_lpX(self):
+		#Load the LP max X model in the CPLEX problem: from the cache, if any, or generated
+		if self.__cache != None:
+			skey, self.__cache_key = self.__cache.make_keys(self.__pe, self.__tr_id, CPLEX_LPsolver.BACKEND)
+			self.__cache_hit = self.__cache.lookup(self.__cache_key)
+			if self.__cache_hit == None:
+				self.__cache_similar = self.__cache.lookup_similar(skey)
+		if self.__cache_hit != None:
+			#Skip the LP generation: the model is loaded from the cache
+			self.__log("LP model loaded from the cache: ", self.__cache_hit)
+			self.__prob.read(os.path.join(self.__cache_hit, "lp_max_X.sav"))
+		else:
+			if Profiler.get_active() != None:
+				Profiler.check_budget("lp_build_X", Profiler.estimate_lp(*self.__builder.estimate_lpX()))
+			self.__generate_lpX()
+		self.__loaded = True
+		##############################################################
+
+	def __lookup_result(self):
+		#Result of the reference transition in the result cache
+		self.__results_key = self.__results.make_key(self.__pe, self.__tr_id, CPLEX_LPsolver.BACKEND, self.__profile.get_settings())
+		self.__results_hit = self.__results.get(self.__results_key)
+		if self.__results_hit != None:
+			self.__log("Result loaded from the result cache: ", self.__results_key)
 		##############################################################
 
 	def solve_lp(self, ptpn: PTPN):
-		#Solve the model
-		print("Solving the LP problem...")
+		"""Solves LP max X and, if the net is live, LP min CT; returns the BoundResult"""
+		if self.__results_hit != None:
+			#Skip the LPs: the result is loaded from the result cache
+			return self.__load_result(ptpn)
+		if self.__is_zero():
+			#Skip the LPs: the net is not live for the reference transition
+			return self.__zero_result(ptpn)
+		if not self.__loaded:
+			self.__load_lpX()
+		self.__log("Solving the LP problem...")
+		self.__result = BoundResult(self.__tr_name, self.__tr_id, self.__pe.get_pid_to_dokid(), self.__pe.get_tid_to_dokid())
+		if self.__check != None:
+			self.__result.set_diagnostics(self.__check.diagnose(self.__tr_id))
 
 		try:
-			self.__prob.solve()
+			if self.__cache_hit != None:
+				#Skip the solution: the optimal solution is loaded from the cache
+				results = self.__cache.load_results(self.__cache_hit)
+				self.__x_sol = results['X']
+			else:
+				if self.__cache_similar != None:
+					#Warm start from the optimal basis of a model with the same structure
+					self.__read_basis(self.__prob, os.path.join(self.__cache_similar, "lp_max_X.bas"))
+				self.__solve(self.__prob, lp="X")
+				self.__x_sol = self.__get_solution(self.__prob)
 			#Debug: display solutions
-			print("====================================================")
-			print("Solution status: ", self.__prob.solution.get_status()) # 1=optimal solution found
-			print("Throughput of ", self.__tr_name, ":" ,self.__prob.solution.get_objective_value())				
+			self.__log("====================================================")
+			self.__log("Solution status: ", self.__x_sol['status']) # 1=optimal solution found
+			self.__log("Throughput of ", self.__tr_name, ":" ,self.__x_sol['objective'])
+			self.__result.set_lpX_solution(self.__x_sol['status'], self.__x_sol.get('status_string'),
+				self.__x_sol['objective'], self.__x_sol['values'])
 			#Update PTPN
 			self.__update_net(ptpn,"X")
 			
 		except CplexError as exc:
 			raise
 
-		if self.__prob.solution.get_objective_value() > 0: 
-			#Identification of the reference transitions (from tr_name->tr_id->tr_dokid)
-			tid2dokid = self.__pe.get_tid_to_dokid()
-			trans = ptpn.get_transitions()
-			values = self.__prob.solution.get_values()
-			for k in tid2dokid.keys():
-				tr_name = self.__get_name(trans,k)
-				if tr_name == self.__tr_name:
-					t_ref=tid2dokid[k] 
+		if self.__x_sol['objective'] > 0: 
+			#Identification of the reference transitions (tr_id->tr_dokid)
+			t_ref = self.__pe.get_tid_to_dokid()[self.__tr_id]
+			values = self.__x_sol['values']
 			#Identification of the slowest subnet		
 			self.__identify_critical_subnet(values, t_ref, ptpn)
 		else:
-			print("The net is not live.")
+			self.__log("The net is not live.")
+		if self.__cache != None and self.__cache_hit == None:
+			self.__store_in_cache()
+		if self.__results != None:
+			self.__store_result()
+		return self.__result
 		##############################################################
 
+	def set_reference(self, tr_name, tr_id):
+		"""
+		Changes the reference transition of the populated LP max X: only the objective changes,
+		the model (and the optimal basis of the last solution, used as warm start) is kept.
+		"""
+		np = len(self.__pe.get_pid_to_dokid())
+		nt = len(self.__pe.get_tid_to_dokid())
+		tid2dokid = self.__pe.get_tid_to_dokid()
+		old = np + nt + tid2dokid[self.__tr_id]
+		new = np + nt + tid2dokid[tr_id]
+		if self.__loaded:
+			self.__prob.objective.set_linear(([(old, 0.0)] if old != new else []) + [(new, 1.0)])
+		self.__prob.objective.set_name("obj" + tr_name)
+		if self.__lpX != None:
+			obj = numpy.zeros(self.__lpX.get_num_vars())
+			obj[new] = 1.0
+			self.__lpX.set_obj(obj)
+		self.__tr_name = tr_name
+		self.__tr_id = tr_id
+		self.__x_sol = None
+		self.__ct_sol = None
+		self.__result = None
+		if self.__cache != None and self.__loaded:
+			_, self.__cache_key = self.__cache.make_keys(self.__pe, tr_id, CPLEX_LPsolver.BACKEND)
+			self.__cache_hit = self.__cache.lookup(self.__cache_key)
+			self.__cache_similar = None #the last solution is the warm start
+		if self.__results != None:
+			self.__lookup_result()
+		##############################################################
+
+	def update_lp(self, ptpn: PTPN):
+		"""
+		Updates the populated LP max X after a change of the net parameters (delays, routing
+		probabilities, initial marking). The model is rebuilt and compared with the current one
+		(LPmodel.diff): if the structure is unchanged only the changed coefficients, right-hand
+		sides and bounds are set in the solver problem, which keeps its optimal basis (warm
+		re-solve); otherwise the problem is reloaded. The LP min CT is rebuilt at the next solution.
+		Returns the changes set in place (LPmodel.diff) or None if the problem has been reloaded.
+		"""
+		pe, builder = self.__new_builder(ptpn)
+		if self.__precheck:
+			self.__check = StructuralCheck(pe, builder.get_ecs())
+		changes = None
+		if self.__loaded:
+			lpX = builder.build_lpX(pe.get_tid_to_dokid()[self.__tr_id], "obj" + self.__tr_name, self.__prob_type)
+			changes = self.__lpX.diff(lpX) if self.__lpX != None else None
+			if changes != None:
+				self.__apply_changes(self.__prob, changes)
+				self.__log("LP model updated: ", sum(len(c) for c in changes.values()), " changes")
+			else:
+				self.__prob = self.__new_problem()
+				self.__load_model(self.__prob, lpX)
+				self.__log("LP model reloaded: the structure of the net has changed")
+			self.__lpX = lpX
+		self.__pe = pe
+		self.__builder = builder
+		self.__lpCT = None
+		self.__ct_prob = None
+		self.__x_sol = None
+		self.__ct_sol = None
+		self.__result = None
+		if self.__cache != None and self.__loaded:
+			skey, self.__cache_key = self.__cache.make_keys(self.__pe, self.__tr_id, CPLEX_LPsolver.BACKEND)
+			self.__cache_hit = self.__cache.lookup(self.__cache_key)
+			self.__cache_similar = None #the last solution is the warm start
+		if self.__results != None:
+			self.__lookup_result()
+		return changes
+		##############################################################
+
+	def solve_all(self, ptpn: PTPN, subnets=1):
+		"""
+		Bounds of all the transitions of the PTPN (helper transitions of the GSPN excluded).
+		The populated LP max X and the LP min CT models are reused: for each transition only
+		the objectives change and the problems are re-solved from the last optimal basis.
+		The slowest subnets of all the transitions, ranked by cycle time, are set in the PTPN.
+		Returns the list of BoundResult (one per transition).
+		"""
+		results = []
+		for tr in ptpn.get_transitions():
+			if tr.get_id() != self.__tr_id or self.__result != None:
+				self.set_reference(tr.get_name(), tr.get_id())
+			result = self.solve_lp(ptpn)
+			if subnets > 1 and result.get_cycle_time() != None:
+				self.rank_slowest_subnets(ptpn, subnets)
+			results.append(result)
+		ptpn.set_critical_subnets(BoundResult.critical_subnets([r.to_dict() for r in results], ptpn))
+		return results
+		##############################################################
+
+	@Profiler.timed("export_lp")
 	def export_lp(self, pb, aFilename):
 		#print("Export generated LP")
-		pb.write(aFilename)
+		#The solver-independent model is written if available (.mps: free MPS, LP format otherwise)
+		model = self.__lpX if pb is self.__prob else (self.__lpCT if pb is self.__ct_prob else None)
+		if model == None:
+			pb.write(aFilename)
+		elif aFilename.endswith(".mps"):
+			model.write_mps(aFilename)
+		else:
+			model.write_lp(aFilename)
 		##############################################################
 
+	@Profiler.timed("export_lp_solution")
 	def export_lp_solution(self, pb, aFilename):
+		if pb.solution.get_status() == 0:
+			#Model loaded from the cache (not solved): the optimal basis is loaded with the model
+			pb.solve()
 		pb.solution.write(aFilename)
 		##############################################################
 
@@ -96,6 +308,10 @@ class CPLEX_LPsolver(LPsolver):
 			self.__print_lp_min_CT_solution(ptpn)
 		##############################################################
 
+	def get_result(self):
+		return self.__result
+		##############################################################
+
 	def get_LpmaxX(self):
 		return self.__prob 
 		##############################################################
@@ -104,151 +320,257 @@ class CPLEX_LPsolver(LPsolver):
 		return self.__ct_prob
 		##############################################################
 
-	def __check_conflict(self, tr, ecs, B):
-		np = B.shape[0]
-		i=0
-		input_tr = set() #input set of tr
-		input_ecs = set() #input set of ecs
-		while i < np:
-			if B[i,tr] > 0:
-				input_tr.add(i)
-			for t in ecs:
-				if B[i,t] > 0:
-					input_ecs.add(i)
-			i += 1
-			#Equal conflic sets condition
-		return input_tr == input_ecs
-		#Extended conflic sets condition
-		#intersection = input_tr.intersection(input_ecs)
-		#return True if len(intersection) > 0 else False 
-		##############################################################
-
-	def __compute_ecs(self):
-		B = self.__pe.get_b()
-		nt = B.shape[1]
-		tr_set = {t for t in range(1,nt)}
-		ecs = dict({0:{0}})
-		while len(tr_set)>0: #over the set of transitions
-			t1 = tr_set.pop()
-			found = False
-			k = 0
-			while not found and k<len(ecs.keys()):
-				if self.__check_conflict(t1,ecs[k],B):
-					ecs[k].add(t1)
-					found = True
-				else:
-					k += 1
-			if not found:
-				ecs.update({k: {t1}})
-		return ecs
+	def get_LpmaxX_model(self):
+		return self.__lpX
 		##############################################################
 
-	def __check_normalize(self, ecs, w):
-		sum_of_weights = 0.0
-		for t in ecs:
-			sum_of_weights += w[t,0]
-		if sum_of_weights != 1.0:
-			for t in ecs:
-				w[t,0] = w[t,0] / sum_of_weights #normalize
-			print("The sum of weights in the ecs ", ecs, " has been normalized")
+	def get_LpminCT_model(self):
+		return self.__lpCT
 		##############################################################
 
-	def __generate_lpX(self):
+	@Profiler.timed("subnet_ranking")
+	def rank_slowest_subnets(self, ptpn: PTPN, k):
+		"""
+		Ranks the k slowest subnets (P-semiflows) by decreasing cycle time.
+		It reuses the solved LP_CT model: the support of each subnet found is excluded
+		by cuts (y_p = 0 for a place p of the support) and the model is re-solved
+		warm-started from the current basis (Lawler enumeration of the supports: every
+		candidate is branched, also when its support has already been ranked).
+		The ranking is stored in the PTPN and returned as a list of
+		{'places', 'trans', 'cycle_time'} dictionaries.
+		"""
+		if self.__results_hit != None:
+			if len(self.__results_hit['subnets']) >= k or self.__results_hit.get('ranked', 0) >= k:
+				#Ranking loaded from the result cache
+				ranking = [dict(self.__subnet_of(s, ptpn), cycle_time=s['cycle_time']) for s in self.__results_hit['subnets'][:k]]
+				ptpn.set_critical_subnets(ranking)
+				self.__result.set_subnets(ranking)
+				return ranking
+			#The ranking is not in the result cache: the LPs are solved (the returned result is kept)
+			result = self.__result
+			self.__results_hit = None
+			self.solve_lp(ptpn)
+			self.__result = result
+		if self.__ct_prob == None or self.__ct_sol == None:
+			raise Exception("The LP_CT problem has not been solved: no subnets to rank")
+		self.__log("Ranking of the ", k, " slowest subnets...")
+		self.__log("====================================================")
+		ny = self.__ct_prob.variables.get_num()
+		ub = self.__ct_prob.variables.get_upper_bounds()
+		#Optimal basis of the (uncut) LP_CT model, restored at the end (none after barrier without crossover)
+		try:
+			basis = self.__ct_prob.solution.basis.get_basis()
+		except CplexError:
+			basis = ([], [])
+		#Candidates: (-cycle time, counter, excluded places, solution)
+		counter = 0
+		candidates = [(-self.__ct_sol['objective'], counter, frozenset(), self.__ct_sol['values'])]
+		visited = {frozenset()}
+		supports = set()
+		ranking = []
+		while candidates and len(ranking) < k:
+			obj, _, excluded, values = heapq.heappop(candidates)
+			support = frozenset(p for p in range(ny) if values[p] > 0.0)
+			#A support already found is not ranked again, but its excluded set is branched
+			#(the subnets reachable only from it would be missed)
+			if support not in supports:
+				supports.add(support)
+				subnet = self.__extract_subnet(values, ptpn)
+				subnet.update({'cycle_time': -obj})
+				ranking.append(subnet)
+				self.__log("Subnet ", len(ranking), ": cycle time ", -obj)
+				if len(ranking) == k:
+					break
+			#Cuts excluding (one place of) the current support
+			for p in support:
+				cut = excluded.union({p})
+				if cut in visited:
+					continue
+				visited.add(cut)
+				self.__ct_prob.variables.set_upper_bounds([(q, 0.0) for q in cut])
+				self.__ct_prob.solve()
+				if self.__ct_prob.solution.get_status() == self.__ct_prob.solution.status.optimal:
+					counter += 1
+					heapq.heappush(candidates, (-self.__ct_prob.solution.get_objective_value(), counter, cut, self.__ct_prob.solution.get_values()))
+				#Remove the cuts
+				self.__ct_prob.variables.set_upper_bounds([(q, ub[q]) for q in cut])
+		#Restore the optimal solution of the (uncut) LP_CT model from its basis and values (no iterations)
+		self.__ct_prob.start.set_start(basis[0], basis[1], self.__ct_sol['values'], [], [], [])
+		self.__ct_prob.solve()
+		ptpn.set_critical_subnets(ranking)
+		if self.__result != None:
+			self.__result.set_subnets(ranking)
+			if self.__results != None:
+				self.__store_result(k)
+		return ranking
+		##############################################################
+
+	def get_profile(self):
+		return self.__profile
+		##############################################################
+
+	def __solve(self, pb, basic=False, lp="X"):
+		#Solve a CPLEX problem (LP max X/LP min CT) with the method/threads chosen by the solver profile
+		rows = pb.linear_constraints.get_num()
+		cols = pb.variables.get_num()
+		nnz = pb.linear_constraints.get_num_nonzeros()
+		Profiler.set_info("lp_" + lp, dict({'rows': rows, 'cols': cols, 'nnz': nnz}))
+		phase = "solve_" + lp
+		method, threads = self.__profile.choose(rows, cols, nnz)
+		self.__profile.apply_cplex(pb, method, threads, basic)
+		self.__log("Solver method: ", method, " (threads: ", threads if threads else "auto", ")")
+		start = time.perf_counter()
+		with Profiler.phase(phase):
+			pb.solve()
+		Profiler.count(phase + ".iterations", pb.solution.progress.get_num_iterations())
+		self.__profile.record(rows, cols, nnz, method, time.perf_counter() - start)
+		##############################################################
+
+	def __get_solution(self, pb):
+		#Optimal solution of a solved CPLEX problem
+		return dict({'status': pb.solution.get_status(), 'status_string': pb.solution.get_status_string(),
+			'objective': pb.solution.get_objective_value(), 'values': pb.solution.get_values()})
+		##############################################################
+
+	def __new_problem(self, aFilename=None):
+		#CPLEX problem (read from aFilename, if any) with the log streams enabled only in verbose mode
+		pb = cplex.Cplex()
+		if not self.__verbose:
+			pb.set_log_stream(None)
+			pb.set_results_stream(None)
+			pb.set_warning_stream(None)
+			pb.set_error_stream(None) #errors are raised (CplexError)
+		if aFilename != None:
+			pb.read(aFilename)
+		return pb
+		##############################################################
 
+	def __log(self, *args):
+		#Progress messages (verbose mode)
+		if self.__verbose:
+			print(*args)
+		##############################################################
+
+	def __read_basis(self, pb, aFilename):
+		#Warm start (ignored if the basis does not match the problem)
 		try:
+			pb.start.read_basis(aFilename)
+			self.__log("Warm start from the cached basis: ", aFilename)
+		except CplexError:
+			self.__log("The cached basis ", aFilename, " cannot be used as warm start")
+		##############################################################
 
-			##############################################################
-			#Set variables and coeff. of the objective function
-			pid2dokid = self.__pe.get_pid_to_dokid()
-			tid2dokid = self.__pe.get_tid_to_dokid()
-
-			coef = []			
-			v_names = []
-			for k in pid2dokid.keys(): #marking variables
-				v_names.append('M' + str(pid2dokid[k])) 
-				coef.append(0.0)
-
-			for k in tid2dokid.keys(): #number of firings variables
-				v_names.append('s' + str(tid2dokid[k]))
-				coef.append(0.0)
-
-			for k in tid2dokid.keys(): #throughput variables
-				v_names.append('x' + str(tid2dokid[k]))
-				#get the id of the tr_name!!
-				if k == self.__tr_id:
-					coef.append(1.0)
-				else:
-					coef.append(0.0)
+	def __write_basis(self, pb, aFilename):
+		#No basis is available if the barrier has been run without crossover
+		try:
+			pb.solution.basis.write(aFilename)
+		except CplexError:
+			self.__log("No optimal basis to store in the cache: ", aFilename)
+		##############################################################
 
-			#Set objective function
-			self.__prob.variables.add(obj=coef, names=v_names)
-			#print("All the variables: ", self.__prob.variables.get_names())
-			
-			n_constr = 0 #constraints counter
-			##############################################################
-			#Set reachability constraints: M - C s^T = M_0
-			C =  self.__pe.get_f() - self.__pe.get_b()
-			M0 = self.__pe.get_m0()
-			np = C.shape[0]
-			nt = C.shape[1]
-			for p in range(np):
-				ind =[p]
-				val =[1.0]
-				for t in range(nt):
-					if C[p,t] != 0:
-						ind.append(int(np+t))
-						val.append(float(-C[p,t]))
-				#print(ind,val)
-				self.__prob.linear_constraints.add(lin_expr=[cplex.SparsePair(ind,val)], rhs=[float(M0[0,p])], senses=["E"], names=['reach'+str(n_constr)])
-				n_constr +=1
-
-			##############################################################
-			#Set conservative flow constraints: C x^T = 0			
-			for i in range(np):
-				ind = []
-				val = []
-				for j in range(nt):
-					if C[i,j] != 0:
-						ind.append(int(np+nt+j))
-						val.append(float(C[i,j]))
-				self.__prob.linear_constraints.add(lin_expr=[cplex.SparsePair(ind, val)], rhs=[0.0], senses=["E"], names=['flow'+str(n_constr)])
-				n_constr += 1
-			
-			##############################################################
-			#Set Little's law constraints: M - delay * B x^T >= 0
-			delta = self.__pe.get_delta()
-			B = self.__pe.get_b()
-			for t in range(nt):
-				for p in range(np):
-					if B[p,t] != 0 and delta[t,0] > 0:
-						ind = [p, int(np+nt+t)]
-						val = [1.0, -delta[t,0]*B[p,t]]
-						self.__prob.linear_constraints.add(lin_expr=[cplex.SparsePair(ind,val)], rhs=[0.0], senses=["G"], names=['little'+str(n_constr)])
-						n_constr +=1
-
-			##############################################################
-			#Set routing constraints: 
-			ecs=self.__compute_ecs() #compute equal conflict sets 
-			w = self.__pe.get_w()
-			for k in ecs.keys():
-				if len(ecs[k]) > 1: #conflicting transitions
-					self.__check_normalize(ecs[k],w)
-					#print("Checked and possibly normalized w: ", w)
-					ecs_list = list(ecs[k])
-					for t in ecs[k]:		
-						ind = [int(t+np+nt)]
-						val = [1.0-w[t,0]]
-						for t1 in ecs_list:
-							if t1 != t:
-								ind.append(int(t1+np+nt))
-								val.append(-w[t,0])
-						self.__prob.linear_constraints.add(lin_expr=[cplex.SparsePair(ind,val)],rhs=[0.0],senses=["E"],names=['routing'+str(n_constr)])
-						n_constr += 1
-			
+	@Profiler.timed("cache_store")
+	def __store_in_cache(self):
+		#Store models (binary .sav format), optimal bases and solutions in the cache
+		if self.__x_sol['status'] != self.__prob.solution.status.optimal:
+			return
+		path = self.__cache.new_entry(self.__cache_key)
+		self.__prob.write(os.path.join(path, "lp_max_X.sav"))
+		self.__write_basis(self.__prob, os.path.join(path, "lp_max_X.bas"))
+		results = dict({'X': self.__x_sol, 'CT': None})
+		if self.__ct_sol != None and self.__ct_sol['status'] == self.__ct_prob.solution.status.optimal:
+			self.__ct_prob.write(os.path.join(path, "lp_CT.sav"))
+			self.__write_basis(self.__ct_prob, os.path.join(path, "lp_CT.bas"))
+			results.update({'CT': self.__ct_sol})
+		self.__cache.commit(self.__cache_key, path, results)
+		##############################################################
+
+	def __store_result(self, ranked=0):
+		#Store the result in the result cache (optimal solutions only), with the number of subnets ranked
+		if self.__x_sol['status'] != self.__prob.solution.status.optimal:
+			return
+		if self.__ct_sol != None and self.__ct_sol['status'] != self.__ct_prob.solution.status.optimal:
+			return
+		self.__results.put(self.__results_key, dict(self.__result.to_dict(), ranked=ranked))
+		##############################################################
+
+	def __load_result(self, ptpn: PTPN):
+		#BoundResult of the result cache hit; the PTPN is updated as after the solution of the LPs
+		hit = self.__results_hit
+		self.__result = BoundResult.from_dict(hit, self.__pe.get_pid_to_dokid(), self.__pe.get_tid_to_dokid())
+		self.__result.set_subnets([]) #set by rank_slowest_subnets, as after the solution of the LPs
+		tr = [t for t in ptpn.get_transitions() if t.get_id() == self.__tr_id][0]
+		tr.set_bounds(dict({'Throughput': [self.__prob_type, hit['throughput']]}))
+		if hit['cycle_time'] != None:
+			tr.set_bounds(dict({'Cycle time': ['min', hit['cycle_time']]}))
+			ptpn.set_critical_subnet(self.__subnet_of(hit['subnet'], ptpn))
+		return self.__result
+		##############################################################
+
+	def __zero_result(self, ptpn: PTPN):
+		#BoundResult of a reference transition with zero throughput (structural pre-check)
+		diagnostics = self.__check.diagnose(self.__tr_id)
+		self.__log("The net is not live (structural pre-check): ", diagnostics[0])
+		self.__result = BoundResult(self.__tr_name, self.__tr_id, self.__pe.get_pid_to_dokid(), self.__pe.get_tid_to_dokid())
+		self.__result.set_lpX_solution(None, "not live (structural pre-check)", 0.0, None)
+		self.__result.set_diagnostics(diagnostics)
+		tr = [t for t in ptpn.get_transitions() if t.get_id() == self.__tr_id][0]
+		tr.set_bounds(dict({'Throughput': [self.__prob_type, 0.0]}))
+		return self.__result
+		##############################################################
+
+	def __subnet_of(self, ids, ptpn: PTPN):
+		#Subnet {'places', 'trans'} of the PTPN from the place/transition ids of a BoundResult
+		places = set(ids['places'])
+		trans = set(ids['trans'])
+		return dict({'places': set(p for p in ptpn.get_places() if p.get_id() in places),
+			'trans': set(t for t in ptpn.get_transitions() if t.get_id() in trans)})
+		##############################################################
+
+	def __generate_lpX(self):
+		#Build the LP max X model (LPmodel) and load it
+		tid2dokid = self.__pe.get_tid_to_dokid()
+		self.__lpX = self.__builder.build_lpX(tid2dokid[self.__tr_id], "obj" + self.__tr_name, self.__prob_type)
+		self.__load_model(self.__prob, self.__lpX)
+		##############################################################
+
+	def __apply_changes(self, pb, changes):
+		#Set the changes of an LP model (LPmodel.diff) in a loaded CPLEX problem
+		try:
+			if changes['coefficients']:
+				pb.linear_constraints.set_coefficients(changes['coefficients'])
+			if changes['rhs']:
+				pb.linear_constraints.set_rhs(changes['rhs'])
+			if changes['objective']:
+				pb.objective.set_linear(changes['objective'])
+			if changes['bounds']:
+				pb.variables.set_lower_bounds([(j, max(lb, -cplex.infinity)) for j, lb, _ in changes['bounds']])
+				pb.variables.set_upper_bounds([(j, min(ub, cplex.infinity)) for j, _, ub in changes['bounds']])
+		except CplexError as exc:
+			raise
+		##############################################################
+
+	@Profiler.timed("lp_load")
+	def __load_model(self, pb, model: LPmodel):
+		#Load a solver-independent LP model into a CPLEX problem
+		try:
+			if model.get_name() != None:
+				pb.objective.set_name(model.get_name())
+			if model.get_sense() == "min":
+				pb.objective.set_sense(pb.objective.sense.minimize)
+			else:
+				pb.objective.set_sense(pb.objective.sense.maximize)
+			lb = [max(b, -cplex.infinity) for b in model.get_lb().tolist()]
+			ub = [min(b, cplex.infinity) for b in model.get_ub().tolist()]
+			pb.variables.add(obj=model.get_obj().tolist(), lb=lb, ub=ub, names=model.get_var_names())
+			lin_expr = []
+			for i in range(model.get_num_rows()):
+				ind, val = model.get_row(i)
+				lin_expr.append(cplex.SparsePair(ind.tolist(), val.tolist()))
+			pb.linear_constraints.add(lin_expr=lin_expr, senses=model.get_senses(), rhs=model.get_rhs().tolist(), names=model.get_row_names())
 		except CplexError as exc:
 			raise
 		##############################################################
-	
+
 	def __backward_mapping(self):
 		#Backward mapping of dok ids (ParamsExtractor) to place/transition ids (PTPN).
 		pid2dokid = self.__pe.get_pid_to_dokid()
@@ -262,17 +584,6 @@ class CPLEX_LPsolver(LPsolver):
 		return dokid2pid,dokid2tid
 		##############################################################
 
-	def __check_belong_subnet(self,t,subnet_places,C):
-		pre_t = 0
-		post_t = 0
-		for p in subnet_places:
-			if C[p,t] < 0:
-				pre_t += 1
-			elif C[p,t] > 0:
-				post_t += 1 
-		return pre_t > 0 and post_t > 0 
-		##############################################################
-
 	def __get_name(self, obj_list, id):
 
 		for obj in obj_list:
@@ -281,8 +592,8 @@ class CPLEX_LPsolver(LPsolver):
 		return None
 
 	def __identify_critical_subnet(self, opt_sol, ref, ptpn):
-		print("Critical subnet identification...")
-		print("====================================================")
+		self.__log("Critical subnet identification...")
+		self.__log("====================================================")
 		pid_mapping = self.__pe.get_pid_to_dokid()
 		tid_mapping = self.__pe.get_tid_to_dokid()
 		np = len(pid_mapping)
@@ -290,65 +601,41 @@ class CPLEX_LPsolver(LPsolver):
 		##############################################################
 		#Compute visit vector from the solution of the primal LP
 		v = []
-		#print("Pid mapping", pid_mapping)
-		#print("Tid mapping", tid_mapping)
 		for k in tid_mapping.keys():
 			v.append(opt_sol[np+nt+tid_mapping[k]]/opt_sol[np+nt+ref])
-		#print("Visit ratios", v)
+		self.__result.set_visit_ratios(v)
+		if self.__cache_hit != None:
+			results = self.__cache.load_results(self.__cache_hit)
+			if results['CT'] != None:
+				#Skip the LP_CT generation and solution: model and solution loaded from the cache
+				self.__ct_prob = self.__new_problem(os.path.join(self.__cache_hit, "lp_CT.sav"))
+				self.__ct_sol = results['CT']
+				self.__log("Min cycle time ", self.__tr_name, ":" ,self.__ct_sol['objective'])
+				self.__update_net(ptpn,"CT")
+				return
 		#Solve max CT problem with v=v_0: y_0
-		self.__ct_prob = cplex.Cplex() #create a new CPLEX instance
-		self.__ct_prob.objective.set_sense(self.__ct_prob.objective.sense.maximize)
-
-		##############################################################
-		#Set objective function
-		B = self.__pe.get_b()
-		delta = self.__pe.get_delta()
-		coef = []			
-		y_names = []
-		for p in pid_mapping.keys(): #pinv variables
-			y_names.append('y' + str(pid_mapping[p])) 
-			tot = 0
-			for t in tid_mapping.keys():
-				tot += B[pid_mapping[p],tid_mapping[t]]*delta[tid_mapping[t],0] * v[tid_mapping[t]]
-			coef.append(float(tot))
-		self.__ct_prob.variables.add(obj=coef, names=y_names)
-		#print("All the variables: ", ct_prob.variables.get_names())
-		#print(coef)
-
-		##############################################################
-		#Set conservative marking constraints: C^T y = 0			
-		F = self.__pe.get_f()
-		C = F-B
-		n_constr = 0
-		for t in tid_mapping.keys():
-			ind = []
-			val = []
-			for p in pid_mapping.keys():
-				if C[pid_mapping[p],tid_mapping[t]] != 0:
-					ind.append(int(pid_mapping[p]))
-					val.append(float(C[pid_mapping[p],tid_mapping[t]]))
-			self.__ct_prob.linear_constraints.add(lin_expr=[cplex.SparsePair(ind, val)], rhs=[0.0], senses=["E"], names=['pinv'+str(n_constr)])
-			n_constr += 1
-
-		##############################################################
-		#Set initial marking constraints: M0^T y = 1
-		M0 = self.__pe.get_m0()
-		ind = []
-		val = []
-		for p in pid_mapping.keys():
-			if M0[0,pid_mapping[p]] > 0:
-				ind.append(int(pid_mapping[p]))
-				val.append(1.0)
-		self.__ct_prob.linear_constraints.add(lin_expr=[cplex.SparsePair(ind, val)], rhs=[1.0], senses=["E"], names=['inimark'+str(n_constr)])
+		if self.__lpCT != None and self.__ct_prob != None:
+			#Same structure (another reference transition): only the objective changes
+			self.__lpCT.set_obj(self.__builder.build_ct_objective(v))
+			self.__ct_prob.objective.set_linear(list(enumerate(self.__lpCT.get_obj().tolist())))
+		else:
+			self.__lpCT = self.__builder.build_lpCT(v)
+			self.__ct_prob = self.__new_problem() #create a new CPLEX instance
+			self.__load_model(self.__ct_prob, self.__lpCT)
 		
 		##############################################################
 		#Solve the lp problem
 		try:
-			self.__ct_prob.solve()
+			if self.__cache_similar != None:
+				#Warm start from the optimal basis of a model with the same structure
+				self.__read_basis(self.__ct_prob, os.path.join(self.__cache_similar, "lp_CT.bas"))
+			#A basic solution is required: the subnet is the support of a vertex
+			self.__solve(self.__ct_prob, basic=True, lp="CT")
+			self.__ct_sol = self.__get_solution(self.__ct_prob)
 			#Debug: display solutions
-			print("====================================================")
-			print("Solution status: ", self.__ct_prob.solution.get_status()) # 1=optimal solution found
-			print("Min cycle time ", self.__tr_name, ":" ,self.__ct_prob.solution.get_objective_value())	
+			self.__log("====================================================")
+			self.__log("Solution status: ", self.__ct_sol['status']) # 1=optimal solution found
+			self.__log("Min cycle time ", self.__tr_name, ":" ,self.__ct_sol['objective'])
 			#Update PTPN
 			self.__update_net(ptpn,"CT")
 
@@ -363,42 +650,54 @@ class CPLEX_LPsolver(LPsolver):
 		while i < len(trans) and not found:
 			if trans[i].get_name() == self.__tr_name:
 				if metric == "X":
-					trans[i].set_bounds(dict({'Throughput': [self.__prob_type, self.__prob.solution.get_objective_value()]}))
+					trans[i].set_bounds(dict({'Throughput': [self.__prob_type, self.__x_sol['objective']]}))
 				else:
-					trans[i].set_bounds(dict({'Cycle time': ['min', self.__ct_prob.solution.get_objective_value()]}))
+					trans[i].set_bounds(dict({'Cycle time': ['min', self.__ct_sol['objective']]}))
 				found = True 
 				#Debug
 				#print("PTPN updated: ", "Transition: ", trans[i].get_name(), "Bounds: ", trans[i].get_bounds())
 			i += 1
 		#Update subnet when cycle time has been computed
 		if metric == 'CT':
-			var = self.__ct_prob.variables.get_names()
-			values = self.__ct_prob.solution.get_values()
-			pid_mapping = self.__pe.get_pid_to_dokid()
-			tid_mapping = self.__pe.get_tid_to_dokid()
-			#Collecting places of the subnet
-			places = ptpn.get_places()	
-			
-			subnet_places_pid2dokid = dict()
-			for p in pid_mapping.keys():
-				if values[pid_mapping[p]] > 0.0:
-					subnet_places_pid2dokid.update({p:pid_mapping[p]})
-			subnet_places = set()
-			for pl in places:
-				if pl.get_id() in subnet_places_pid2dokid.keys():
-					subnet_places.add(pl)			
-			subnet_trans = set()
-			C = self.__pe.get_f() - self.__pe.get_b()
-			for tr in trans:
-				if self.__check_belong_subnet(tid_mapping[tr.get_id()], subnet_places_pid2dokid.values(), C):
-					subnet_trans.add(tr)					
-			ptpn.set_critical_subnet(dict({'places': subnet_places, 'trans': subnet_trans}))
-			
+			subnet = self.__extract_subnet(self.__ct_sol['values'], ptpn)
+			ptpn.set_critical_subnet(subnet)
+			self.__result.set_lpCT_solution(self.__ct_sol['status'], self.__ct_sol['objective'], self.__ct_sol['values'])
+			self.__result.set_subnet(subnet)
+
+	@Profiler.timed("subnet_extraction")
+	def __extract_subnet(self, values, ptpn: PTPN):
+		#Subnet induced by the support of a solution of the LP_CT problem
+		pid_mapping = self.__pe.get_pid_to_dokid()
+		tid_mapping = self.__pe.get_tid_to_dokid()
+		#Collecting places of the subnet
+		places = ptpn.get_places()
+		trans = ptpn.get_transitions()
+
+		subnet_places_pid2dokid = dict()
+		for p in pid_mapping.keys():
+			if values[pid_mapping[p]] > 0.0:
+				subnet_places_pid2dokid.update({p:pid_mapping[p]})
+		subnet_places = set()
+		for pl in places:
+			if pl.get_id() in subnet_places_pid2dokid.keys():
+				subnet_places.add(pl)
+		#Transitions with input and output places in the subnet (rows of the incidence matrix)
+		rows = self.__builder.get_incidence()[sorted(subnet_places_pid2dokid.values()), :].tocoo()
+		inputs = set(rows.col[rows.data < 0].tolist())
+		outputs = set(rows.col[rows.data > 0].tolist())
+		subnet_trans = set()
+		for tr in trans:
+			if tid_mapping[tr.get_id()] in inputs and tid_mapping[tr.get_id()] in outputs:
+				subnet_trans.add(tr)
+		return dict({'places': subnet_places, 'trans': subnet_trans})
 
 	def __print_lp_max_X_solution(self,ptpn: PTPN):
 		#Print optimal solution using PTPN place/transition names
+		if self.__x_sol == None:
+			print("No LP solution: the throughput is zero (structural pre-check)")
+			return
 		print("Solution:")
-		values = self.__prob.solution.get_values()
+		values = self.__x_sol['values']
 		dokid2pid,dokid2tid = self.__backward_mapping()
 		places = ptpn.get_places()
 		trans = ptpn.get_transitions()
@@ -425,6 +724,14 @@ class CPLEX_LPsolver(LPsolver):
 		for t in subnet['trans']:
 			print(t.get_name())
 		print("====================================================")
+		subnets = ptpn.get_critical_subnets()
+		if len(subnets) > 1:
+			print("Ranking of the slowest subnets:")
+			for i in range(len(subnets)):
+				print("Subnet ", i+1, " (cycle time ", subnets[i]['cycle_time'], ")")
+				print("Places: ", [p.get_name() for p in subnets[i]['places']])
+				print("Transitions: ", [t.get_name() for t in subnets[i]['trans']])
+			print("====================================================")
 
 
 
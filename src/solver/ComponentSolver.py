@@ -0,0 +1,132 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import numpy
+from concurrent.futures import ProcessPoolExecutor
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import connected_components
+from src.net.PTPN import PTPN
+from src.solver.LPsolver import LPsolver
+from src.solver.SolverProfile import SolverProfile
+from src.perf.Profiler import Profiler
+
+class ComponentSolver:
+	"""
+	Bound computation by decomposition of the net into its connected components (places,
+	transitions and arcs, computed in linear time on the net graph). The components share no
+	places nor transitions, so the LPs of a component do not depend on the other ones: the
+	bounds of a transition are those of the (smaller) LPs of its component, and the components
+	are solved in parallel by a pool of worker processes.
+	The strongly connected components are detected as well, but they are not solved apart: the
+	flow constraints (C x = 0) of LP max X couple the strongly connected components of a
+	connected component.
+	Net-level results: the bounds of every transition are set in the PTPN and the critical
+	subnets of the PTPN are the slowest subnets of the components (one per live component).
+	"""
+
+	def __init__(self, ptpn: PTPN, jobs=1, profile=None, subnets=1, backend='cplex'):
+		self.__ptpn = ptpn
+		self.__jobs = max(1, jobs)
+		self.__profile = profile if profile != None else SolverProfile.preset('quiet')
+		self.__subnets = subnets #number of slowest subnets to rank
+		self.__backend = backend
+		self.__components = [] #[PTPN]
+		self.__sccs = [] #[set of node ids]
+		self.__decompose()
+
+	def get_components(self):
+		"""Connected components of the net (PTPN sharing the place/transition objects of the net)"""
+		return self.__components
+
+	def get_sccs(self):
+		"""Strongly connected components of the net: [set of place/transition ids]"""
+		return self.__sccs
+
+	def is_strongly_connected(self):
+		return len(self.__sccs) == 1
+
+	def component_of(self, tr_id):
+		"""Index of the component of transition tr_id"""
+		for i, c in enumerate(self.__components):
+			if any(t.get_id() == tr_id for t in c.get_transitions()):
+				return i
+		raise KeyError("The transition {0} does not exists".format(tr_id))
+
+	@Profiler.timed("decomposition")
+	def __decompose(self):
+		nodes = self.__ptpn.get_places() + self.__ptpn.get_transitions()
+		index = dict({n.get_id(): i for i, n in enumerate(nodes)})
+		arcs = self.__ptpn.get_arcs()
+		rows = [index[a.get_source().get_id()] for a in arcs]
+		cols = [index[a.get_target().get_id()] for a in arcs]
+		graph = coo_array((numpy.ones(len(arcs)), (rows, cols)), shape=(len(nodes), len(nodes))).tocsr()
+		n, labels = connected_components(graph, directed=True, connection='weak')
+		members = [set() for _ in range(n)]
+		for node, label in zip(nodes, labels.tolist()):
+			members[label].add(node.get_id())
+		name = self.__ptpn.get_name()
+		self.__components = [self.__ptpn.subnet(m, name + "_c" + str(i)) for i, m in enumerate(members) if len(m) > 0]
+		n, labels = connected_components(graph, directed=True, connection='strong')
+		self.__sccs = [set() for _ in range(n)]
+		for node, label in zip(nodes, labels.tolist()):
+			self.__sccs[label].add(node.get_id())
+
+	def solve(self, tname):
+		"""BoundResult of transition tname, computed on the LPs of its component"""
+		trans = [t for t in self.__ptpn.get_transitions() if t.get_name() == tname]
+		if not trans:
+			raise KeyError("The transition {0} does not exists".format(tname))
+		component = self.__components[self.component_of(trans[0].get_id())]
+		results = _solve_component(component, tname, self.__profile, self.__subnets, self.__backend)
+		self.__combine([results])
+		return results[0]
+
+	def solve_all(self):
+		"""BoundResults of all the transitions (in the order of the net): one job per component"""
+		tasks = [(c, None, self.__profile, self.__subnets, self.__backend) for c in self.__components if c.get_transitions()]
+		if self.__jobs == 1 or len(tasks) == 1:
+			component_results = [_solve_component(*task) for task in tasks]
+		else:
+			with ProcessPoolExecutor(max_workers=min(self.__jobs, len(tasks))) as pool:
+				component_results = list(pool.map(_solve_component, *zip(*tasks)))
+		self.__combine(component_results)
+		results = dict({r.get_transition_id(): r for rs in component_results for r in rs})
+		return [results[t.get_id()] for t in self.__ptpn.get_transitions()]
+
+	def __combine(self, component_results):
+		#Net-level results: bounds of the transitions (solved by another process, possibly)
+		#and slowest subnets of the components
+		trans = dict({t.get_id(): t for t in self.__ptpn.get_transitions()})
+		places = dict({p.get_id(): p for p in self.__ptpn.get_places()})
+		critical = []
+		for results in component_results:
+			for r in results:
+				trans[r.get_transition_id()].set_bounds(dict({'Throughput': ['max', r.get_throughput()]}))
+				if r.get_cycle_time() != None:
+					trans[r.get_transition_id()].set_bounds(dict({'Cycle time': ['min', r.get_cycle_time()]}))
+			live = [r for r in results if r.get_subnet() != None]
+			if live:
+				subnet = live[0].get_subnet()
+				critical.append(dict({'places': set(places[p] for p in subnet['places']),
+					'trans': set(trans[t] for t in subnet['trans']), 'cycle_time': live[0].get_cycle_time()}))
+		if critical:
+			self.__ptpn.set_critical_subnets(critical)
+
+
+def _solve_component(component, tname, profile, subnets, backend):
+	#Worker: bounds of transition tname (None: of all the transitions) of a component
+	trans = component.get_transitions()
+	ref = [t for t in trans if t.get_name() == tname][0] if tname != None else trans[0]
+	solver = LPsolver.get_backend(backend)(ref.get_name(), ref.get_id(), 'max', None, profile)
+	solver.populate_lp(component)
+	if tname != None:
+		results = [solver.solve_lp(component)]
+		if subnets > 1 and results[0].get_cycle_time() != None:
+			solver.rank_slowest_subnets(component, subnets)
+	else:
+		results = solver.solve_all(component, subnets)
+	profile.save_history()
+	return results
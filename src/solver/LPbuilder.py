@@ -0,0 +1,191 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import numpy
+from scipy.sparse import coo_array, csr_array, identity, hstack, vstack
+from src.solver.LPmodel import LPmodel
+from src.solver.ParamsExtractor import ParamsExtractor
+from src.perf.Profiler import Profiler
+
+class LPbuilder:
+	"""
+	Builds the (solver-independent) LP models of the bound computation from the
+	net structure retrieved by the ParamsExtractor:
+	- LP max X: maximum throughput of a reference transition
+	- LP min CT: minimum cycle time (slowest P-semiflow) given the visit ratios
+	"""
+
+	def __init__(self, pe: ParamsExtractor, verbose=False):
+		self.__pe = pe
+		self.__ecs = None
+		self.__C = None #incidence matrix (CSR)
+		self.__verbose = verbose #print the normalized ECS weights
+
+	def get_ecs(self):
+		"""Equal conflict sets of the GSPN: {k: set of transition dok ids}"""
+		if self.__ecs == None:
+			self.__ecs = self.__compute_ecs()
+		return self.__ecs
+
+	@Profiler.timed("ecs")
+	def __compute_ecs(self):
+		#Transitions with the same (non-empty or empty) input set are in equal conflict
+		B = csr_array(self.__pe.get_b()).tocsc()
+		B.sort_indices()
+		nt = B.shape[1]
+		ecs = dict()
+		inputs = dict() #input set -> ecs key
+		for t in range(nt):
+			key = tuple(B.indices[B.indptr[t]:B.indptr[t+1]])
+			if key not in inputs:
+				inputs.update({key: len(ecs)})
+				ecs.update({inputs[key]: set()})
+			ecs[inputs[key]].add(t)
+		return ecs
+
+	def __check_normalize(self, ecs, w):
+		sum_of_weights = 0.0
+		for t in ecs:
+			sum_of_weights += w[t,0]
+		if sum_of_weights != 1.0:
+			for t in ecs:
+				w[t,0] = w[t,0] / sum_of_weights #normalize
+			if self.__verbose:
+				print("The sum of weights in the ecs ", ecs, " has been normalized")
+
+	def get_incidence(self):
+		"""Incidence matrix C = F - B (CSR), computed once and shared by the LP models"""
+		if self.__C is None:
+			self.__C = csr_array(self.__pe.get_c(), dtype=float)
+		return self.__C
+
+	def estimate_lpX(self):
+		"""Upper bounds of the (rows, columns, non-zeros) of the LP max X, computed before building it"""
+		np = self.__pe.get_b().shape[0]
+		nt = self.__pe.get_b().shape[1]
+		nnz_b = self.__pe.get_b().nnz
+		nnz_c = nnz_b + self.__pe.get_f().nnz
+		conflicts = [len(e) for e in self.get_ecs().values() if len(e) > 1]
+		rows = 2*np + nnz_b + sum(conflicts)
+		nnz = np + 2*nnz_c + 2*nnz_b + sum(n*n for n in conflicts)
+		return rows, np + 2*nt, nnz
+
+	@Profiler.timed("lp_build_X")
+	def build_lpX(self, tr_dokid, name=None, sense='max'):
+		"""
+		LP max X of the transition with dok id tr_dokid. Variables: M (markings),
+		s (number of firings), x (throughputs). Constraints: reachability, conservative
+		flow, Little's law and routing.
+		"""
+		np = self.__pe.get_b().shape[0]
+		nt = self.__pe.get_b().shape[1]
+		v_names = ['M' + str(p) for p in range(np)] + ['s' + str(t) for t in range(nt)] + ['x' + str(t) for t in range(nt)]
+		obj = numpy.zeros(np + 2*nt)
+		obj[np + nt + tr_dokid] = 1.0
+		C = self.get_incidence()
+		blocks = []
+		senses = []
+		rhs = []
+		row_names = []
+
+		##############################################################
+		#Reachability constraints: M - C s^T = M_0
+		with Profiler.phase("reachability"):
+			blocks.append(hstack([identity(np, format='csr'), -C, csr_array((np, nt))], format='csr'))
+			M0 = csr_array(self.__pe.get_m0(), dtype=float).toarray().ravel()
+			senses += ['E'] * np
+			rhs += list(M0)
+			row_names += ['reach' + str(i) for i in range(np)]
+
+		##############################################################
+		#Conservative flow constraints: C x^T = 0
+		with Profiler.phase("flow"):
+			blocks.append(hstack([csr_array((np, np + nt)), C], format='csr'))
+			senses += ['E'] * np
+			rhs += [0.0] * np
+			row_names += ['flow' + str(np + i) for i in range(np)]
+
+		##############################################################
+		#Little's law constraints: M - delay * B x^T >= 0
+		with Profiler.phase("little"):
+			delta = csr_array(self.__pe.get_delta(), dtype=float).toarray().ravel()
+			B = csr_array(self.__pe.get_b(), dtype=float).tocsc()
+			B.eliminate_zeros()
+			B.sort_indices()
+			rows = []
+			cols = []
+			vals = []
+			for t in range(nt):
+				if delta[t] > 0:
+					for k in range(B.indptr[t], B.indptr[t+1]):
+						i = len(rows) // 2
+						rows += [i, i]
+						cols += [int(B.indices[k]), np + nt + t]
+						vals += [1.0, -delta[t] * B.data[k]]
+			n_little = len(rows) // 2
+			blocks.append(coo_array((vals, (rows, cols)), shape=(n_little, np + 2*nt)).tocsr())
+			senses += ['G'] * n_little
+			rhs += [0.0] * n_little
+			row_names += ['little' + str(2*np + i) for i in range(n_little)]
+
+		##############################################################
+		#Routing constraints (equal conflict sets)
+		with Profiler.phase("routing"):
+			ecs = self.get_ecs()
+			w = self.__pe.get_w()
+			rows = []
+			cols = []
+			vals = []
+			n_routing = 0
+			for k in ecs.keys():
+				if len(ecs[k]) > 1: #conflicting transitions
+					self.__check_normalize(ecs[k], w)
+					for t in ecs[k]:
+						rows.append(n_routing)
+						cols.append(np + nt + t)
+						vals.append(1.0 - w[t,0])
+						for t1 in ecs[k]:
+							if t1 != t:
+								rows.append(n_routing)
+								cols.append(np + nt + t1)
+								vals.append(-w[t,0])
+						n_routing += 1
+			blocks.append(coo_array((vals, (rows, cols)), shape=(n_routing, np + 2*nt)).tocsr())
+			senses += ['E'] * n_routing
+			rhs += [0.0] * n_routing
+			row_names += ['routing' + str(2*np + n_little + i) for i in range(n_routing)]
+
+		A = vstack(blocks, format='csr')
+		return LPmodel(name, sense, v_names, obj, numpy.zeros(np + 2*nt), numpy.full(np + 2*nt, LPmodel.INFINITY),
+			A, senses, rhs, row_names)
+
+	@Profiler.timed("lp_build_CT")
+	def build_lpCT(self, v, name=None):
+		"""
+		LP max CT (slowest P-semiflow y) given the visit ratios v (per transition dok id).
+		Constraints: conservative marking C^T y = 0 and initial marking M0^T y = 1.
+		"""
+		np = self.__pe.get_b().shape[0]
+		nt = self.__pe.get_b().shape[1]
+		y_names = ['y' + str(p) for p in range(np)]
+		obj = self.build_ct_objective(v)
+		C = self.get_incidence()
+		M0 = csr_array(self.__pe.get_m0(), dtype=float).toarray().ravel()
+		##############################################################
+		#Conservative marking constraints: C^T y = 0
+		#Initial marking constraint: M0^T y = 1
+		A = vstack([C.T.tocsr(), csr_array((M0 > 0).astype(float).reshape(1, np))], format='csr')
+		senses = ['E'] * (nt + 1)
+		rhs = [0.0] * nt + [1.0]
+		row_names = ['pinv' + str(t) for t in range(nt)] + ['inimark' + str(nt)]
+		return LPmodel(name, 'max', y_names, obj, numpy.zeros(np), numpy.full(np, LPmodel.INFINITY),
+			A, senses, rhs, row_names)
+
+	def build_ct_objective(self, v):
+		"""Objective of the LP max CT given the visit ratios v: B (delay * v)"""
+		B = csr_array(self.__pe.get_b(), dtype=float)
+		delta = csr_array(self.__pe.get_delta(), dtype=float).toarray().ravel()
+		return B @ (delta * numpy.asarray(v, dtype=float))
@@ -0,0 +1,140 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import contextlib
+
+class LPcache:
+	"""
+	On-disk cache of the built LP models, their optimal bases and solutions.
+	An entry is a directory named <structure key>_<parameter key>, where the structure key
+	hashes the GSPN structure, the reference transition and the backend and the parameter
+	key hashes the GSPN parameters. The entry directory mtime is its last access time:
+	the least recently used entries are evicted when the cache exceeds its maximum size.
+	An entry is written in a private directory, then renamed (atomic), so the cache can be
+	shared by concurrent writers (e.g., the batch workers).
+	"""
+
+	#Files of an entry
+	RESULTS = "results.json"
+	#Suffix of the entries being written and age (seconds) after which they are stale
+	TMP = ".tmp"
+	TMP_AGE = 3600
+
+	def __init__(self, cache_dir, max_size=256*1024*1024):
+		self.__dir = cache_dir
+		self.__max_size = max_size #bytes
+		os.makedirs(self.__dir, exist_ok=True)
+
+	def get_dir(self):
+		return self.__dir
+
+	def make_keys(self, pe, tr_id, backend):
+		"""
+		Returns the (structure key, entry key) of the LP problems of transition tr_id,
+		pe: ParamsExtractor with the net structure already retrieved
+		"""
+		skey = hashlib.sha256((pe.structure_hash() + str(tr_id) + backend).encode()).hexdigest()[:32]
+		pkey = pe.params_hash()[:32]
+		return skey, skey + "_" + pkey
+
+	def lookup(self, key):
+		"""Path of the entry with key (None if missing): a hit refreshes its last access time"""
+		path = os.path.join(self.__dir, key)
+		if not os.path.isfile(os.path.join(path, LPcache.RESULTS)):
+			return None
+		os.utime(path)
+		return path
+
+	def lookup_similar(self, skey):
+		"""Path of the most recently used entry with the same structure key (None if missing)"""
+		similar = None
+		last = 0
+		for entry in os.listdir(self.__dir):
+			path = os.path.join(self.__dir, entry)
+			if entry.startswith(skey + "_") and os.path.isfile(os.path.join(path, LPcache.RESULTS)):
+				mtime = os.path.getmtime(path)
+				if mtime > last:
+					similar = path
+					last = mtime
+		return similar
+
+	def new_entry(self, key):
+		"""
+		Path of a new (empty) private directory of the entry with key, where the model files
+		are written: it is renamed to the entry by commit, so the writers sharing the cache
+		never write into the same directory and the readers never see a partial entry
+		"""
+		return tempfile.mkdtemp(prefix="." + key + "_", suffix=LPcache.TMP, dir=self.__dir)
+
+	def commit(self, key, path, results):
+		"""
+		Completes the entry with key by writing its results in path (new_entry) and renaming it
+		to the entry, then evicts the LRU entries. If another writer has already committed the
+		key, its entry is kept (same structure and parameters) and path is discarded
+		"""
+		entry = os.path.join(self.__dir, key)
+		with open(os.path.join(path, LPcache.RESULTS), "w") as f:
+			json.dump(results, f)
+		try:
+			os.rename(path, entry)
+		except OSError:
+			if not os.path.isfile(os.path.join(entry, LPcache.RESULTS)):
+				#Incomplete entry (e.g., interrupted writer): replaced
+				shutil.rmtree(entry, ignore_errors=True)
+				with contextlib.suppress(OSError):
+					os.rename(path, entry)
+			shutil.rmtree(path, ignore_errors=True)
+		self.evict()
+
+	def load_results(self, path):
+		with open(os.path.join(path, LPcache.RESULTS)) as f:
+			return json.load(f)
+
+	def get_size(self):
+		"""Total size (bytes) of the cache"""
+		return sum(size for _, _, size in self.__entries())
+
+	def evict(self):
+		"""Removes the least recently used entries until the cache fits in its maximum size"""
+		entries = sorted(self.__entries(), key=lambda e: e[1])
+		total = sum(size for _, _, size in entries)
+		while entries and total > self.__max_size:
+			path, _, size = entries.pop(0)
+			shutil.rmtree(path, ignore_errors=True)
+			total -= size
+		#Entries left by the interrupted writers
+		for path in self.__pending():
+			with contextlib.suppress(OSError):
+				if time.time() - os.path.getmtime(path) > LPcache.TMP_AGE:
+					shutil.rmtree(path, ignore_errors=True)
+
+	def clear(self):
+		for path, _, _ in self.__entries():
+			shutil.rmtree(path, ignore_errors=True)
+
+	def __pending(self):
+		#Paths of the entries being written (new_entry)
+		return [os.path.join(self.__dir, e) for e in os.listdir(self.__dir) if e.startswith(".") and e.endswith(LPcache.TMP)]
+
+	def __entries(self):
+		#(path, last access, size) of the committed entries
+		entries = []
+		for entry in os.listdir(self.__dir):
+			path = os.path.join(self.__dir, entry)
+			if os.path.isdir(path) and not entry.startswith("."):
+				try:
+					size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+					entries.append((path, os.path.getmtime(path), size))
+				except OSError:
+					#Evicted meanwhile by another process
+					continue
+		return entries
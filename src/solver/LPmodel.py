@@ -0,0 +1,208 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import numpy
+from scipy.sparse import csr_array #Compressed Sparse Row array
+
+class LPmodel:
+	"""
+	Solver-independent sparse LP problem:
+		max/min obj^T x  s.t.  A x (senses) rhs,  lb <= x <= ub
+	A is a CSR array (one row per constraint), senses are 'E' (=), 'G' (>=), 'L' (<=).
+	"""
+
+	INFINITY = float("inf")
+
+	def __init__(self, name, sense, var_names, obj, lb, ub, A, senses, rhs, row_names):
+		self.__name = name
+		self.__sense = sense #'max'/'min'
+		self.__var_names = list(var_names)
+		self.__obj = numpy.asarray(obj, dtype=float)
+		self.__lb = numpy.asarray(lb, dtype=float)
+		self.__ub = numpy.asarray(ub, dtype=float)
+		self.__A = csr_array(A, dtype=float)
+		self.__A.sort_indices()
+		self.__senses = list(senses)
+		self.__rhs = numpy.asarray(rhs, dtype=float)
+		self.__row_names = list(row_names)
+
+	def get_name(self):
+		return self.__name
+
+	def get_sense(self):
+		return self.__sense
+
+	def get_var_names(self):
+		return self.__var_names
+
+	def get_obj(self):
+		return self.__obj
+
+	def get_lb(self):
+		return self.__lb
+
+	def get_ub(self):
+		return self.__ub
+
+	def get_A(self):
+		return self.__A
+
+	def get_senses(self):
+		return self.__senses
+
+	def get_rhs(self):
+		return self.__rhs
+
+	def get_row_names(self):
+		return self.__row_names
+
+	def get_num_vars(self):
+		return len(self.__var_names)
+
+	def get_num_rows(self):
+		return len(self.__row_names)
+
+	def get_nnz(self):
+		return self.__A.nnz
+
+	def get_row(self, i):
+		"""(column indices, values) of the i-th constraint"""
+		start, end = self.__A.indptr[i], self.__A.indptr[i+1]
+		return self.__A.indices[start:end], self.__A.data[start:end]
+
+	def set_obj(self, obj):
+		self.__obj = numpy.asarray(obj, dtype=float)
+
+	def diff(self, other):
+		"""
+		Differences with respect to another LP model with the same structure (variables,
+		constraints, senses and sparsity pattern): returns None if the structures differ, otherwise
+		{'coefficients': [(row, col, value)], 'rhs': [(row, value)], 'objective': [(col, value)],
+		 'bounds': [(col, lb, ub)]} with the values of the other model.
+		"""
+		if (self.__var_names != other.get_var_names() or self.__row_names != other.get_row_names()
+			or self.__senses != other.get_senses() or self.__sense != other.get_sense()):
+			return None
+		A = other.get_A()
+		if (not numpy.array_equal(self.__A.indptr, A.indptr)) or (not numpy.array_equal(self.__A.indices, A.indices)):
+			return None
+		changes = dict({'coefficients': [], 'rhs': [], 'objective': [], 'bounds': []})
+		rows = numpy.repeat(numpy.arange(self.get_num_rows()), numpy.diff(A.indptr))
+		for k in numpy.flatnonzero(self.__A.data != A.data):
+			changes['coefficients'].append((int(rows[k]), int(A.indices[k]), float(A.data[k])))
+		for i in numpy.flatnonzero(self.__rhs != other.get_rhs()):
+			changes['rhs'].append((int(i), float(other.get_rhs()[i])))
+		for j in numpy.flatnonzero(self.__obj != other.get_obj()):
+			changes['objective'].append((int(j), float(other.get_obj()[j])))
+		for j in numpy.flatnonzero((self.__lb != other.get_lb()) | (self.__ub != other.get_ub())):
+			changes['bounds'].append((int(j), float(other.get_lb()[j]), float(other.get_ub()[j])))
+		return changes
+
+	def __num(self, value):
+		#Coefficient representation (15 significant digits)
+		return "{0:.15g}".format(float(value))
+
+	def __linear_expr(self, f, indices, values, terms_per_line=8):
+		#Stream a linear expression (CPLEX LP format), a few terms per line
+		first = True
+		for k in range(len(indices)):
+			value = values[k]
+			if value == 0:
+				continue
+			if value < 0:
+				sign = "- "
+			else:
+				sign = "" if first else "+ "
+			coef = "" if abs(value) == 1 else self.__num(abs(value)) + " "
+			f.write(" {0}{1}{2}".format(sign, coef, self.__var_names[indices[k]]))
+			first = False
+			if (k+1) % terms_per_line == 0:
+				f.write("\n")
+		if first:
+			f.write(" 0 " + self.__var_names[0])
+
+	def write_lp(self, filename):
+		"""Writes the model in CPLEX LP format (streaming, row by row)"""
+		with open(filename, "w") as f:
+			f.write("\\Problem name: {0}\n\n".format(self.__name if self.__name != None else ""))
+			f.write("Maximize\n" if self.__sense == "max" else "Minimize\n")
+			f.write(" {0}:".format(self.__name if self.__name != None else "obj"))
+			nz = numpy.flatnonzero(self.__obj)
+			self.__linear_expr(f, nz, self.__obj[nz])
+			f.write("\nSubject To\n")
+			ops = dict({'E': "=", 'G': ">=", 'L': "<="})
+			for i in range(self.get_num_rows()):
+				f.write(" {0}:".format(self.__row_names[i]))
+				indices, values = self.get_row(i)
+				self.__linear_expr(f, indices, values)
+				f.write(" {0} {1}\n".format(ops[self.__senses[i]], self.__num(self.__rhs[i])))
+			#Bounds (only the non-default ones: 0 <= x <= +infinity)
+			bounded = numpy.flatnonzero((self.__lb != 0) | (self.__ub != LPmodel.INFINITY))
+			if len(bounded) > 0:
+				f.write("Bounds\n")
+			for j in bounded:
+				lb, ub = self.__lb[j], self.__ub[j]
+				if lb == -LPmodel.INFINITY and ub == LPmodel.INFINITY:
+					f.write(" {0} free\n".format(self.__var_names[j]))
+				else:
+					low = "-infinity" if lb == -LPmodel.INFINITY else self.__num(lb)
+					up = "+infinity" if ub == LPmodel.INFINITY else self.__num(ub)
+					f.write(" {0} <= {1} <= {2}\n".format(low, self.__var_names[j], up))
+			f.write("End\n")
+
+	def write_mps(self, filename):
+		"""Writes the model in free MPS format (streaming, column by column)"""
+		A = self.__A.tocsc()
+		A.sort_indices()
+		obj = self.__name if self.__name != None else "obj"
+		with open(filename, "w") as f:
+			f.write("NAME {0}\n".format(self.__name if self.__name != None else ""))
+			f.write("OBJSENSE\n    {0}\n".format("MAX" if self.__sense == "max" else "MIN"))
+			f.write("ROWS\n N {0}\n".format(obj))
+			for i in range(self.get_num_rows()):
+				f.write(" {0} {1}\n".format(self.__senses[i], self.__row_names[i]))
+			f.write("COLUMNS\n")
+			for j in range(self.get_num_vars()):
+				name = self.__var_names[j]
+				if self.__obj[j] != 0:
+					f.write(" {0} {1} {2}\n".format(name, obj, self.__num(self.__obj[j])))
+				start, end = A.indptr[j], A.indptr[j+1]
+				for k in range(start, end):
+					if A.data[k] != 0:
+						f.write(" {0} {1} {2}\n".format(name, self.__row_names[A.indices[k]], self.__num(A.data[k])))
+			f.write("RHS\n")
+			for i in numpy.flatnonzero(self.__rhs):
+				f.write(" RHS {0} {1}\n".format(self.__row_names[i], self.__num(self.__rhs[i])))
+			f.write("BOUNDS\n")
+			for j in range(self.get_num_vars()):
+				name = self.__var_names[j]
+				lb, ub = self.__lb[j], self.__ub[j]
+				if lb == -LPmodel.INFINITY and ub == LPmodel.INFINITY:
+					f.write(" FR BND {0}\n".format(name))
+				else:
+					if lb == -LPmodel.INFINITY:
+						f.write(" MI BND {0}\n".format(name))
+					elif lb != 0:
+						f.write(" LO BND {0} {1}\n".format(name, self.__num(lb)))
+					if ub != LPmodel.INFINITY:
+						f.write(" UP BND {0} {1}\n".format(name, self.__num(ub)))
+			f.write("ENDATA\n")
+
+	def save(self, filename):
+		"""Saves the model in a compact binary format (compressed numpy .npz)"""
+		numpy.savez_compressed(filename, name=numpy.array(self.__name if self.__name != None else ""), sense=numpy.array(self.__sense),
+			var_names=numpy.array(self.__var_names), obj=self.__obj, lb=self.__lb, ub=self.__ub,
+			indptr=self.__A.indptr, indices=self.__A.indices, data=self.__A.data,
+			shape=numpy.array(self.__A.shape), senses=numpy.array(self.__senses), rhs=self.__rhs,
+			row_names=numpy.array(self.__row_names))
+
+	@staticmethod
+	def load(filename):
+		"""Loads a model saved with save()"""
+		with numpy.load(filename) as d:
+			A = csr_array((d['data'], d['indices'], d['indptr']), shape=tuple(d['shape']))
+			return LPmodel(str(d['name']) if str(d['name']) != "" else None, str(d['sense']), d['var_names'].tolist(), d['obj'], d['lb'], d['ub'],
+				A, d['senses'].tolist(), d['rhs'], d['row_names'].tolist())
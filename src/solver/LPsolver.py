@@ -4,10 +4,25 @@
 # -*- coding: UTF-8 -*-
 #from typing import List
 from abc import ABC, abstractmethod
+import importlib #backends are imported at runtime
 
 
 class LPsolver(ABC):
 	"""@Interface Solver API"""
+
+	#Available backends: {name: (module, class)}, imported only when chosen
+	BACKENDS = dict({'cplex': ('src.solver.CPLEX_LPsolver', 'CPLEX_LPsolver')})
+
+	@staticmethod
+	def get_backend(name='cplex'):
+		"""Solver class of the backend name (its modules, e.g. the solver library, are imported now)"""
+		if name not in LPsolver.BACKENDS:
+			raise Exception("Unknown solver backend: {0} (available: {1})".format(name, ", ".join(LPsolver.BACKENDS)))
+		module, cls = LPsolver.BACKENDS[name]
+		try:
+			return getattr(importlib.import_module(module), cls)
+		except ImportError as exc:
+			raise Exception("The solver backend {0} is not available: {1}".format(name, exc))
 	
 	@abstractmethod
 	def populate_lp(self, aPTPN):
@@ -0,0 +1,275 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import threading
+from collections import OrderedDict #LRU of the LP fragments of the modules
+import numpy
+from scipy.sparse import coo_array, csr_array, dok_array
+from src.net.PTPN import PTPN
+from src.net.PTPNmodule import PTPNmodule
+from src.solver.LPbuilder import LPbuilder
+from src.solver.LPmodel import LPmodel
+from src.solver.ParamsExtractor import ParamsExtractor
+from src.perf.Profiler import Profiler
+
+class ModularLPbuilder(LPbuilder):
+	"""
+	LP builder of a composite net (PTPN.compose): the GSPN and the LP max X are assembled from the
+	LP fragments of its modules, cached by module hash (PTPNmodule.module_hash). The fragment of a
+	module holds its GSPN (ParamsExtractor) and its LP max X rows (LPbuilder):
+	- reachability and flow rows of the private places
+	- Little's law rows of its transitions
+	- routing rows of its equal conflict sets without interface input places
+	- contributions of its transitions to the reachability and flow rows of the interface places
+	The global LP concatenates the fragments of the instances (with renumbered columns) and the
+	interface constraints: reachability and flow rows of the interface places (sum of the
+	contributions) and routing rows of the equal conflict sets with interface (or no) input places,
+	which may include transitions of several modules.
+	The GSPN has the places and transitions of the one retrieved from the (flattened) composite net,
+	with the same dok ids, and the LP max X has the same constraints (up to their order): after a
+	change of one module, only the fragment of that module is built again.
+	"""
+
+	#Fragments kept in the cache
+	CACHE_SIZE = 256
+
+	#{module hash: fragment}
+	__cache = OrderedDict()
+	__cache_lock = threading.Lock()
+	__stats = dict({'hits': 0, 'misses': 0})
+
+	def __init__(self, ptpn: PTPN, verbose=False):
+		if not ptpn.get_modules():
+			raise Exception("The net {0} is not a composite net".format(ptpn.get_name()))
+		self.__ptpn = ptpn
+		self.__fragments = [self.__fragment(module) for _, module in ptpn.get_modules()]
+		self.__maps = [] #[(place dok ids, transition dok ids)] of each instance
+		pe = ParamsExtractor()
+		self.__assemble_gspn(pe)
+		super().__init__(pe, verbose)
+		self.__pe = pe
+
+	@staticmethod
+	def clear_cache():
+		with ModularLPbuilder.__cache_lock:
+			ModularLPbuilder.__cache.clear()
+			ModularLPbuilder.__stats.update({'hits': 0, 'misses': 0})
+
+	@staticmethod
+	def get_cache_stats():
+		"""Fragments found in ('hits') and added to ('misses') the cache"""
+		with ModularLPbuilder.__cache_lock:
+			return dict(ModularLPbuilder.__stats, size=len(ModularLPbuilder.__cache))
+
+	def get_pe(self):
+		"""GSPN of the composite net (ParamsExtractor)"""
+		return self.__pe
+
+	def __fragment(self, module: PTPNmodule):
+		key = module.module_hash()
+		with ModularLPbuilder.__cache_lock:
+			fragment = ModularLPbuilder.__cache.get(key)
+			if fragment != None:
+				ModularLPbuilder.__cache.move_to_end(key)
+				ModularLPbuilder.__stats['hits'] += 1
+				return fragment
+		fragment = self.__build_fragment(module)
+		with ModularLPbuilder.__cache_lock:
+			ModularLPbuilder.__cache.update({key: fragment})
+			ModularLPbuilder.__stats['misses'] += 1
+			while len(ModularLPbuilder.__cache) > ModularLPbuilder.CACHE_SIZE:
+				ModularLPbuilder.__cache.popitem(last=False)
+		return fragment
+
+	@Profiler.timed("lp_fragment")
+	def __build_fragment(self, module: PTPNmodule):
+		#GSPN and LP max X rows of a module (local dok ids)
+		net = module.get_net()
+		if not net.get_transitions():
+			raise Exception("The module {0} has no transitions".format(module.get_name()))
+		pe = ParamsExtractor()
+		pe.retrieve_net_structure(net)
+		B = csr_array(pe.get_b(), dtype=float)
+		F = csr_array(pe.get_f(), dtype=float)
+		B.eliminate_zeros()
+		F.eliminate_zeros()
+		np, nt = B.shape
+		pids = [None] * np
+		for pid, k in pe.get_pid_to_dokid().items():
+			pids[k] = pid
+		tids = [None] * nt
+		for tid, k in pe.get_tid_to_dokid().items():
+			tids[k] = tid
+		n_places = len(net.get_places())
+		n_trans = len(net.get_transitions())
+		interface = numpy.array([pid in module.get_interface() for pid in pids[:n_places]] + [False] * (np - n_places))
+		Bc = B.tocsc()
+		Fc = F.tocsc()
+		Bc.sort_indices()
+		#Helper transitions of the distributions: (input helper place, output place)
+		helpers = [(int(Bc.indices[Bc.indptr[t]]), int(Fc.indices[Fc.indptr[t]])) for t in range(n_trans, nt)]
+		#The weights are copied before the LP normalizes them
+		w = csr_array(pe.get_w(), dtype=float).toarray().ravel()
+		fragment = dict({'pids': pids, 'tids': tids, 'n_places': n_places, 'n_trans': n_trans, 'interface': interface,
+			'helpers': helpers, 'm0': csr_array(pe.get_m0()).toarray().ravel(), 'w': w,
+			'delta': csr_array(pe.get_delta(), dtype=float).toarray().ravel(), 'b': B.tocoo(), 'f': F.tocoo()})
+
+		##############################################################
+		#LP max X rows of the module
+		builder = LPbuilder(pe)
+		lp = builder.build_lpX(0)
+		A = lp.get_A()
+		n_little = len([r for r in lp.get_row_names() if r.startswith('little')])
+		reach = A[:np].tocoo()
+		#Interface places: contributions of the transitions (the marking is set by the composite net)
+		keep = ~(interface[reach.row] & (reach.col < np))
+		fragment.update({'reach': coo_array((reach.data[keep], (reach.row[keep], reach.col[keep])), shape=reach.shape),
+			'flow': A[np:2*np].tocoo(), 'little': A[2*np:2*np + n_little].tocoo()})
+		#Routing rows of the equal conflict sets with private input places; the other ones are global
+		local = []
+		scope = []
+		row = 2*np + n_little
+		for ecs in builder.get_ecs().values():
+			t = next(iter(ecs))
+			inputs = Bc.indices[Bc.indptr[t]:Bc.indptr[t+1]]
+			is_local = len(inputs) > 0 and not interface[inputs].any()
+			if not is_local:
+				scope += sorted(ecs)
+			if len(ecs) > 1:
+				if is_local:
+					local += list(range(row, row + len(ecs)))
+				row += len(ecs)
+		fragment.update({'routing': A[local].tocoo() if local else coo_array((0, A.shape[1])), 'scope': scope,
+			'inputs': dict({t: Bc.indices[Bc.indptr[t]:Bc.indptr[t+1]] for t in scope})})
+		return fragment
+
+	@Profiler.timed("gspn_assembly")
+	def __assemble_gspn(self, pe):
+		#Dok ids of the places/transitions of each instance and GSPN of the composite net
+		places = self.__ptpn.get_places()
+		trans = self.__ptpn.get_transitions()
+		pindex = dict({p.get_id(): i for i, p in enumerate(places)})
+		tindex = dict({t.get_id(): i for i, t in enumerate(trans)})
+		pid_to_dokid = dict({p.get_id(): i for i, p in enumerate(places)})
+		tid_to_dokid = dict({t.get_id(): i for i, t in enumerate(trans)})
+		gpids = [p.get_id() for p in places] #place ids by dok id
+		#Helper places/transitions follow the places/transitions of the net (as in the GSPN transformation)
+		for (instance, module), fr in zip(self.__ptpn.get_modules(), self.__fragments):
+			prefix = instance + "."
+			np = len(fr['pids'])
+			gp = numpy.zeros(np, dtype=int)
+			for p in range(fr['n_places']):
+				pid = fr['pids'][p]
+				gp[p] = pindex[pid] if fr['interface'][p] else pindex[prefix + pid]
+			for p in range(fr['n_places'], np):
+				gp[p] = len(pid_to_dokid)
+				pid_to_dokid.update({prefix + fr['pids'][p]: int(gp[p])})
+				gpids.append(prefix + fr['pids'][p])
+			gt = numpy.array([tindex[prefix + tid] for tid in fr['tids'][:fr['n_trans']]] + [0] * len(fr['helpers']), dtype=int)
+			for k, (p_in, p_out) in enumerate(fr['helpers']):
+				t = fr['n_trans'] + k
+				gt[t] = len(tid_to_dokid)
+				tid_to_dokid.update({gpids[gp[p_in]] + "_" + gpids[gp[p_out]]: int(gt[t])})
+			self.__maps.append((gp, gt))
+		NP = len(pid_to_dokid)
+		NT = len(tid_to_dokid)
+		m0 = numpy.zeros(NP, dtype=int)
+		m0[:len(places)] = [p.get_initial_marking() for p in places]
+		w = numpy.zeros(NT)
+		delta = numpy.zeros(NT)
+		arrays = dict({'b': ([], [], []), 'f': ([], [], [])})
+		for (gp, gt), fr in zip(self.__maps, self.__fragments):
+			w[gt] = fr['w']
+			delta[gt] = fr['delta']
+			for k in ['b', 'f']:
+				arrays[k][0].append(gp[fr[k].row])
+				arrays[k][1].append(gt[fr[k].col])
+				arrays[k][2].append(fr[k].data.astype(int))
+		b, f = [ModularLPbuilder.__dok(numpy.concatenate(arrays[k][0]), numpy.concatenate(arrays[k][1]),
+			numpy.concatenate(arrays[k][2]), (NP, NT), int) for k in ['b', 'f']]
+		nz = numpy.nonzero(m0)[0]
+		m0 = ModularLPbuilder.__dok(numpy.zeros(len(nz), dtype=int), nz, m0[nz], (1, NP), int)
+		w, delta = [ModularLPbuilder.__dok(numpy.nonzero(v)[0], numpy.zeros(numpy.count_nonzero(v), dtype=int),
+			v[numpy.nonzero(v)[0]], (NT, 1), float) for v in [w, delta]]
+		pe.set_net_structure(m0, b, f, w, delta, pid_to_dokid, tid_to_dokid)
+
+	@staticmethod
+	def __dok(rows, cols, vals, shape, dtype):
+		#Dok array with built-in int keys (as the ones of the GSPN transformation, see the hashes)
+		dok = dok_array(shape, dtype=dtype)
+		for i, j, v in zip(rows.tolist(), cols.tolist(), vals):
+			dok[i, j] = v
+		return dok
+
+	@Profiler.timed("lp_build_X")
+	def build_lpX(self, tr_dokid, name=None, sense='max'):
+		"""
+		LP max X of the transition with dok id tr_dokid, assembled from the fragments of the modules
+		and the interface constraints (same variables and constraints as LPbuilder.build_lpX)
+		"""
+		NP = len(self.__pe.get_pid_to_dokid())
+		NT = len(self.__pe.get_tid_to_dokid())
+		ncols = NP + 2*NT
+		v_names = ['M' + str(p) for p in range(NP)] + ['s' + str(t) for t in range(NT)] + ['x' + str(t) for t in range(NT)]
+		obj = numpy.zeros(ncols)
+		obj[NP + NT + tr_dokid] = 1.0
+		m0 = csr_array(self.__pe.get_m0(), dtype=float).toarray().ravel()
+		sections = dict({'reach': [], 'flow': [], 'little': [], 'routing': []})
+		n_little = 0
+		n_routing = 0
+		interface = set()
+
+		##############################################################
+		#Rows of the fragments (renumbered columns)
+		with Profiler.phase("fragments"):
+			for (gp, gt), fr in zip(self.__maps, self.__fragments):
+				cols = numpy.concatenate([gp, NP + gt, NP + NT + gt])
+				interface.update(gp[numpy.nonzero(fr['interface'])[0]].tolist())
+				for k, rows in [('reach', gp), ('flow', NP + gp)]:
+					sections[k].append((rows[fr[k].row], cols[fr[k].col], fr[k].data))
+				sections['little'].append((2*NP + n_little + fr['little'].row, cols[fr['little'].col], fr['little'].data))
+				n_little += fr['little'].shape[0]
+				sections['routing'].append((fr['routing'].row, cols[fr['routing'].col], fr['routing'].data, n_routing))
+				n_routing += fr['routing'].shape[0]
+
+		##############################################################
+		#Interface constraints: marking of the interface places and global routing
+		with Profiler.phase("interface"):
+			interface = numpy.array(sorted(interface), dtype=int)
+			sections['reach'].append((interface, interface, numpy.ones(len(interface))))
+			ecs = OrderedDict() #{global input places: [global transition dok ids]}
+			for (gp, gt), fr in zip(self.__maps, self.__fragments):
+				for t in fr['scope']:
+					ecs.setdefault(tuple(sorted(gp[fr['inputs'][t]].tolist())), []).append(int(gt[t]))
+			w = csr_array(self.__pe.get_w(), dtype=float).toarray().ravel()
+			rows = []
+			cols = []
+			vals = []
+			for conflict in ecs.values():
+				if len(conflict) > 1:
+					total = w[conflict].sum()
+					weights = w[conflict] / total if total != 1.0 else w[conflict]
+					for t, wt in zip(conflict, weights):
+						rows += [n_routing] * len(conflict)
+						cols += [NP + NT + t1 for t1 in conflict]
+						vals += [1.0 - wt if t1 == t else -wt for t1 in conflict]
+						n_routing += 1
+			sections['routing'].append((numpy.array(rows, dtype=int), numpy.array(cols, dtype=int), numpy.array(vals), 0))
+
+		row = numpy.concatenate([r for r, _, _ in sections['reach'] + sections['flow'] + sections['little']] +
+			[r + offset + 2*NP + n_little for r, _, _, offset in sections['routing']])
+		col = numpy.concatenate([c for _, c, _ in sections['reach'] + sections['flow'] + sections['little']] +
+			[c for _, c, _, _ in sections['routing']])
+		val = numpy.concatenate([v for _, _, v in sections['reach'] + sections['flow'] + sections['little']] +
+			[v for _, _, v, _ in sections['routing']])
+		A = coo_array((val, (row, col)), shape=(2*NP + n_little + n_routing, ncols)).tocsr()
+		A.eliminate_zeros()
+		senses = ['E'] * (2*NP) + ['G'] * n_little + ['E'] * n_routing
+		rhs = list(m0) + [0.0] * (NP + n_little + n_routing)
+		row_names = ['reach' + str(i) for i in range(NP)] + ['flow' + str(NP + i) for i in range(NP)] + \
+			['little' + str(2*NP + i) for i in range(n_little)] + ['routing' + str(2*NP + n_little + i) for i in range(n_routing)]
+		return LPmodel(name, sense, v_names, obj, numpy.zeros(ncols), numpy.full(ncols, LPmodel.INFINITY),
+			A, senses, rhs, row_names)
@@ -4,8 +4,11 @@
 # -*- coding: UTF-8 -*-
 #from typing import List
 
+import hashlib #structure/parameter hashes
 from scipy.sparse import dok_array #Dictionary Of Keys based sparse array
+from scipy.sparse import csr_array
 from src.net.PTPN import PTPN
+from src.perf.Profiler import Profiler
 
 class ParamsExtractor:
 	def __init__(self):
@@ -57,12 +60,49 @@ class ParamsExtractor:
 	def get_delta(self):
 		return self.__delta
 
+	def get_c(self):
+		"""Incidence matrix C = F - B of the GSPN (CSR, integer)"""
+		C = csr_array(self.__f) - csr_array(self.__b)
+		C.eliminate_zeros()
+		C.sort_indices()
+		return C
+
 	def get_pid_to_dokid(self):
 		return self.__pid_to_dokid
 
 	def get_tid_to_dokid(self):
 		return self.__tid_to_dokid
 
+	def __hash(self, *items):
+		h = hashlib.sha256()
+		for item in items:
+			h.update(repr(item).encode())
+		return h.hexdigest()
+
+	def __items(self, dok):
+		#Sorted non-zero entries of a dok array (values as built-in floats)
+		return sorted((k, float(v)) for k, v in dok.items())
+
+	def structure_hash(self):
+		"""Hash of the GSPN structure (place/transition mapping and pre/post-incidence matrices)"""
+		return self.__hash(list(self.__pid_to_dokid.items()), list(self.__tid_to_dokid.items()),
+			self.__items(self.__b), self.__items(self.__f))
+
+	def params_hash(self):
+		"""Hash of the GSPN parameters (initial marking, weights and mean firing times)"""
+		return self.__hash(self.__items(self.__m0), self.__items(self.__w), self.__items(self.__delta))
+
+	def set_net_structure(self, m0, b, f, w, delta, pid_to_dokid, tid_to_dokid):
+		"""GSPN structure computed elsewhere (e.g., assembled from the modules of a composite net)"""
+		self.__m0 = m0
+		self.__b = b
+		self.__f = f
+		self.__w = w
+		self.__delta = delta
+		self.__pid_to_dokid = pid_to_dokid
+		self.__tid_to_dokid = tid_to_dokid
+
+	@Profiler.timed("gspn_transformation")
 	def retrieve_net_structure(self, ptpn : PTPN):
 
 		places = ptpn.get_places()
@@ -148,11 +188,14 @@ class ParamsExtractor:
 						self.__f.resize((len(self.__pid_to_dokid),len(self.__tid_to_dokid)))
 						self.__f[self.__pid_to_dokid[pid], self.__tid_to_dokid[tid_tnew]] = mult
 				else:
-					pid,mult,_ = post_set[d][0]
-					self.__f[self.__pid_to_dokid[pid], self.__tid_to_dokid[tid] ] = mult
+					#Deterministic output places (all of them, e.g., fork transitions)
+					for pid,mult,_ in post_set[d]:
+						self.__f[self.__pid_to_dokid[pid], self.__tid_to_dokid[tid] ] = mult
 
 			#Debug
 			#self.print_net_structure()
+		Profiler.set_info("gspn", dict({'places': len(self.__pid_to_dokid), 'transitions': len(self.__tid_to_dokid),
+			'b_nnz': self.__b.nnz, 'f_nnz': self.__f.nnz}))
 		#return self.__m0, self.__b, self.__f, self.__r, self.__delta
 
 	#Debug purpose
@@ -0,0 +1,146 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+import contextlib
+try:
+	import fcntl #file locking (POSIX only)
+except ImportError:
+	fcntl = None
+
+class ResultCache:
+	"""
+	Content-addressed on-disk cache of the bound results (throughput, cycle time, slowest
+	subnets), shared by the runs and the batch workers. The key hashes the GSPN structure and
+	parameters (ParamsExtractor), the reference transition, the backend and the solver settings:
+	a hit skips the generation and the solution of the LPs.
+	An entry is a small json file <key[:2]>/<key>.json, read directly from its key; its mtime
+	is its last access time. The entries are written to a temporary file then renamed (atomic),
+	so the readers never lock. The writers share the lock of the cache and the eviction (entries
+	older than max_age, then the least recently used ones beyond max_size) holds it exclusively.
+	Without fcntl (e.g., on Windows) the cache is not locked.
+	"""
+
+	#Lock file of the cache
+	LOCK = ".lock"
+	#Number of puts of a process between two evictions
+	EVICT_EVERY = 32
+
+	def __init__(self, cache_dir, max_size=64*1024*1024, max_age=30*24*3600):
+		self.__dir = cache_dir
+		self.__max_size = max_size #bytes
+		self.__max_age = max_age #seconds since the last access (None: no expiration)
+		self.__puts = 0
+		os.makedirs(self.__dir, exist_ok=True)
+
+	def get_dir(self):
+		return self.__dir
+
+	def make_key(self, pe, tr_id, backend, settings):
+		"""
+		Key of the result of transition tr_id, pe: ParamsExtractor with the net structure already
+		retrieved, settings: solver settings (SolverProfile.get_settings)
+		"""
+		content = "|".join([pe.structure_hash(), pe.params_hash(), str(tr_id), backend, settings])
+		return hashlib.sha256(content.encode()).hexdigest()
+
+	def __path(self, key):
+		return os.path.join(self.__dir, key[:2], key + ".json")
+
+	def get(self, key):
+		"""Result (BoundResult dictionary) with key, None if missing or expired: a hit refreshes its last access time"""
+		path = self.__path(key)
+		try:
+			if self.__max_age != None and time.time() - os.path.getmtime(path) > self.__max_age:
+				return None
+			with open(path) as f:
+				result = json.load(f)
+		except (OSError, ValueError):
+			#Missing or evicted meanwhile
+			return None
+		with contextlib.suppress(OSError):
+			os.utime(path)
+		return result
+
+	def put(self, key, result):
+		"""Stores (or replaces) the result with key; the LRU entries are evicted periodically"""
+		path = self.__path(key)
+		with self.__lock(exclusive=False):
+			os.makedirs(os.path.dirname(path), exist_ok=True)
+			fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+			try:
+				with os.fdopen(fd, "w") as f:
+					json.dump(result, f)
+				os.replace(tmp, path)
+			except BaseException:
+				with contextlib.suppress(OSError):
+					os.remove(tmp)
+				raise
+		self.__puts += 1
+		if self.__puts % ResultCache.EVICT_EVERY == 1:
+			#Skipped if another process is evicting
+			self.evict(blocking=False)
+
+	def get_size(self):
+		"""Total size (bytes) of the cache"""
+		return sum(size for _, _, size in self.__entries())
+
+	def evict(self, blocking=True):
+		"""Removes the expired entries, then the least recently used ones until the cache fits in its maximum size"""
+		with self.__lock(exclusive=True, blocking=blocking) as locked:
+			if not locked:
+				return 0
+			now = time.time()
+			entries = sorted(self.__entries(), key=lambda e: e[1])
+			total = sum(size for _, _, size in entries)
+			removed = 0
+			for path, atime, size in entries:
+				expired = self.__max_age != None and now - atime > self.__max_age
+				if not expired and total <= self.__max_size:
+					break
+				with contextlib.suppress(OSError):
+					os.remove(path)
+				total -= size
+				removed += 1
+			return removed
+
+	def clear(self):
+		with self.__lock(exclusive=True):
+			for path, _, _ in self.__entries():
+				with contextlib.suppress(OSError):
+					os.remove(path)
+
+	@contextlib.contextmanager
+	def __lock(self, exclusive, blocking=True):
+		#Lock of the cache among processes: yields False if not blocking and already locked
+		if fcntl == None:
+			yield True
+			return
+		with open(os.path.join(self.__dir, ResultCache.LOCK), "a") as f:
+			try:
+				fcntl.flock(f, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if blocking else fcntl.LOCK_NB))
+			except BlockingIOError:
+				yield False
+				return
+			try:
+				yield True
+			finally:
+				fcntl.flock(f, fcntl.LOCK_UN)
+
+	def __entries(self):
+		#(path, last access, size) of the entries (and of the temporary files left by a crash)
+		entries = []
+		for shard in os.scandir(self.__dir):
+			if shard.is_dir():
+				for entry in os.scandir(shard.path):
+					with contextlib.suppress(OSError):
+						stat = entry.stat()
+						entries.append((entry.path, stat.st_mtime, stat.st_size))
+		return entries
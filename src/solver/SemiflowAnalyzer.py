@@ -0,0 +1,180 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import math
+import threading
+from collections import OrderedDict #LRU of the semiflows of the analyzed structures
+import numpy
+from scipy.sparse import csr_array
+from src.solver.ParamsExtractor import ParamsExtractor
+from src.perf.Profiler import Profiler
+
+class SemiflowAnalyzer:
+	"""
+	Structural analysis of the GSPN retrieved by the ParamsExtractor, without LPs:
+	- minimal P-semiflows (y >= 0, y C = 0) and T-semiflows (x >= 0, C x = 0) of the incidence
+	  matrix C, computed by the Farkas (Fourier-Motzkin) algorithm on sparse rows: the column
+	  eliminated first is the one generating the fewest combinations, the combinations whose
+	  support contains the support of another row are pruned (minimal supports) and the basis
+	  cannot exceed max_basis rows
+	- conservativeness (every place in a P-semiflow) and consistency (every transition in a
+	  T-semiflow)
+	- cycle time of each P-semiflow given the visit ratios, normalized as in LP min CT: the
+	  slowest (marked) P-semiflow gives the bound of LP min CT
+	The semiflows are cached by structure hash (they do not depend on the net parameters).
+	Semiflows are {dok id: weight} dictionaries with integer weights.
+	"""
+
+	#Maximum number of rows of the basis during the elimination
+	MAX_BASIS = 2000
+	#Structures kept in the cache
+	CACHE_SIZE = 32
+
+	#{(structure hash, kind, max_basis): semiflows}
+	__cache = OrderedDict()
+	__cache_lock = threading.Lock()
+
+	def __init__(self, pe: ParamsExtractor, max_basis=MAX_BASIS):
+		self.__pe = pe
+		self.__max_basis = max_basis
+		self.__skey = None #structure hash (computed at the first lookup)
+
+	@staticmethod
+	def clear_cache():
+		with SemiflowAnalyzer.__cache_lock:
+			SemiflowAnalyzer.__cache.clear()
+
+	def get_p_semiflows(self):
+		"""Minimal P-semiflows: [{place dok id: weight}]"""
+		return self.__semiflows('P')
+
+	def get_t_semiflows(self):
+		"""Minimal T-semiflows: [{transition dok id: weight}]"""
+		return self.__semiflows('T')
+
+	def is_conservative(self):
+		return not self.uncovered_places()
+
+	def is_consistent(self):
+		return not self.uncovered_transitions()
+
+	def uncovered_places(self):
+		"""Place ids not covered by any P-semiflow"""
+		return self.__uncovered(self.get_p_semiflows(), self.__pe.get_pid_to_dokid())
+
+	def uncovered_transitions(self):
+		"""Transition ids not covered by any T-semiflow"""
+		return self.__uncovered(self.get_t_semiflows(), self.__pe.get_tid_to_dokid())
+
+	def to_ids(self, semiflow, kind='P'):
+		"""Semiflow with the place (P) or transition (T) ids of the GSPN: {id: weight}"""
+		mapping = self.__pe.get_pid_to_dokid() if kind == 'P' else self.__pe.get_tid_to_dokid()
+		dokid2id = dict({k: i for i, k in mapping.items()})
+		return dict({dokid2id[k]: w for k, w in semiflow.items()})
+
+	def cycle_times(self, v):
+		"""
+		Cycle time of each P-semiflow given the visit ratios v (per transition dok id), by
+		decreasing cycle time: [(cycle time, semiflow)]. The cycle time of a semiflow y is
+		y B (delay * v) over the weights of its marked places (infinite for an unmarked one).
+		"""
+		B = csr_array(self.__pe.get_b(), dtype=float)
+		delta = csr_array(self.__pe.get_delta(), dtype=float).toarray().ravel()
+		demand = B @ (delta * numpy.asarray(v, dtype=float))
+		marked = csr_array(self.__pe.get_m0()).toarray().ravel() > 0
+		cts = []
+		for y in self.get_p_semiflows():
+			tokens = sum(w for p, w in y.items() if marked[p])
+			work = sum(w * demand[p] for p, w in y.items())
+			cts.append((work / tokens if tokens > 0 else (math.inf if work > 0 else 0.0), y))
+		return sorted(cts, key=lambda c: -c[0])
+
+	def max_cycle_time(self, v):
+		"""(cycle time, semiflow) of the slowest P-semiflow given the visit ratios v (None if no semiflows)"""
+		cts = self.cycle_times(v)
+		return cts[0] if cts else None
+
+	def __uncovered(self, semiflows, mapping):
+		covered = set()
+		for s in semiflows:
+			covered.update(s.keys())
+		return sorted(i for i, k in mapping.items() if k not in covered)
+
+	def __semiflows(self, kind):
+		if self.__skey == None:
+			self.__skey = self.__pe.structure_hash()
+		key = (self.__skey, kind, self.__max_basis)
+		with SemiflowAnalyzer.__cache_lock:
+			semiflows = SemiflowAnalyzer.__cache.get(key)
+			if semiflows != None:
+				SemiflowAnalyzer.__cache.move_to_end(key)
+				return semiflows
+		C = self.__pe.get_c()
+		semiflows = self.__farkas(C if kind == 'P' else C.T.tocsr())
+		with SemiflowAnalyzer.__cache_lock:
+			SemiflowAnalyzer.__cache.update({key: semiflows})
+			while len(SemiflowAnalyzer.__cache) > SemiflowAnalyzer.CACHE_SIZE:
+				SemiflowAnalyzer.__cache.popitem(last=False)
+		return semiflows
+
+	@Profiler.timed("semiflows")
+	def __farkas(self, A):
+		#Minimal semiflows y >= 0, y A = 0 of the rows of A (CSR): each row of the basis is a pair
+		#(row of y A: {column: value}, y: {row: weight}) and the columns of A are eliminated one at a time
+		basis = []
+		for i in range(A.shape[0]):
+			cols = A.indices[A.indptr[i]:A.indptr[i+1]].tolist()
+			vals = A.data[A.indptr[i]:A.indptr[i+1]].tolist()
+			basis.append((dict(zip(cols, [int(v) for v in vals])), dict({i: 1})))
+		remaining = set(A.indices.tolist())
+		while remaining:
+			#Column generating the fewest combinations
+			pos = dict()
+			neg = dict()
+			for row, _ in basis:
+				for j, val in row.items():
+					counter = pos if val > 0 else neg
+					counter.update({j: counter.get(j, 0) + 1})
+			j = min(remaining, key=lambda c: (pos.get(c, 0)*neg.get(c, 0) - pos.get(c, 0) - neg.get(c, 0), c))
+			remaining.discard(j)
+			keep = [r for r in basis if j not in r[0]]
+			positive = [r for r in basis if r[0].get(j, 0) > 0]
+			negative = [r for r in basis if r[0].get(j, 0) < 0]
+			kept_supports = [frozenset(y) for _, y in keep]
+			combined = dict() #{support: row} of the combinations with minimal supports
+			for rp, yp in positive:
+				for rn, yn in negative:
+					support = frozenset(yp).union(yn)
+					#Pruning: a support containing the support of another row is not minimal
+					if any(s <= support for s in kept_supports) or any(s <= support for s in combined):
+						continue
+					for s in [s for s in combined if support < s]:
+						del combined[s]
+					combined.update({support: self.__combine(rp, yp, rn, yn, j)})
+					if len(keep) + len(combined) > self.__max_basis:
+						raise Exception("The semiflow basis exceeds {0} rows: increase max_basis".format(self.__max_basis))
+			basis = keep + list(combined.values())
+		#Rows kept before a combination with a smaller support are not minimal
+		supports = [frozenset(y) for _, y in basis]
+		return [y for (_, y), s in zip(basis, supports) if not any(t < s for t in supports)]
+
+	def __combine(self, rp, yp, rn, yn, j):
+		#Combination of a positive and a negative row cancelling column j, divided by the gcd
+		a = rp[j]
+		b = -rn[j]
+		row = dict()
+		for c in set(rp).union(rn):
+			val = b*rp.get(c, 0) + a*rn.get(c, 0)
+			if val != 0:
+				row.update({c: val})
+		y = dict({p: b*yp.get(p, 0) + a*yn.get(p, 0) for p in set(yp).union(yn)})
+		g = 0
+		for val in list(row.values()) + list(y.values()):
+			g = math.gcd(g, val)
+		if g > 1:
+			row = dict({c: val // g for c, val in row.items()})
+			y = dict({p: val // g for p, val in y.items()})
+		return row, y
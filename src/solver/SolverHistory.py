@@ -0,0 +1,74 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+import os
+import json
+import math
+
+class SolverHistory:
+	"""
+	Local history of the LP solution times, used by the 'auto' solver profile.
+	LPs are grouped by size (rows, columns) and density buckets; for each bucket the
+	history records, per method, the number of solutions and the mean solution time.
+	The history is saved every SAVE_EVERY records and at the end of a run (save).
+	"""
+
+	DEFAULT_FILE = os.path.join(os.path.expanduser("~"), ".ptpnbound", "solver_history.json")
+	#Number of records between two saves of the history
+	SAVE_EVERY = 32
+
+	def __init__(self, filename=None):
+		self.__filename = filename if filename != None else SolverHistory.DEFAULT_FILE
+		self.__history = dict() #{bucket: {method: [count, mean time]}}
+		self.__unsaved = 0 #records not saved yet
+		self.__error = None #history file that cannot be read (logged by the solver)
+		if os.path.isfile(self.__filename):
+			try:
+				with open(self.__filename) as f:
+					self.__history = json.load(f)
+			except (OSError, ValueError):
+				self.__error = "The solver history {0} cannot be read: ignored".format(self.__filename)
+
+	def get_filename(self):
+		return self.__filename
+
+	def get_error(self):
+		return self.__error
+
+	def bucket(self, rows, cols, nnz):
+		"""Bucket of an LP: powers of two of rows and columns, power of ten of the density"""
+		density = nnz / max(1, rows*cols)
+		return "r{0}_c{1}_d{2}".format(int(math.log2(max(1, rows))), int(math.log2(max(1, cols))),
+			int(math.floor(math.log10(density))) if density > 0 else 0)
+
+	def get_records(self, bucket):
+		"""{method: [count, mean time]} of the bucket"""
+		return self.__history.get(bucket, dict())
+
+	def record(self, bucket, method, elapsed):
+		"""Records the solution time (seconds) of a method (the history is saved every SAVE_EVERY records)"""
+		records = self.__history.setdefault(bucket, dict())
+		count, mean = records.get(method, [0, 0.0])
+		records.update({method: [count + 1, mean + (elapsed - mean) / (count + 1)]})
+		self.__unsaved += 1
+		if self.__unsaved >= SolverHistory.SAVE_EVERY:
+			self.save()
+
+	def best(self, bucket, candidates):
+		"""Fastest method (mean time) among the candidates recorded in the bucket, None if any is missing"""
+		records = self.get_records(bucket)
+		if any(c not in records for c in candidates):
+			return None
+		return min(candidates, key=lambda c: records[c][1])
+
+	def save(self):
+		"""Saves the history if there are records not saved yet"""
+		if self.__unsaved == 0:
+			return
+		self.__unsaved = 0
+		os.makedirs(os.path.dirname(os.path.abspath(self.__filename)), exist_ok=True)
+		with open(self.__filename, "w") as f:
+			json.dump(self.__history, f, indent=1)
@@ -0,0 +1,142 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+from src.solver.SolverHistory import SolverHistory
+
+class SolverProfile:
+	"""
+	Configuration of the LP solver: method, threads, tolerances, time limit and log.
+	Methods: 'default' (chosen by the solver), 'primal', 'dual', 'barrier',
+	'barrier_nocrossover', 'concurrent', 'network', 'sifting' and 'auto' (chosen from
+	the LP size and density and the local history of the solution times).
+	"""
+
+	METHODS = ['default', 'primal', 'dual', 'barrier', 'barrier_nocrossover', 'concurrent', 'network', 'sifting', 'auto']
+
+	#Named presets: {name: parameters}
+	PRESETS = dict({
+		'default': dict({'method': 'default'}),
+		'quiet': dict({'method': 'default', 'log': False}),
+		'primal': dict({'method': 'primal'}),
+		'dual': dict({'method': 'dual'}),
+		'barrier': dict({'method': 'barrier'}),
+		'barrier_nocrossover': dict({'method': 'barrier_nocrossover'}),
+		'concurrent': dict({'method': 'concurrent'}),
+		'accurate': dict({'method': 'dual', 'optimality_tol': 1e-9, 'feasibility_tol': 1e-9}),
+		'fast': dict({'method': 'barrier_nocrossover', 'threads': 0, 'log': False}),
+		'auto': dict({'method': 'auto', 'log': False})
+	})
+
+	#Candidate methods of the 'auto' mode (heuristic order: small LPs, large LPs)
+	AUTO_SMALL = ['dual', 'primal', 'barrier_nocrossover']
+	AUTO_LARGE = ['barrier_nocrossover', 'dual', 'concurrent']
+	#LPs with more non-zeros are considered large
+	LARGE_NNZ = 100000
+
+	def __init__(self, name='default', method='default', threads=0, optimality_tol=None, feasibility_tol=None,
+		time_limit=None, log=True, history=None):
+		if method not in SolverProfile.METHODS:
+			raise Exception("Unknown solver method: {0}".format(method))
+		self.__name = name
+		self.__method = method
+		self.__threads = threads #0: chosen by the solver
+		self.__optimality_tol = optimality_tol
+		self.__feasibility_tol = feasibility_tol
+		self.__time_limit = time_limit #seconds
+		self.__log = log
+		self.__history = history #SolverHistory (auto mode)
+
+	@staticmethod
+	def preset(name, **overrides):
+		"""Profile of a named preset, with some parameters possibly overridden"""
+		if name not in SolverProfile.PRESETS:
+			raise Exception("Unknown solver profile: {0}".format(name))
+		params = dict(SolverProfile.PRESETS[name])
+		params.update({k: v for k, v in overrides.items() if v != None})
+		if params['method'] == 'auto' and params.get('history') == None:
+			params.update({'history': SolverHistory()})
+		return SolverProfile(name, **params)
+
+	def get_name(self):
+		return self.__name
+
+	def get_method(self):
+		return self.__method
+
+	def get_threads(self):
+		return self.__threads
+
+	def get_time_limit(self):
+		return self.__time_limit
+
+	def get_log(self):
+		return self.__log
+
+	def get_history(self):
+		return self.__history
+
+	def get_settings(self):
+		"""Settings that may change the solution (method, tolerances, time limit), e.g. for cache keys"""
+		return "method={0};opt={1};feas={2};time={3}".format(self.__method, self.__optimality_tol,
+			self.__feasibility_tol, self.__time_limit)
+
+	def choose(self, rows, cols, nnz):
+		"""
+		Method and threads used to solve an LP with the given dimensions.
+		In 'auto' mode the untried candidates of the LP bucket are tried first (in heuristic order),
+		then the fastest recorded one is chosen.
+		"""
+		if self.__method != 'auto':
+			return self.__method, self.__threads
+		large = nnz > SolverProfile.LARGE_NNZ
+		candidates = SolverProfile.AUTO_LARGE if large else SolverProfile.AUTO_SMALL
+		threads = self.__threads if self.__threads else (0 if large else 1)
+		if self.__history == None:
+			return candidates[0], threads
+		bucket = self.__history.bucket(rows, cols, nnz)
+		best = self.__history.best(bucket, candidates)
+		if best == None:
+			records = self.__history.get_records(bucket)
+			best = [c for c in candidates if c not in records][0]
+		return best, threads
+
+	def record(self, rows, cols, nnz, method, elapsed):
+		"""Records the solution time of the method chosen in 'auto' mode"""
+		if self.__method == 'auto' and self.__history != None:
+			self.__history.record(self.__history.bucket(rows, cols, nnz), method, elapsed)
+
+	def save_history(self):
+		"""Saves the history of the solution times ('auto' mode), at the end of a run"""
+		if self.__history != None:
+			self.__history.save()
+
+	def apply_cplex(self, pb, method, threads, basic=False):
+		"""
+		Sets the parameters of a CPLEX problem.
+		basic: a basic optimal solution is required (barrier with crossover)
+		"""
+		params = pb.parameters
+		methods = dict({'default': params.lpmethod.values.auto, 'primal': params.lpmethod.values.primal,
+			'dual': params.lpmethod.values.dual, 'barrier': params.lpmethod.values.barrier,
+			'barrier_nocrossover': params.lpmethod.values.barrier, 'concurrent': params.lpmethod.values.concurrent,
+			'network': params.lpmethod.values.network, 'sifting': params.lpmethod.values.sifting})
+		params.lpmethod.set(methods[method])
+		#Barrier without crossover: non-basic (interior) solution
+		if method == 'barrier_nocrossover' and not basic:
+			params.solutiontype.set(params.solutiontype.values.non_basic)
+		else:
+			params.solutiontype.set(params.solutiontype.values.auto)
+		params.threads.set(threads)
+		if self.__optimality_tol != None:
+			params.simplex.tolerances.optimality.set(self.__optimality_tol)
+			params.barrier.convergetol.set(self.__optimality_tol)
+		if self.__feasibility_tol != None:
+			params.simplex.tolerances.feasibility.set(self.__feasibility_tol)
+		if self.__time_limit != None:
+			params.timelimit.set(self.__time_limit)
+		if not self.__log:
+			pb.set_log_stream(None)
+			pb.set_results_stream(None)
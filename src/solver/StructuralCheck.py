@@ -0,0 +1,189 @@
+#@Author: Simona Bernardi
+#@Date: 19/10/2026
+#!/usr/bin/python3
+# -*- coding: UTF-8 -*-
+#from typing import List
+
+from collections import deque
+from scipy.sparse import csr_array
+from src.solver.ParamsExtractor import ParamsExtractor
+from src.solver.LPbuilder import LPbuilder
+from src.perf.Profiler import Profiler
+
+class StructuralCheck:
+	"""
+	Pre-flight analysis of the GSPN retrieved by the ParamsExtractor, linear in the number of
+	arcs, identifying the transitions whose throughput is zero without solving LP max X:
+	- dead transitions: consumers of the maximal siphon empty at m0 (it is never marked again),
+	  including the transitions not reachable from the marked places
+	- transitions with weight 0 in their equal conflict set
+	- transitions with zero throughput in every T-flow (C x = 0, x >= 0, routing): a place whose
+	  remaining transitions only produce (or only consume) it forces their throughputs to zero,
+	  and a zero throughput propagates to the equal conflict set (sign propagation on C)
+	The equal conflict sets whose weights do not sum to 1 (normalized by the LP) are reported.
+	Transitions are identified by their dok ids; the diagnostics use the GSPN ids.
+	The zeros hold in the net, but the pre-check can be tighter than LP max X: the consumers of an
+	empty siphon are dead, while the state equation of the LP (whose solutions need not be
+	reachable markings) may still allow them a positive throughput. The bounds stay valid.
+	"""
+
+	#Tolerance of the sum of the weights of an equal conflict set
+	TOLERANCE = 1e-9
+
+	def __init__(self, pe: ParamsExtractor, ecs=None):
+		self.__pe = pe
+		self.__ecs = ecs #equal conflict sets (LPbuilder.get_ecs), computed if None
+		self.__siphon = set() #maximal siphon empty at m0 (place dok ids)
+		self.__unreachable = set() #transitions not reachable from the marked places
+		self.__zero = dict() #{transition dok id: reason}
+		self.__ecs_weights = [] #[(transition dok ids, sum of weights)] with sum != 1
+		self.__run()
+
+	def get_siphon(self):
+		"""Place ids of the maximal siphon empty at m0"""
+		return self.__ids(self.__siphon, self.__pe.get_pid_to_dokid())
+
+	def get_unreachable(self):
+		"""Transition ids not reachable from the marked places"""
+		return self.__ids(self.__unreachable, self.__pe.get_tid_to_dokid())
+
+	def get_zero_transitions(self):
+		"""Transition ids with zero throughput: {id: reason}"""
+		dokid2tid = dict({k: i for i, k in self.__pe.get_tid_to_dokid().items()})
+		return dict({dokid2tid[t]: r for t, r in self.__zero.items()})
+
+	def get_ecs_weights(self):
+		"""Equal conflict sets whose weights do not sum to 1: [([transition ids], sum)]"""
+		return [(self.__ids(ecs, self.__pe.get_tid_to_dokid()), total) for ecs, total in self.__ecs_weights]
+
+	def is_zero(self, tr_id):
+		"""True if the throughput of transition tr_id (GSPN id) is zero"""
+		return self.__pe.get_tid_to_dokid()[tr_id] in self.__zero
+
+	def diagnose(self, tr_id):
+		"""Diagnostics of transition tr_id: why its throughput is zero (if so) and the warnings of the net"""
+		diagnostics = []
+		t = self.__pe.get_tid_to_dokid()[tr_id]
+		if t in self.__zero:
+			diagnostics.append(self.__zero[t])
+		if self.__siphon:
+			diagnostics.append("Siphon empty at m0: {0}".format(" ".join(self.get_siphon())))
+		for ecs, total in self.get_ecs_weights():
+			diagnostics.append("The weights of the equal conflict set {0} sum to {1}".format(" ".join(ecs), total))
+		return diagnostics
+
+	def __ids(self, dokids, mapping):
+		dokid2id = dict({k: i for i, k in mapping.items()})
+		return sorted(dokid2id[k] for k in dokids)
+
+	@Profiler.timed("precheck")
+	def __run(self):
+		B = csr_array(self.__pe.get_b(), dtype=float)
+		F = csr_array(self.__pe.get_f(), dtype=float)
+		B.eliminate_zeros()
+		F.eliminate_zeros()
+		Bc = B.tocsc()
+		Fc = F.tocsc()
+		m0 = csr_array(self.__pe.get_m0()).toarray().ravel()
+		np, nt = B.shape
+		tids = dict({k: i for i, k in self.__pe.get_tid_to_dokid().items()})
+		pids = dict({k: i for i, k in self.__pe.get_pid_to_dokid().items()})
+		inputs = lambda t: Bc.indices[Bc.indptr[t]:Bc.indptr[t+1]]
+		outputs = lambda t: Fc.indices[Fc.indptr[t]:Fc.indptr[t+1]]
+		consumers = lambda p: B.indices[B.indptr[p]:B.indptr[p+1]]
+		producers = lambda p: F.indices[F.indptr[p]:F.indptr[p+1]]
+
+		##############################################################
+		#Transitions reachable from the marked places (and from the source transitions)
+		visited_p = set(p for p in range(np) if m0[p] > 0)
+		visited_t = set(t for t in range(nt) if len(inputs(t)) == 0)
+		queue = deque(visited_p)
+		for t in visited_t:
+			queue.extend(p for p in outputs(t) if p not in visited_p)
+			visited_p.update(outputs(t))
+		while queue:
+			p = queue.popleft()
+			for t in consumers(p):
+				if t not in visited_t:
+					visited_t.add(t)
+					for q in outputs(t):
+						if q not in visited_p:
+							visited_p.add(q)
+							queue.append(q)
+		self.__unreachable = set(range(nt)) - visited_t
+
+		##############################################################
+		#Maximal siphon in the unmarked places: a place is removed if one of its producers
+		#has no input place left in the set
+		siphon = set(p for p in range(np) if m0[p] == 0)
+		count = [sum(1 for p in inputs(t) if p in siphon) for t in range(nt)]
+		queue = deque(p for p in siphon if any(count[t] == 0 for t in producers(p)))
+		while queue:
+			p = queue.popleft()
+			if p not in siphon:
+				continue
+			siphon.discard(p)
+			for t in consumers(p):
+				count[t] -= 1
+				if count[t] == 0:
+					queue.extend(q for q in outputs(t) if q in siphon)
+		self.__siphon = siphon
+
+		##############################################################
+		#Initially zero throughputs: dead transitions and transitions with weight 0
+		zero = dict()
+		for t in range(nt):
+			if count[t] > 0:
+				if t in self.__unreachable:
+					zero.update({t: "Transition {0} is not reachable from the marked places".format(tids[t])})
+				else:
+					p = [q for q in inputs(t) if q in siphon][0]
+					zero.update({t: "Transition {0} is dead: its input place {1} is in a siphon empty at m0".format(tids[t], pids[p])})
+		w = self.__pe.get_w()
+		ecs_of = dict()
+		self.__ecs_weights = []
+		if self.__ecs == None:
+			self.__ecs = LPbuilder(self.__pe).get_ecs()
+		for ecs in self.__ecs.values():
+			if len(ecs) > 1:
+				total = sum(w[t,0] for t in ecs)
+				if abs(total - 1.0) > StructuralCheck.TOLERANCE:
+					self.__ecs_weights.append((ecs, total))
+				for t in ecs:
+					ecs_of.update({t: ecs})
+					if w[t,0] == 0 and t not in zero:
+						zero.update({t: "Transition {0} has weight 0 in its equal conflict set".format(tids[t])})
+
+		##############################################################
+		#Sign propagation of the zero throughputs on C x = 0 and on the routing constraints
+		C = csr_array(self.__pe.get_c(), dtype=float)
+		Cc = C.tocsc()
+		#Producers/consumers of each place not forced to zero throughput (the initial ones are in the queue)
+		pos = [int((C.data[C.indptr[p]:C.indptr[p+1]] > 0).sum()) for p in range(np)]
+		neg = [int(C.indptr[p+1] - C.indptr[p]) - pos[p] for p in range(np)]
+		queue = deque(zero.keys())
+		places = deque(p for p in range(np) if (pos[p] == 0) != (neg[p] == 0))
+		while queue or places:
+			while queue:
+				t = queue.popleft()
+				for k in range(Cc.indptr[t], Cc.indptr[t+1]):
+					p = Cc.indices[k]
+					if Cc.data[k] > 0:
+						pos[p] -= 1
+					else:
+						neg[p] -= 1
+					if (pos[p] == 0) != (neg[p] == 0):
+						places.append(p)
+				for t1 in ecs_of.get(t, ()):
+					if t1 not in zero and w[t,0] > 0:
+						zero.update({t1: "Transition {0} is in equal conflict with {1}, which has zero throughput".format(tids[t1], tids[t])})
+						queue.append(t1)
+			if places:
+				p = places.popleft()
+				for k in range(C.indptr[p], C.indptr[p+1]):
+					t = C.indices[k]
+					if t not in zero:
+						role = "consumer" if C.data[k] > 0 else "producer"
+						zero.update({t: "Transition {0} has zero throughput in every T-flow: place {1} has no {2} with non-zero throughput".format(tids[t], pids[p], role)})
+						queue.append(t)
+		self.__zero = zero
@@ -0,0 +1,55 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.batch.AsyncAnalyzer module (asyncio facade):
+- bounds of all the transitions computed by a pool of processes/threads
+- per-transition failures, timeouts and cancellation
+"""
+
+import unittest
+import os
+import asyncio
+from src.batch.AsyncAnalyzer import AsyncAnalyzer, analyze
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestAsyncAnalyzer(unittest.TestCase):
+
+	def setUp(self):
+		self.net = os.getcwd() + path + net + ".pnml"
+
+	def test_analyze(self):
+		results = asyncio.run(analyze(self.net, jobs=2))
+		ptpn = PTPN(net)
+		ptpn.import_pnml(self.net)
+		lpgen = CPLEX_LPsolver('T9', 'T9', 'max')
+		lpgen.populate_lp(ptpn)
+		expected = lpgen.solve_all(ptpn)
+		self.assertEqual(list(results.keys()), [r.get_transition_name() for r in expected])
+		for r in expected:
+			self.assertAlmostEqual(results[r.get_transition_name()].get_throughput(), r.get_throughput())
+			self.assertAlmostEqual(results[r.get_transition_name()].get_cycle_time(), r.get_cycle_time())
+
+	def test_failures(self):
+		async def run():
+			async with AsyncAnalyzer(2, executor='thread') as analyzer:
+				results = await analyzer.analyze(self.net, ['T9', 'NOPE'], return_exceptions=True)
+				with self.assertRaises(asyncio.TimeoutError):
+					await analyzer.analyze(self.net, ['T9'], timeout=0.0)
+				future = analyzer.submit(self.net, 'T5')
+				future.cancel()
+				with self.assertRaises(asyncio.CancelledError):
+					await future
+				return results
+		results = asyncio.run(run())
+		self.assertAlmostEqual(results['T9'].get_throughput(), 0.0985505189670329)
+		self.assertIsInstance(results['NOPE'], KeyError)
+
+
+if __name__ == '__main__':
+	unittest.main()
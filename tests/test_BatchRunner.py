@@ -0,0 +1,93 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.batch.BatchRunner module:
+- manifests (YAML and CSV) of nets and transitions
+- batch of jobs solved by several worker processes, with per-job failures
+- consolidated results file (JSON/CSV) and annotated PTPN models
+- transitions of a single net split among the workers, annotated model with the bounds and
+  critical subnets of all of them
+"""
+
+import unittest
+import os
+import csv
+import json
+import tempfile
+from src.batch.BatchRunner import BatchRunner
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestBatchRunner(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.dir = self.tmp.name
+		self.net = os.getcwd() + path + net
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def write(self, name, content):
+		filename = os.path.join(self.dir, name)
+		with open(filename, "w") as f:
+			f.write(content)
+		return filename
+
+	def test_csv_manifest(self):
+		manifest = self.write("manifest.csv", "net,transition,output\n{0},T9,annotated\n{0},T1,\n".format(self.net))
+		jobs = BatchRunner.read_manifest(manifest)
+		self.assertEqual(len(jobs), 1)
+		self.assertEqual(jobs[0]['net'], self.net + ".pnml")
+		self.assertEqual(jobs[0]['transitions'], ['T9', 'T1'])
+		self.assertEqual(jobs[0]['output'], os.path.join(self.dir, "annotated.pnml"))
+
+	def test_batch(self):
+		try:
+			import yaml
+		except ImportError:
+			self.skipTest("PyYAML not installed")
+		manifest = self.write("manifest.yaml", yaml.safe_dump(dict({'nets': [
+			dict({'net': self.net, 'transitions': ['T9', 'NOPE'], 'output': 'annotated'}),
+			dict({'net': 'missing', 'transitions': 'T9'})]})))
+		jobs = BatchRunner.read_manifest(manifest)
+		results = BatchRunner(workers=2).run(jobs)
+		self.assertEqual([(r['transition'], r['ok']) for r in results], [('T9', True), ('NOPE', False), ('T9', False)])
+		self.assertAlmostEqual(results[0]['result']['throughput'], 0.0985505189670329)
+		self.assertIn("NOPE", results[1]['error'])
+		self.assertTrue(os.path.isfile(os.path.join(self.dir, "annotated.pnml")))
+		#Consolidated results
+		BatchRunner.write_results(results, os.path.join(self.dir, "results.json"))
+		with open(os.path.join(self.dir, "results.json")) as f:
+			self.assertEqual(len(json.load(f)), 3)
+		BatchRunner.write_results(results, os.path.join(self.dir, "results.csv"))
+		with open(os.path.join(self.dir, "results.csv"), newline='') as f:
+			rows = list(csv.DictReader(f))
+		self.assertEqual([r['ok'] for r in rows], ['True', 'False', 'False'])
+
+	def test_split(self):
+		transitions = ['T0', 'T5', 'T6', 'T8', 'T7', 'T9']
+		output = os.path.join(self.dir, "annotated.pnml")
+		jobs = [dict({'net': self.net + ".pnml", 'transitions': transitions, 'output': output})]
+		runner = BatchRunner(workers=3)
+		self.assertEqual([t['transitions'] for t in runner._BatchRunner__tasks(jobs)], [['T0', 'T5'], ['T6', 'T8'], ['T7', 'T9']])
+		sequential = BatchRunner(workers=1).run(jobs)
+		parallel = runner.run(jobs)
+		self.assertEqual([r['transition'] for r in parallel], transitions)
+		for r, e in zip(parallel, sequential):
+			self.assertTrue(r['ok'])
+			self.assertAlmostEqual(r['result']['throughput'], e['result']['throughput'], places=6)
+		self.assertAlmostEqual(parallel[5]['result']['throughput'], 0.0985505189670329)
+		#Annotated model: bounds of all the transitions (solved by different workers) and critical subnet
+		with open(output) as f:
+			content = f.read()
+		self.assertEqual(content.count('<bound metric="Throughput"'), len(transitions))
+		self.assertEqual(content.count('<bound metric="Cycle time"'), len(transitions))
+		self.assertEqual(content.count('<critical_subnet>'), 1)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,81 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.perf.Benchmark module:
+- scaling exponents of the phases (log-log fit)
+- time, memory and complexity regressions with respect to a baseline
+- (PTPN_BENCHMARK=1 only) the benchmark suite against the stored baseline tests/benchmark/baseline.json
+"""
+
+import unittest
+import os
+import json
+from src.perf.Benchmark import Benchmark
+
+baseline_file = "/tests/benchmark/baseline.json"
+
+
+def point(nodes, time, calibration=1.0, memory=None):
+	result = dict({'size': dict({'nodes': nodes}), 'time': time, 'calibration': calibration})
+	if memory != None:
+		result.update({'memory': memory})
+	return result
+
+
+def report(points, examples=None, calibration=1.0):
+	return dict({'calibration': calibration, 'examples': examples if examples != None else dict(),
+		'scaling': dict({'points': points, 'exponents': dict({'time': Benchmark.scaling_exponents(points),
+			'memory': Benchmark.scaling_exponents(points, 'memory')})})})
+
+
+class TestBenchmark(unittest.TestCase):
+
+	def setUp(self):
+		#pnml_parse linear, gspn_transformation quadratic
+		self.points = [point(n, dict({'pnml_parse': 1e-4 * n, 'gspn_transformation': 1e-6 * n * n})) for n in [100, 1000, 10000]]
+
+	def test_exponents(self):
+		exponents = Benchmark.scaling_exponents(self.points)
+		self.assertAlmostEqual(exponents['pnml_parse'], 1.0)
+		self.assertAlmostEqual(exponents['gspn_transformation'], 2.0)
+
+	def test_compare(self):
+		baseline = report(self.points)
+		self.assertEqual(Benchmark.compare(baseline, report(self.points)), [])
+		#Slower machine (calibration): no regression
+		slower = [point(p['size']['nodes'], {k: 2 * v for k, v in p['time'].items()}, 2.0) for p in self.points]
+		self.assertEqual(Benchmark.compare(baseline, report(slower)), [])
+		#Quadratic pnml_parse: time and complexity regressions
+		quadratic = [point(p['size']['nodes'], dict(p['time'], pnml_parse=1e-6 * p['size']['nodes'] ** 2)) for p in self.points]
+		regressions = Benchmark.compare(baseline, report(quadratic))
+		self.assertTrue(any(r.startswith("scaling: pnml_parse time") for r in regressions))
+		self.assertTrue(any("10000 nodes: pnml_parse" in r for r in regressions))
+
+	def test_compare_memory(self):
+		#ecs memory linear in the baseline
+		points = [point(p['size']['nodes'], p['time'], memory=dict({'ecs': 1000 * p['size']['nodes']})) for p in self.points]
+		baseline = report(points)
+		self.assertAlmostEqual(baseline['scaling']['exponents']['memory']['ecs'], 1.0)
+		self.assertEqual(Benchmark.compare(baseline, report(points)), [])
+		#Quadratic ecs memory: memory and complexity regressions (times unchanged)
+		quadratic = [point(p['size']['nodes'], p['time'], memory=dict({'ecs': 10 * p['size']['nodes'] ** 2})) for p in self.points]
+		regressions = Benchmark.compare(baseline, report(quadratic))
+		self.assertIn("scaling: ecs memory exponent 2.00 (baseline 1.00)", regressions)
+		self.assertIn("10000 nodes: ecs memory 1000000000 bytes (baseline 10000000 bytes)", regressions)
+		self.assertFalse(any("pnml_parse" in r for r in regressions))
+		#Small peaks within memory_slack: no regression
+		small = [point(p['size']['nodes'], p['time'], memory=dict({'ecs': 1000 * p['size']['nodes'] + 60000})) for p in self.points]
+		self.assertFalse(any(r.startswith("100 nodes") for r in Benchmark.compare(baseline, report(small))))
+
+	@unittest.skipUnless(os.environ.get("PTPN_BENCHMARK"), "benchmark suite: set PTPN_BENCHMARK=1")
+	def test_baseline(self):
+		with open(os.getcwd() + baseline_file) as f:
+			baseline = json.load(f)
+		bench = Benchmark()
+		current = bench.run(os.getcwd() + "/examples", [int(s) for s in os.environ.get("PTPN_BENCHMARK_SIZES", "100,300,1000,3000").split(",")])
+		self.assertEqual(Benchmark.compare(baseline, current), [])
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,92 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.solver.BoundResult module:
+- results returned by CPLEX_LPsolver.solve_lp (bounds, visit ratios, subnet, solution vectors)
+- no output printed by the solver when it is not verbose
+- bounds of all the transitions (CPLEX_LPsolver.solve_all), their slowest subnets and table of the bounds
+"""
+
+import unittest
+import os
+import io
+import json
+import tempfile
+import contextlib
+import csv
+import numpy
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.solver.LPcache import LPcache
+from src.solver.BoundResult import BoundResult
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestBoundResult(unittest.TestCase):
+
+	def solve(self, cache=None):
+		ptpn = PTPN(net)
+		ptpn.import_pnml(os.getcwd() + path + net + '.pnml')
+		lpgen = CPLEX_LPsolver('T9','T9','max',cache)
+		lpgen.populate_lp(ptpn)
+		return ptpn, lpgen.solve_lp(ptpn)
+
+	def test_result(self):
+		out = io.StringIO()
+		with contextlib.redirect_stdout(out):
+			ptpn, result = self.solve()
+		self.assertEqual(out.getvalue(), "")
+		t9 = [t for t in ptpn.get_transitions() if t.get_id() == 'T9'][0]
+		self.assertTrue(result.is_live())
+		self.assertEqual(result.get_throughput(), t9.get_bounds()['Throughput'][1])
+		self.assertEqual(result.get_cycle_time(), t9.get_bounds()['Cycle time'][1])
+		self.assertAlmostEqual(result.get_throughput_of('T9'), result.get_throughput())
+		self.assertAlmostEqual(result.get_visit_ratio_of('T9'), 1.0)
+		self.assertIsInstance(result.get_y(), numpy.ndarray)
+		self.assertEqual(len(result.get_y()), len(result.get_pid_to_dokid()))
+		subnet = ptpn.get_critical_subnet()
+		self.assertEqual(result.get_subnet()['places'], sorted(p.get_id() for p in subnet['places']))
+		self.assertEqual(json.loads(json.dumps(result.to_dict(vectors=True)))['throughput'], result.get_throughput())
+
+	def test_cache(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			cache = LPcache(tmp)
+			_, r1 = self.solve(cache)
+			_, r2 = self.solve(cache)
+		self.assertEqual(r1.to_dict(vectors=True), r2.to_dict(vectors=True))
+
+	def test_solve_all(self):
+		ptpn = PTPN(net)
+		ptpn.import_pnml(os.getcwd() + path + net + '.pnml')
+		lpgen = CPLEX_LPsolver('T9','T9','max')
+		lpgen.populate_lp(ptpn)
+		results = lpgen.solve_all(ptpn)
+		self.assertEqual([r.get_transition_id() for r in results], [t.get_id() for t in ptpn.get_transitions()])
+		#Slowest subnets of all the transitions, ranked by cycle time
+		ranking = ptpn.get_critical_subnets()
+		subnets = set((tuple(r.get_subnet()['places']), tuple(r.get_subnet()['trans'])) for r in results if r.get_subnet() != None)
+		self.assertEqual(sorted((tuple(sorted(p.get_id() for p in s['places'])), tuple(sorted(t.get_id() for t in s['trans'])))
+			for s in ranking), sorted(subnets))
+		self.assertEqual([s['cycle_time'] for s in ranking], sorted((s['cycle_time'] for s in ranking), reverse=True))
+		self.assertEqual(ranking[0]['cycle_time'], max(r.get_cycle_time() for r in results))
+		self.assertIs(ptpn.get_critical_subnet(), ranking[0])
+		for r in results:
+			single = CPLEX_LPsolver(r.get_transition_name(), r.get_transition_id(), 'max')
+			single.populate_lp(ptpn)
+			expected = single.solve_lp(ptpn)
+			self.assertAlmostEqual(r.get_throughput(), expected.get_throughput())
+			self.assertAlmostEqual(r.get_cycle_time(), expected.get_cycle_time())
+			self.assertEqual(r.get_subnet(), expected.get_subnet())
+		with tempfile.TemporaryDirectory() as tmp:
+			BoundResult.write_table(results, os.path.join(tmp, "bounds.csv"))
+			with open(os.path.join(tmp, "bounds.csv"), newline='') as f:
+				rows = list(csv.DictReader(f))
+		self.assertEqual([r['transition'] for r in rows], [r.get_transition_name() for r in results])
+		self.assertAlmostEqual(float(rows[-1]['throughput']), results[-1].get_throughput())
+
+
+if __name__ == '__main__':
+	unittest.main()
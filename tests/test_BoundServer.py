@@ -0,0 +1,104 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.daemon.BoundServer module (and the BoundClient):
+- bound queries answered by the daemon (reuse of the loaded nets and LP models)
+- parameter edits and reload of the nets
+- LRU eviction of the loaded nets and errors of the requests
+- invalid edits (rejected, the net is left unchanged)
+"""
+
+import unittest
+import os
+import re
+import tempfile
+import threading
+from src.daemon.BoundServer import BoundServer
+from src.daemon.BoundClient import BoundClient
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestBoundServer(unittest.TestCase):
+
+	def setUp(self):
+		self.server = BoundServer(max_nets=1)
+		ready = threading.Event()
+		address = []
+		self.thread = threading.Thread(target=self.server.serve, args=("127.0.0.1", 0, lambda a: (address.append(a), ready.set())))
+		self.thread.start()
+		ready.wait(10)
+		self.client = BoundClient("http://{0}:{1}".format(*address[0]))
+		self.net = os.getcwd() + path + net
+
+	def tearDown(self):
+		self.client.shutdown()
+		self.thread.join(10)
+
+	def test_bound(self):
+		r1 = self.client.bound(self.net, "T9")
+		r2 = self.client.bound(self.net, "T9")
+		self.assertTrue(r1['ok'])
+		self.assertFalse(r1['cached'])
+		self.assertTrue(r2['cached'])
+		self.assertAlmostEqual(r1['results'][0]['throughput'], 0.0985505189670329)
+		r = self.client.bound(self.net, all_transitions=True)
+		self.assertEqual(len(r['results']), 6)
+		self.assertEqual(self.server.get_counters()['loads'], 1)
+
+	def test_edit(self):
+		self.client.bound(self.net, "T9")
+		r = self.client.bound(self.net, "T9", edits=dict({'transitions': dict({'T0': dict({'lambda': 0.5})})}))
+		#Fresh solution of the edited net
+		ptpn = PTPN(net)
+		ptpn.import_pnml(self.net + ".pnml")
+		[t for t in ptpn.get_transitions() if t.get_name() == 'T0'][0].set_params(dict({'lambda': 0.5}))
+		lpgen = CPLEX_LPsolver('T9', 'T9', 'max')
+		lpgen.populate_lp(ptpn)
+		expected = lpgen.solve_lp(ptpn)
+		self.assertAlmostEqual(r['results'][0]['throughput'], expected.get_throughput())
+		self.assertAlmostEqual(r['results'][0]['cycle_time'], expected.get_cycle_time())
+		self.client.reload(self.net)
+		r = self.client.bound(self.net, "T9")
+		self.assertAlmostEqual(r['results'][0]['throughput'], 0.0985505189670329)
+
+	def test_eviction_and_errors(self):
+		self.client.bound(self.net, "T9")
+		self.client.bound(os.getcwd() + path + "example1", "T9")
+		self.assertEqual(self.server.get_nets(), [os.getcwd() + path + "example1.pnml"])
+		self.assertEqual(self.server.get_counters()['evictions'], 1)
+		self.assertFalse(self.client.bound(self.net, "NOPE")['ok'])
+		self.assertFalse(self.client.bound(os.getcwd() + path + "missing", "T9")['ok'])
+
+	def test_invalid_edits(self):
+		r1 = self.client.bound(self.net, "T9")
+		#A valid edit followed by an unknown place: the net is left unchanged
+		edits = dict({'transitions': dict({'T0': dict({'lambda': 0.5})}), 'places': dict({'NOPE': 1})})
+		code, response = self.server.handle("POST", "/edit", dict({'net': self.net + ".pnml", 'edits': edits}))
+		self.assertEqual(code, 400)
+		self.assertIn("The place NOPE", response['error'])
+		code, response = self.server.handle("POST", "/edit", dict({'net': self.net + ".pnml", 'edits': dict({'transitions': dict({'T0': dict({'nope': 1})})})}))
+		self.assertEqual(code, 400)
+		self.assertIn("no parameter nope", response['error'])
+		r2 = self.client.bound(self.net, "T9")
+		self.assertTrue(r2['cached'])
+		self.assertEqual(r1['results'], r2['results'])
+		self.assertEqual(self.server.get_counters()['edits'], 0)
+		#Transition without time function (no parameters)
+		with open(self.net + ".pnml") as f:
+			pnml = re.sub(r'(<transition id="T9">.*?)<toolspecific.*?</toolspecific>', r'\1', f.read(), flags=re.S)
+		with tempfile.TemporaryDirectory() as tmp:
+			untimed = os.path.join(tmp, net + ".pnml")
+			with open(untimed, "w") as f:
+				f.write(pnml)
+			code, response = self.server.handle("POST", "/edit", dict({'net': untimed, 'edits': dict({'transitions': dict({'T9': dict({'k': 1})})})}))
+		self.assertEqual(code, 400)
+		self.assertIn("T9 has no time function", response['error'])
+
+
+if __name__ == '__main__':
+	unittest.main()
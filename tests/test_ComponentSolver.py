@@ -0,0 +1,89 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.solver.ComponentSolver module:
+- connected and strongly connected components of the net
+- bounds of the components vs. the bounds of the (undecomposed) net, sequential and parallel
+- net-level critical subnets: one per component
+"""
+
+import unittest
+import os
+import tempfile
+import xml.dom.minidom
+from src.net.PTPN import PTPN
+from src.solver.ComponentSolver import ComponentSolver
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestComponentSolver(unittest.TestCase):
+
+	def setUp(self):
+		#Net with two disjoint copies of the example (the ids and names of the copy end with _b)
+		doc = xml.dom.minidom.parse(os.getcwd() + path + net + '.pnml')
+		page = doc.getElementsByTagName("page")[0]
+		for node in [n for n in page.childNodes if n.nodeType == n.ELEMENT_NODE]:
+			copy = node.cloneNode(True)
+			for e in [copy] + copy.getElementsByTagName("distribution"):
+				for attr in ['id', 'source', 'target']:
+					if e.hasAttribute(attr):
+						e.setAttribute(attr, e.getAttribute(attr) + "_b")
+			for name in copy.getElementsByTagName("name"):
+				text = name.getElementsByTagName("text")[0].firstChild
+				text.data = text.data + "_b"
+			page.appendChild(copy)
+		self.tmp = tempfile.TemporaryDirectory()
+		filename = os.path.join(self.tmp.name, net + "_twice.pnml")
+		with open(filename, "w") as f:
+			doc.writexml(f)
+		self.ptpn = PTPN(net + "_twice")
+		self.ptpn.import_pnml(filename)
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def test_components(self):
+		csolver = ComponentSolver(self.ptpn)
+		components = csolver.get_components()
+		self.assertEqual(len(components), 2)
+		self.assertEqual(len(components[0].get_transitions()), len(components[1].get_transitions()))
+		self.assertEqual(len(components[0].get_arcs()) + len(components[1].get_arcs()), len(self.ptpn.get_arcs()))
+		self.assertEqual(csolver.component_of('T9_b'), 1)
+		self.assertFalse(csolver.is_strongly_connected())
+
+		single = PTPN(net)
+		single.import_pnml(os.getcwd() + path + net + '.pnml')
+		self.assertEqual(len(ComponentSolver(single).get_components()), 1)
+
+	def test_bounds(self):
+		lpgen = CPLEX_LPsolver('T9', 'T9', 'max')
+		lpgen.populate_lp(self.ptpn)
+		expected = lpgen.solve_all(self.ptpn)
+		for jobs in [1, 2]:
+			results = ComponentSolver(self.ptpn, jobs).solve_all()
+			self.assertEqual([r.get_transition_id() for r in results], [r.get_transition_id() for r in expected])
+			for r, e in zip(results, expected):
+				self.assertAlmostEqual(r.get_throughput(), e.get_throughput(), places=5)
+		self.assertEqual(len(self.ptpn.get_critical_subnets()), 2)
+		t9 = [t for t in self.ptpn.get_transitions() if t.get_id() == 'T9_b'][0]
+		result = [r for r in results if r.get_transition_id() == 'T9_b'][0]
+		self.assertAlmostEqual(t9.get_bounds()['Throughput'][1], result.get_throughput())
+
+	def test_single(self):
+		result = ComponentSolver(self.ptpn).solve('T9_b')
+		lpgen = CPLEX_LPsolver('T9_b', 'T9_b', 'max')
+		lpgen.populate_lp(self.ptpn)
+		expected = lpgen.solve_lp(self.ptpn)
+		self.assertEqual(result.get_transition_id(), 'T9_b')
+		self.assertAlmostEqual(result.get_throughput(), expected.get_throughput(), places=5)
+		self.assertAlmostEqual(result.get_cycle_time(), expected.get_cycle_time(), places=5)
+		self.assertEqual(result.get_subnet(), expected.get_subnet())
+		self.assertTrue(all(p.endswith("_b") for p in result.get_subnet()['places']))
+
+
+if __name__ == '__main__':
+	unittest.main()
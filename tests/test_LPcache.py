@@ -0,0 +1,93 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.solver.LPcache module:
+- LP models/solutions stored and reloaded from the on-disk cache
+- LRU eviction of the cache entries
+- concurrent writers of the same entry (e.g., batch workers sharing the cache)
+"""
+
+import unittest
+import os
+import tempfile
+import multiprocessing
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.solver.LPcache import LPcache
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+def write_entry(cache_dir, key, rounds):
+	#Writer process: the model file is written in chunks, then the entry is committed
+	cache = LPcache(cache_dir)
+	for i in range(rounds):
+		path = cache.new_entry(key)
+		with open(os.path.join(path, "lp_max_X.sav"), "w") as f:
+			for _ in range(64):
+				f.write("x" * 1024)
+				f.flush()
+		cache.commit(key, path, dict({'X': i, 'CT': None}))
+
+
+class TestLPcache(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.cache = LPcache(self.tmp.name)
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def solve(self):
+		ptpn = PTPN(net)
+		ptpn.import_pnml(os.getcwd() + path + net + '.pnml')
+		lpgen = CPLEX_LPsolver('T9','T9','max',self.cache)
+		lpgen.populate_lp(ptpn)
+		lpgen.solve_lp(ptpn)
+		return ptpn, lpgen
+
+	def test_hit(self):
+		ptpn1, _ = self.solve()
+		self.assertEqual(len(os.listdir(self.tmp.name)), 1)
+		ptpn2, lpgen = self.solve()
+		t1 = [t for t in ptpn1.get_transitions() if t.get_name() == 'T9'][0]
+		t2 = [t for t in ptpn2.get_transitions() if t.get_name() == 'T9'][0]
+		self.assertEqual(t1.get_bounds(), t2.get_bounds())
+		self.assertEqual({p.get_id() for p in ptpn1.get_critical_subnet()['places']},
+			{p.get_id() for p in ptpn2.get_critical_subnet()['places']})
+		#Models loaded from the cache can be exported/solved
+		filename = os.path.join(self.tmp.name, 'sol.xml')
+		lpgen.export_lp_solution(lpgen.get_LpminCT(), filename)
+		self.assertTrue(os.path.isfile(filename))
+
+	def test_eviction(self):
+		self.solve()
+		self.assertGreater(self.cache.get_size(), 0)
+		small = LPcache(self.tmp.name, 1)
+		small.evict()
+		self.assertEqual(small.get_size(), 0)
+
+	def test_concurrent(self):
+		key = "s" * 32 + "_" + "p" * 32
+		writers = [multiprocessing.Process(target=write_entry, args=(self.tmp.name, key, 20)) for _ in range(2)]
+		for w in writers:
+			w.start()
+		#Every entry seen by a reader is complete
+		while any(w.is_alive() for w in writers):
+			hit = self.cache.lookup(key)
+			if hit != None:
+				self.assertTrue(os.path.isfile(os.path.join(hit, "lp_max_X.sav")))
+		for w in writers:
+			w.join()
+			self.assertEqual(w.exitcode, 0)
+		self.assertEqual(os.listdir(self.tmp.name), [key])
+		self.assertEqual(os.path.getsize(os.path.join(self.tmp.name, key, "lp_max_X.sav")), 64*1024)
+		self.assertIn(self.cache.load_results(os.path.join(self.tmp.name, key))['X'], range(20))
+
+
+if __name__ == '__main__':
+
+	unittest.main()
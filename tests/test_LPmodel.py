@@ -0,0 +1,86 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.solver.LPmodel and src.solver.LPbuilder modules:
+- generation of the solver-independent LP models from the net structure
+- LP/free MPS writers, compact save/load and model diff
+"""
+
+import unittest
+import os
+import tempfile
+import cplex
+from src.net.PTPN import PTPN
+from src.solver.ParamsExtractor import ParamsExtractor
+from src.solver.LPbuilder import LPbuilder
+from src.solver.LPmodel import LPmodel
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+def build(filename):
+	ptpn = PTPN(net)
+	ptpn.import_pnml(filename)
+	pe = ParamsExtractor()
+	pe.retrieve_net_structure(ptpn)
+	return LPbuilder(pe).build_lpX(pe.get_tid_to_dokid()['T9'], 'objT9')
+
+
+def solve(filename):
+	pb = cplex.Cplex(filename)
+	pb.set_log_stream(None)
+	pb.set_results_stream(None)
+	pb.solve()
+	return pb.solution.get_objective_value()
+
+
+class TestLPmodel(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.model = build(os.getcwd() + path + net + '.pnml')
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def test_structure(self):
+		#9 places + 2 distribution places, 6 transitions + 4 distribution transitions
+		self.assertEqual(self.model.get_num_vars(), 9 + 2*10)
+		self.assertEqual(self.model.get_num_rows(), len(self.model.get_senses()))
+		self.assertEqual(self.model.get_A().shape, (self.model.get_num_rows(), self.model.get_num_vars()))
+
+	def test_writers(self):
+		lp = os.path.join(self.tmp.name, 'model.lp')
+		mps = os.path.join(self.tmp.name, 'model.mps')
+		self.model.write_lp(lp)
+		self.model.write_mps(mps)
+		self.assertAlmostEqual(solve(lp), 0.0985505189670329)
+		self.assertAlmostEqual(solve(mps), 0.0985505189670329)
+
+	def test_save_load(self):
+		filename = os.path.join(self.tmp.name, 'model.npz')
+		self.model.save(filename)
+		model = LPmodel.load(filename)
+		self.assertEqual(model.get_name(), 'objT9')
+		self.assertEqual(self.model.diff(model), {'coefficients': [], 'rhs': [], 'objective': [], 'bounds': []})
+
+	def test_diff(self):
+		#Change of the rate of T0 (exponential, lambda 0.25 -> 0.5): one Little's law coefficient changes
+		with open(os.getcwd() + path + net + '.pnml') as f:
+			content = f.read().replace('<text>0.25</text>', '<text>0.5</text>')
+		filename = os.path.join(self.tmp.name, net + '.pnml')
+		with open(filename, 'w') as f:
+			f.write(content)
+		changes = self.model.diff(build(filename))
+		self.assertEqual(len(changes['coefficients']), 1)
+		row, _, value = changes['coefficients'][0]
+		self.assertTrue(self.model.get_row_names()[row].startswith('little'))
+		self.assertEqual(value, -2.0)
+		self.assertEqual(changes['rhs'], [])
+
+
+if __name__ == '__main__':
+
+	unittest.main()
@@ -0,0 +1,94 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.solver.ModularLPbuilder module (and the composition of PTPN modules):
+- GSPN and LP max X assembled from the module fragments vs. the ones of the flattened net
+- bounds of a composite net vs. the bounds of the flattened net
+- cache of the fragments: after a change of one module only its fragment is built
+"""
+
+import unittest
+import os
+import tempfile
+import numpy
+from src.net.PTPN import PTPN
+from src.net.PTPNmodule import PTPNmodule
+from src.solver.ParamsExtractor import ParamsExtractor
+from src.solver.LPbuilder import LPbuilder
+from src.solver.ModularLPbuilder import ModularLPbuilder
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestModularLPbuilder(unittest.TestCase):
+
+	def setUp(self):
+		ModularLPbuilder.clear_cache()
+		#Instances of the example sharing the place P0 (interface)
+		self.module = PTPNmodule.from_pnml(net, os.getcwd() + path + net + '.pnml', ['P0'])
+		self.composite = PTPN.compose("composite", [("a", self.module), ("b", self.module), ("c", self.module)], dict({'P0': 2}))
+
+	def flatten(self, ptpn):
+		#Flattened net (without modules) of a composite net
+		with tempfile.TemporaryDirectory() as tmp:
+			filename = os.path.join(tmp, "flat.pnml")
+			ptpn.export_pnml(filename)
+			flat = PTPN("flat")
+			flat.import_pnml(filename)
+		return flat
+
+	def rows(self, lp):
+		A = lp.get_A()
+		return sorted((tuple(A.indices[A.indptr[i]:A.indptr[i+1]]), tuple(numpy.round(A.data[A.indptr[i]:A.indptr[i+1]], 9)),
+			lp.get_senses()[i], lp.get_rhs()[i]) for i in range(A.shape[0]))
+
+	def test_compose(self):
+		self.assertEqual(len(self.composite.get_places()), 1 + 3*6)
+		self.assertEqual(self.composite.get_places()[0].get_initial_marking(), 2)
+		self.assertIn('b.T9', [t.get_id() for t in self.composite.get_transitions()])
+		self.assertEqual(len(self.composite.get_modules()), 3)
+		with self.assertRaises(Exception):
+			PTPNmodule("wrong", self.module.get_net(), ['P99'])
+
+	def test_assembly(self):
+		builder = ModularLPbuilder(self.composite)
+		self.assertEqual(ModularLPbuilder.get_cache_stats()['misses'], 1)
+		self.assertEqual(ModularLPbuilder.get_cache_stats()['hits'], 2)
+		pe = ParamsExtractor()
+		pe.retrieve_net_structure(self.composite)
+		self.assertEqual(builder.get_pe().structure_hash(), pe.structure_hash())
+		self.assertEqual(builder.get_pe().params_hash(), pe.params_hash())
+		t9 = pe.get_tid_to_dokid()['c.T9']
+		self.assertEqual(self.rows(builder.build_lpX(t9)), self.rows(LPbuilder(pe).build_lpX(t9)))
+
+	def test_bounds(self):
+		flat = self.flatten(self.composite)
+		for ptpn in [self.composite, flat]:
+			lpgen = CPLEX_LPsolver('a.T9', 'a.T9', 'max')
+			lpgen.populate_lp(ptpn)
+			result = lpgen.solve_lp(ptpn)
+			if ptpn is self.composite:
+				expected = result
+		self.assertAlmostEqual(expected.get_throughput(), result.get_throughput(), places=6)
+		self.assertAlmostEqual(expected.get_cycle_time(), result.get_cycle_time(), places=6)
+
+	def test_rebuild(self):
+		ModularLPbuilder(self.composite)
+		#New version of the module: only its fragment is built
+		changed = PTPNmodule.from_pnml(net, os.getcwd() + path + net + '.pnml', ['P0'])
+		t9 = [t for t in changed.get_net().get_transitions() if t.get_id() == 'T9'][0]
+		t9.set_params(dict({'k': 1.5}))
+		self.assertNotEqual(changed.module_hash(), self.module.module_hash())
+		composite = PTPN.compose("composite", [("a", self.module), ("b", changed), ("c", self.module)])
+		builder = ModularLPbuilder(composite)
+		self.assertEqual(ModularLPbuilder.get_cache_stats()['misses'], 2)
+		pe = ParamsExtractor()
+		pe.retrieve_net_structure(composite)
+		self.assertEqual(builder.get_pe().params_hash(), pe.params_hash())
+
+
+if __name__ == '__main__':
+	unittest.main()
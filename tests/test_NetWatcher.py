@@ -0,0 +1,80 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.daemon.NetWatcher module (watch mode):
+- parameter changes of the net file: LP updated in place and re-solved
+- file saved again without changes: last result kept
+- structure changes: LP rebuilt
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+from src.daemon.NetWatcher import NetWatcher
+from src.generator.PTPNgenerator import PTPNgenerator
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestNetWatcher(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.filename = os.path.join(self.tmp.name, "watched.pnml")
+		shutil.copy(os.getcwd() + path + net + ".pnml", self.filename)
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def rewrite(self, old, new):
+		with open(self.filename) as f:
+			content = f.read()
+		with open(self.filename, "w") as f:
+			f.write(content.replace(old, new))
+
+	def solve(self, tname):
+		ptpn = PTPN(net)
+		ptpn.import_pnml(self.filename)
+		tid = [t for t in ptpn.get_transitions() if t.get_name() == tname][0].get_id()
+		lpgen = CPLEX_LPsolver(tname, tid, 'max')
+		lpgen.populate_lp(ptpn)
+		return lpgen.solve_lp(ptpn)
+
+	def test_parameters(self):
+		watcher = NetWatcher(self.filename, 'T9')
+		self.assertAlmostEqual(watcher.load().get_throughput(), 0.0985505189670329)
+		self.assertFalse(watcher.changed())
+		#Rate of T0 (exponential): 0.25 -> 0.5
+		self.rewrite("<text>0.25</text>", "<text>0.5</text>")
+		self.assertTrue(watcher.changed())
+		update = watcher.refresh()
+		self.assertEqual(update['kind'], NetWatcher.PARAMETERS)
+		self.assertGreater(update['changes'], 0)
+		self.assertAlmostEqual(update['result'].get_throughput(), self.solve('T9').get_throughput())
+		self.assertAlmostEqual(update['result'].get_cycle_time(), self.solve('T9').get_cycle_time())
+		#Saved again: same LP model
+		os.utime(self.filename, ns=(0, 0))
+		update = watcher.refresh()
+		self.assertEqual(update['kind'], NetWatcher.UNCHANGED)
+		self.assertAlmostEqual(update['result'].get_throughput(), self.solve('T9').get_throughput())
+
+	def test_structure(self):
+		gen = PTPNgenerator(1)
+		gen.write_pnml(gen.generate('ring', 5), self.filename)
+		watcher = NetWatcher(self.filename, 'T0')
+		watcher.load()
+		gen = PTPNgenerator(1)
+		gen.write_pnml(gen.generate('ring', 6), self.filename)
+		updates = []
+		watcher.watch(updates.append, interval=0.01, max_updates=1)
+		self.assertEqual(updates[0]['kind'], NetWatcher.STRUCTURE)
+		self.assertAlmostEqual(updates[0]['result'].get_throughput(), self.solve('T0').get_throughput())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,72 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.generator.PTPNgenerator module:
+- the generated models of each family are imported by PTPN.import_pnml and solved
+- the same seed produces the same model
+- the cycle time of a ring is the sum of its delays
+"""
+
+import unittest
+import os
+import filecmp
+import tempfile
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.generator.PTPNgenerator import PTPNgenerator
+
+
+class TestPTPNgenerator(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def generate(self, family, size, seed=1, name="net", **kwargs):
+		filename = os.path.join(self.tmp.name, name + ".pnml")
+		gen = PTPNgenerator(seed, dict({'exponential': 1.0, 'constant': 1.0, 'uniform': 1.0}), **kwargs)
+		counts = gen.write_pnml(gen.generate(family, size), filename)
+		return filename, counts
+
+	def solve(self, filename):
+		ptpn = PTPN("net")
+		ptpn.import_pnml(filename)
+		lpgen = CPLEX_LPsolver('T0','T0','max')
+		lpgen.populate_lp(ptpn)
+		lpgen.solve_lp(ptpn)
+		return ptpn
+
+	def test_families(self):
+		for family in PTPNgenerator.FAMILIES:
+			filename, counts = self.generate(family, 50, outcomes=3)
+			ptpn = self.solve(filename)
+			self.assertEqual(len(ptpn.get_places()), counts['places'])
+			self.assertEqual(len(ptpn.get_transitions()), counts['transitions'])
+			self.assertEqual(len(ptpn.get_arcs()), counts['arcs'])
+			self.assertLessEqual(abs(counts['places'] + counts['transitions'] - 50), 10)
+			#The generated nets are live
+			t0 = [t for t in ptpn.get_transitions() if t.get_id() == 'T0'][0]
+			self.assertGreater(t0.get_bounds()['Throughput'][1], 0.0)
+
+	def test_seed(self):
+		f1, _ = self.generate('freechoice', 200, seed=7, name="a")
+		f2, _ = self.generate('freechoice', 200, seed=7, name="b")
+		f3, _ = self.generate('freechoice', 200, seed=8, name="c")
+		self.assertTrue(filecmp.cmp(f1, f2, shallow=False))
+		self.assertFalse(filecmp.cmp(f1, f3, shallow=False))
+
+	def test_ring(self):
+		filename = os.path.join(self.tmp.name, "ring.pnml")
+		gen = PTPNgenerator(3, dict({'constant': 1.0}))
+		gen.write_pnml(gen.ring(20), filename)
+		ptpn = self.solve(filename)
+		delays = sum(t.get_delay() for t in ptpn.get_transitions())
+		t0 = [t for t in ptpn.get_transitions() if t.get_id() == 'T0'][0]
+		self.assertAlmostEqual(t0.get_bounds()['Cycle time'][1], delays, places=6)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,69 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.perf.Profiler module:
+- phases of the bound computation recorded when a profiler is active
+- peak/retained memory, LP dimensions and memory budget warnings
+- no phase recorded when the instrumentation is off
+"""
+
+import unittest
+import os
+import json
+import tempfile
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.perf.Profiler import Profiler
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestProfiler(unittest.TestCase):
+
+	def solve(self):
+		ptpn = PTPN(net)
+		ptpn.import_pnml(os.getcwd() + path + net + '.pnml')
+		lpgen = CPLEX_LPsolver('T9','T9','max')
+		lpgen.populate_lp(ptpn)
+		lpgen.solve_lp(ptpn)
+
+	def test_phases(self):
+		with Profiler() as prof:
+			self.solve()
+		phases = prof.get_phases()
+		for name in ['pnml_parse', 'gspn_transformation', 'lp_build_X', 'ecs',
+			'solve_X', 'lp_build_CT', 'solve_CT', 'subnet_extraction']:
+			self.assertIn(name, phases)
+			self.assertEqual(phases[name]['calls'], 1)
+		self.assertEqual(phases['lp_load']['calls'], 2)
+		self.assertGreaterEqual(prof.get_report()['total']['wall'], phases['lp_build_X']['wall'])
+		with tempfile.TemporaryDirectory() as tmp:
+			prof.save(os.path.join(tmp, "profile.json"))
+			with open(os.path.join(tmp, "profile.json")) as f:
+				self.assertEqual(json.load(f)['phases'].keys(), phases.keys())
+
+	def test_memory(self):
+		with Profiler(memory=True, budget=0) as prof:
+			self.solve()
+		phases = prof.get_phases()
+		self.assertGreater(phases['pnml_parse']['peak_mem'], 0)
+		self.assertGreaterEqual(phases['lp_build_X']['peak_mem'], phases['lp_build_X/routing']['peak_mem'])
+		info = prof.get_info()
+		self.assertEqual(info['lp_X']['cols'], info['gspn']['places'] + 2*info['gspn']['transitions'])
+		#The LP estimate is an upper bound of the built LP dimensions
+		lp = info['lp_X']
+		self.assertGreaterEqual(info['memory_estimates']['lp_build_X'], Profiler.estimate_lp(lp['rows'], lp['cols'], lp['nnz']))
+		self.assertGreaterEqual(info['memory_estimates']['lp_build_X'], lp['rows'] + lp['nnz'])
+		self.assertEqual([w['stage'] for w in prof.get_warnings()], ['pnml_parse', 'lp_build_X'])
+
+	def test_off(self):
+		prof = Profiler()
+		self.solve()
+		self.assertIsNone(Profiler.get_active())
+		self.assertEqual(prof.get_phases(), dict())
+
+
+if __name__ == '__main__':
+	unittest.main()
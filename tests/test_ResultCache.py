@@ -0,0 +1,111 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.solver.ResultCache module:
+- results of the solver loaded from the cache (same bounds and subnets, PTPN updated)
+- keys of different parameters, transitions and solver settings
+- eviction of the expired and of the least recently used entries
+- entries written concurrently by several processes
+"""
+
+import unittest
+import os
+import time
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.solver.SolverProfile import SolverProfile
+from src.solver.ResultCache import ResultCache
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+def put_results(args):
+	cache_dir, worker = args
+	cache = ResultCache(cache_dir)
+	for i in range(50):
+		cache.put("{0:064x}".format(i), dict({'worker': worker, 'values': list(range(100))}))
+
+
+class TestResultCache(unittest.TestCase):
+
+	def solve(self, results, tname='T9', profile=None, subnets=1):
+		ptpn = PTPN(net)
+		ptpn.import_pnml(os.getcwd() + path + net + '.pnml')
+		lpgen = CPLEX_LPsolver(tname, tname, 'max', None, profile, results=results)
+		lpgen.populate_lp(ptpn)
+		result = lpgen.solve_lp(ptpn)
+		if subnets > 1:
+			lpgen.rank_slowest_subnets(ptpn, subnets)
+		return ptpn, lpgen, result
+
+	def test_hit(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			cache = ResultCache(tmp)
+			_, _, r1 = self.solve(cache, subnets=2)
+			ptpn, lpgen, r2 = self.solve(cache, subnets=2)
+		#The LPs have been skipped
+		self.assertEqual(lpgen.get_LpmaxX().variables.get_num(), 0)
+		self.assertIsNone(lpgen.get_LpminCT())
+		self.assertEqual(r1.to_dict(), r2.to_dict())
+		t9 = [t for t in ptpn.get_transitions() if t.get_id() == 'T9'][0]
+		self.assertEqual(t9.get_bounds()['Throughput'][1], r1.get_throughput())
+		self.assertEqual(t9.get_bounds()['Cycle time'][1], r1.get_cycle_time())
+		self.assertEqual(sorted(p.get_id() for p in ptpn.get_critical_subnet()['places']), r1.get_subnet()['places'])
+		self.assertEqual(len(ptpn.get_critical_subnets()), len(r1.get_subnets()))
+
+	def test_keys(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			cache = ResultCache(tmp)
+			self.solve(cache)
+			self.solve(cache, 'T0')
+			self.solve(cache, profile=SolverProfile.preset('accurate'))
+			ptpn = PTPN(net)
+			ptpn.import_pnml(os.getcwd() + path + net + '.pnml')
+			ptpn.get_transitions()[0].set_params(dict({'lambda': 0.5}))
+			lpgen = CPLEX_LPsolver('T9', 'T9', 'max', results=cache)
+			lpgen.populate_lp(ptpn)
+			lpgen.solve_lp(ptpn)
+			entries = [f for _, _, files in os.walk(tmp) for f in files if f.endswith(".json")]
+		self.assertEqual(len(entries), 4)
+
+	def test_eviction(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			cache = ResultCache(tmp, max_size=1024*1024, max_age=3600)
+			keys = ["{0:064x}".format(i) for i in range(4)]
+			for k in keys:
+				cache.put(k, dict({'values': list(range(100))}))
+			#Expired entry
+			old = time.time() - 7200
+			os.utime(os.path.join(tmp, keys[0][:2], keys[0] + ".json"), (old, old))
+			self.assertIsNone(cache.get(keys[0]))
+			self.assertEqual(cache.evict(), 1)
+			#Least recently used entries beyond the maximum size
+			for i in range(1, 4):
+				t = time.time() - 100 + i
+				os.utime(os.path.join(tmp, keys[i][:2], keys[i] + ".json"), (t, t))
+			self.assertIsNotNone(cache.get(keys[1]))
+			size = cache.get_size()
+			small = ResultCache(tmp, max_size=size*2//3)
+			self.assertEqual(small.evict(), 1)
+			self.assertIsNone(small.get(keys[2]))
+			self.assertIsNotNone(small.get(keys[1]))
+			self.assertIsNotNone(small.get(keys[3]))
+
+	def test_concurrent_puts(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			with ProcessPoolExecutor(max_workers=4) as pool:
+				list(pool.map(put_results, [(tmp, w) for w in range(4)]))
+			cache = ResultCache(tmp)
+			for i in range(50):
+				self.assertEqual(cache.get("{0:064x}".format(i))['values'], list(range(100)))
+			#No temporary files left
+			files = [f for _, _, files in os.walk(tmp) for f in files if f != ResultCache.LOCK]
+			self.assertEqual(len(files), 50)
+
+
+if __name__ == '__main__':
+	unittest.main()
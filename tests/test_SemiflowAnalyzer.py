@@ -0,0 +1,77 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.solver.SemiflowAnalyzer module:
+- minimal P- and T-semiflows of the incidence matrix (Farkas algorithm)
+- conservativeness and consistency
+- cycle time of the slowest P-semiflow vs. LP min CT
+- cache by structure hash and limit of the basis
+"""
+
+import unittest
+import os
+import numpy
+from src.net.PTPN import PTPN
+from src.solver.ParamsExtractor import ParamsExtractor
+from src.solver.SemiflowAnalyzer import SemiflowAnalyzer
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestSemiflowAnalyzer(unittest.TestCase):
+
+	def setUp(self):
+		SemiflowAnalyzer.clear_cache()
+		self.ptpn = PTPN(net)
+		self.ptpn.import_pnml(os.getcwd() + path + net + '.pnml')
+		self.pe = ParamsExtractor()
+		self.pe.retrieve_net_structure(self.ptpn)
+
+	def test_semiflows(self):
+		analyzer = SemiflowAnalyzer(self.pe)
+		C = self.pe.get_c().toarray()
+		P = analyzer.get_p_semiflows()
+		T = analyzer.get_t_semiflows()
+		self.assertEqual(len(P), 2)
+		self.assertEqual(len(T), 4)
+		for y in P:
+			vec = numpy.zeros(C.shape[0])
+			vec[list(y.keys())] = list(y.values())
+			self.assertFalse((vec @ C).any())
+		for x in T:
+			vec = numpy.zeros(C.shape[1])
+			vec[list(x.keys())] = list(x.values())
+			self.assertFalse((C @ vec).any())
+		#Minimal supports
+		supports = [frozenset(x) for x in T]
+		self.assertFalse(any(s < t for s in supports for t in supports))
+		self.assertTrue(analyzer.is_conservative())
+		self.assertTrue(analyzer.is_consistent())
+		self.assertIn('P0', analyzer.to_ids(P[0], 'P'))
+
+	def test_cycle_time(self):
+		lpgen = CPLEX_LPsolver('T9', 'T9', 'max')
+		lpgen.populate_lp(self.ptpn)
+		result = lpgen.solve_lp(self.ptpn)
+		ct, y = SemiflowAnalyzer(self.pe).max_cycle_time(result.get_visit_ratios())
+		self.assertAlmostEqual(ct, result.get_cycle_time())
+		#The subnet of the result includes only the places of the PTPN
+		pids = set(p.get_id() for p in self.ptpn.get_places())
+		self.assertEqual(sorted(p for p in SemiflowAnalyzer(self.pe).to_ids(y, 'P') if p in pids), result.get_subnet()['places'])
+
+	def test_cache(self):
+		P = SemiflowAnalyzer(self.pe).get_p_semiflows()
+		pe = ParamsExtractor()
+		pe.retrieve_net_structure(self.ptpn)
+		self.assertIs(SemiflowAnalyzer(pe).get_p_semiflows(), P)
+
+	def test_max_basis(self):
+		with self.assertRaises(Exception):
+			SemiflowAnalyzer(self.pe, max_basis=2).get_t_semiflows()
+
+
+if __name__ == '__main__':
+	unittest.main()
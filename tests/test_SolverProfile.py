@@ -0,0 +1,82 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.solver.SolverProfile module:
+- the bounds do not depend on the solver profile
+- the auto profile explores the candidate methods and then chooses the fastest one
+- history of the solution times saved at the end of the run, corrupt history files
+"""
+
+import unittest
+import os
+import io
+import tempfile
+import contextlib
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.solver.SolverProfile import SolverProfile
+from src.solver.SolverHistory import SolverHistory
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestSolverProfile(unittest.TestCase):
+
+	def setUp(self):
+		self.tmp = tempfile.TemporaryDirectory()
+		self.history = SolverHistory(os.path.join(self.tmp.name, "history.json"))
+
+	def tearDown(self):
+		self.tmp.cleanup()
+
+	def solve(self, profile):
+		ptpn = PTPN(net)
+		ptpn.import_pnml(os.getcwd() + path + net + '.pnml')
+		lpgen = CPLEX_LPsolver('T9','T9','max',None,profile)
+		lpgen.populate_lp(ptpn)
+		return ptpn, lpgen.solve_lp(ptpn)
+
+	def test_presets(self):
+		ptpn, result = self.solve(SolverProfile.preset('default'))
+		subnet = ptpn.get_critical_subnet()
+		for name in ['dual', 'barrier_nocrossover', 'quiet']:
+			other_ptpn, other = self.solve(SolverProfile.preset(name))
+			self.assertAlmostEqual(other.get_throughput(), result.get_throughput(), places=6)
+			self.assertAlmostEqual(other.get_cycle_time(), result.get_cycle_time(), places=6)
+			self.assertEqual({p.get_id() for p in subnet['places']}, {p.get_id() for p in other_ptpn.get_critical_subnet()['places']})
+
+	def test_auto(self):
+		profile = SolverProfile.preset('auto', history=self.history)
+		tried = [profile.choose(100, 100, 500)[0]]
+		for m in SolverProfile.AUTO_SMALL:
+			profile.record(100, 100, 500, tried[-1], 1.0 if tried[-1] != 'primal' else 0.1)
+			tried.append(profile.choose(100, 100, 500)[0])
+		self.assertEqual(tried[:-1], SolverProfile.AUTO_SMALL)
+		self.assertEqual(tried[-1], 'primal')
+		#The history is saved at the end of the run (or every SAVE_EVERY records)
+		self.assertFalse(os.path.isfile(self.history.get_filename()))
+		profile.save_history()
+		reloaded = SolverHistory(self.history.get_filename())
+		self.assertEqual(len(reloaded.get_records(reloaded.bucket(100, 100, 500))), 3)
+		for i in range(SolverHistory.SAVE_EVERY):
+			reloaded.record("b", "primal", 1.0)
+		self.assertEqual(SolverHistory(self.history.get_filename()).get_records("b"), dict({'primal': [SolverHistory.SAVE_EVERY, 1.0]}))
+
+	def test_corrupt_history(self):
+		with open(self.history.get_filename(), "w") as f:
+			f.write("{")
+		history = SolverHistory(self.history.get_filename())
+		self.assertIn("cannot be read", history.get_error())
+		self.assertEqual(history.get_records(history.bucket(100, 100, 500)), dict())
+		#Reported by the verbose log of the solver only
+		for verbose in [False, True]:
+			out = io.StringIO()
+			with contextlib.redirect_stdout(out):
+				CPLEX_LPsolver('T9', 'T9', 'max', None, SolverProfile.preset('auto', history=history), verbose)
+			self.assertEqual(history.get_error() in out.getvalue(), verbose)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,77 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.solver.StructuralCheck module:
+- live net: no transitions with zero throughput, the LPs are solved
+- siphon empty at m0: dead transitions, the LPs are skipped by the solver (with diagnostics)
+- zero throughputs of the sign propagation on C x = 0 vs. the LP max X bounds
+"""
+
+import unittest
+import os
+from src.net.PTPN import PTPN
+from src.solver.ParamsExtractor import ParamsExtractor
+from src.solver.StructuralCheck import StructuralCheck
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+
+path = "/examples/"
+net = "example1_distrib"
+
+
+class TestStructuralCheck(unittest.TestCase):
+
+	def load(self, name):
+		ptpn = PTPN(name)
+		ptpn.import_pnml(os.getcwd() + path + name + '.pnml')
+		pe = ParamsExtractor()
+		pe.retrieve_net_structure(ptpn)
+		return ptpn, pe
+
+	def test_live(self):
+		ptpn, pe = self.load(net)
+		check = StructuralCheck(pe)
+		self.assertEqual(check.get_zero_transitions(), dict())
+		self.assertEqual(check.get_siphon(), [])
+		self.assertEqual(check.get_ecs_weights(), [])
+		lpgen = CPLEX_LPsolver('T9', 'T9', 'max')
+		lpgen.populate_lp(ptpn)
+		result = lpgen.solve_lp(ptpn)
+		self.assertTrue(result.is_live())
+		self.assertEqual(result.get_diagnostics(), [])
+
+	def test_empty_siphon(self):
+		ptpn, _ = self.load(net)
+		for p in ptpn.get_places():
+			p.set_initial_marking(0)
+		pe = ParamsExtractor()
+		pe.retrieve_net_structure(ptpn)
+		check = StructuralCheck(pe)
+		self.assertEqual(len(check.get_siphon()), len(pe.get_pid_to_dokid()))
+		self.assertTrue(check.is_zero('T9'))
+		self.assertIn('T9', check.get_unreachable())
+		lpgen = CPLEX_LPsolver('T9', 'T9', 'max')
+		lpgen.populate_lp(ptpn)
+		result = lpgen.solve_lp(ptpn)
+		#The LPs have been skipped
+		self.assertEqual(lpgen.get_LpmaxX().variables.get_num(), 0)
+		self.assertFalse(result.is_live())
+		self.assertEqual(result.get_throughput(), 0.0)
+		self.assertIn("not reachable", result.get_diagnostics()[0])
+		self.assertTrue(result.get_diagnostics()[1].startswith("Siphon empty at m0"))
+		t9 = [t for t in ptpn.get_transitions() if t.get_id() == 'T9'][0]
+		self.assertEqual(t9.get_bounds()['Throughput'][1], 0.0)
+
+	def test_flow_propagation(self):
+		ptpn, pe = self.load("assessmentdata")
+		zero = StructuralCheck(pe).get_zero_transitions()
+		self.assertTrue(zero)
+		for tr in ptpn.get_transitions():
+			if tr.get_id() in zero:
+				lpgen = CPLEX_LPsolver(tr.get_name(), tr.get_id(), 'max', precheck=False)
+				lpgen.populate_lp(ptpn)
+				self.assertAlmostEqual(lpgen.solve_lp(ptpn).get_throughput(), 0.0)
+
+
+if __name__ == '__main__':
+	unittest.main()
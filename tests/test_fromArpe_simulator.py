@@ -0,0 +1,363 @@
+"""
+It tests the fromArpe.PTPN simulator (ProbabilisticTimePetriNet):
+- next-event engine (play_events) vs. time-stepped engine (play): counts and averages
+- float clock of play_events with a timedelta initial time
+- incremental enabling: missing-token counters, indexed set of the firable transitions, seeded
+  traces of play and play_events (the ones of the engines which filtered all the transitions)
+- online statistics: Welford mean/variance, durations, quantiles from the fixed histogram
+- batch replications (play_batch): firings of a deterministic net, resampling of the firing
+  time of a transition disabled and enabled again by its own firing
+- replications on a process pool (play_replications): repeatability, early stop at a precision
+"""
+
+import unittest
+import sys
+import io
+import types
+import contextlib
+import random
+import statistics
+import numpy
+from datetime import timedelta
+
+try:
+	import dijkstar
+except ImportError:
+	#dijkstar is only used by find_most_probable_pathway
+	sys.modules['dijkstar'] = types.ModuleType('dijkstar')
+from fromArpe.PTPN import ProbabilisticTimePetriNet, IndexedSet, OnlineStatistic
+
+
+def ring(initial_time=0, unit_time_increment=1, delays=(3, 2)):
+	#Ring p0 -> t1 -> p1 -> t2 -> p2 -> t3 (immediate) -> p0 with two tokens and deterministic delays
+	ptpn = ProbabilisticTimePetriNet("ring", initial_time, unit_time_increment)
+	p0 = ptpn.add_place("p0", 2)
+	p1 = ptpn.add_place("p1", 0)
+	p2 = ptpn.add_place("p2", 0)
+	end = ptpn.add_place("end", 0)
+	t1 = ptpn.add_transition("t1", delays[0], "time")
+	t2 = ptpn.add_transition("t2", delays[1], "time")
+	t3 = ptpn.add_transition("t3", None)
+	ptpn.add_edge(p0, t1, 1)
+	ptpn.add_distribution(t1, [{p1: 1}], [1.0])
+	ptpn.add_edge(p1, t2, 1)
+	ptpn.add_distribution(t2, [{p2: 1}], [1.0])
+	ptpn.add_edge(p2, t3, 1)
+	ptpn.add_distribution(t3, [{p0: 1}], [1.0])
+	return ptpn, end
+
+
+def conflict():
+	#Ring with a probabilistic routing and two immediate transitions in conflict on p2
+	ptpn = ProbabilisticTimePetriNet("conflict")
+	p0 = ptpn.add_place("p0", 2)
+	p1 = ptpn.add_place("p1", 0)
+	p2 = ptpn.add_place("p2", 0)
+	end = ptpn.add_place("end", 0)
+	t1 = ptpn.add_transition("t1", 3, "time")
+	t2 = ptpn.add_transition("t2", 2, "time")
+	t3 = ptpn.add_transition("t3", None)
+	t4 = ptpn.add_transition("t4", None)
+	ptpn.add_edge(p0, t1, 1)
+	ptpn.add_distribution(t1, [{p1: 1}], [1.0])
+	ptpn.add_edge(p1, t2, 1)
+	ptpn.add_distribution(t2, [{p2: 1}, {p0: 1}], [0.5, 0.5])
+	ptpn.add_edge(p2, t3, 1)
+	ptpn.add_distribution(t3, [{p0: 1}], [1.0])
+	ptpn.add_edge(p2, t4, 1)
+	ptpn.add_distribution(t4, [{p1: 1}], [1.0])
+	return ptpn, end
+
+
+def stochastic_ring():
+	#Ring p0 -> t1 (exponential) -> p1 -> t2 (lognormal) -> p0 with two tokens
+	ptpn = ProbabilisticTimePetriNet("stochastic_ring")
+	p0 = ptpn.add_place("p0", 2)
+	p1 = ptpn.add_place("p1", 0)
+	t1 = ptpn.add_transition("t1", dict({"lambda": 0.01}), "exponential")
+	t2 = ptpn.add_transition("t2", dict({"mu": 3, "sigma": 0.5}), "lognormal")
+	ptpn.add_edge(p0, t1, 1)
+	ptpn.add_distribution(t1, [{p1: 1}], [1.0])
+	ptpn.add_edge(p1, t2, 1)
+	ptpn.add_distribution(t2, [{p0: 1}], [1.0])
+	return ptpn
+
+
+def loop(rate=1.0):
+	#Self-loop p -> t (exponential) -> p with one token
+	ptpn = ProbabilisticTimePetriNet("loop")
+	p = ptpn.add_place("p", 1)
+	t = ptpn.add_transition("t", dict({"lambda": rate}), "exponential")
+	ptpn.add_edge(p, t, 1)
+	ptpn.add_distribution(t, [{p: 1}], [1.0])
+	return ptpn, t
+
+
+def play(ptpn, method, *args, **kwargs):
+	#Output of a play (stdout)
+	out = io.StringIO()
+	with contextlib.redirect_stdout(out):
+		getattr(ptpn, method)(*args, **kwargs)
+	return out.getvalue()
+
+
+def trace(output):
+	#Times and firings of a play output (play: "@time" and fired transitions, play_events: "@time:transition")
+	lines = [line for line in output.splitlines() if line.startswith(("Fire", "Time ="))]
+	return " ".join(line.replace("Time = ", "@").replace(" fire ", ":").replace("Fire ", "") for line in lines)
+
+
+def analysis(output):
+	#Analysis of a play output: dict {(place/transition, label): value}
+	result = dict()
+	name = None
+	for line in output[output.index("Global analysis:"):].splitlines():
+		if line.startswith("Total time:"):
+			result[(None, "Total time")] = line.split(": ")[1]
+		elif line.startswith("\t"):
+			label, value = line.strip().split(": ")
+			result[(name, label)] = value
+		elif line and not line.startswith(("-", "=", "Places", "Transitions")):
+			name = line
+	return result
+
+
+class TestSimulator(unittest.TestCase):
+
+	def assertSameAnalysis(self, expected, result):
+		self.assertEqual(expected.keys(), result.keys())
+		for key in expected:
+			if expected[key] == "None":
+				self.assertEqual(result[key], "None", key)
+			else:
+				self.assertAlmostEqual(float(expected[key]), float(result[key]), places=9, msg=key)
+
+	def test_play_events(self):
+		#play processes the times up to max_time (ends at max_time + 1), play_events the fire times
+		#up to max_time: no firing at 52 (the ring fires at 5k and 5k+3)
+		ptpn, end = ring()
+		expected = analysis(play(ptpn, "play", 51, dict({end: 1})))
+		result = analysis(play(ptpn, "play_events", 52, dict({end: 1})))
+		self.assertEqual(expected[("t1", "Service sum")], "20")
+		self.assertEqual(expected[("p0", "Queue length average (by time unit)")], "1.2307692307692308")
+		self.assertSameAnalysis(expected, result)
+
+	def test_time_weighted_queue(self):
+		#Queue length average of play: integral of the marking over the elapsed time
+		ptpn, end = ring()
+		result = analysis(play(ptpn, "play", 9, dict({end: 1})))
+		#p0: 2 tokens in [0,3), 2 tokens in [5,8), 0 otherwise; p1: 2 tokens in [3,5) and [8,10)
+		self.assertAlmostEqual(float(result[("p0", "Queue length average (by time unit)")]), 12/10)
+		self.assertAlmostEqual(float(result[("p1", "Queue length average (by time unit)")]), 8/10)
+		self.assertAlmostEqual(float(result[("t1", "Enabled time")]), 6)
+
+	def test_float_clock(self):
+		#Timedelta initial time and durations: play_events runs on a float clock (seconds)
+		ptpn, end = ring(timedelta(0), timedelta(minutes=1), (timedelta(minutes=3), timedelta(minutes=2)))
+		output = play(ptpn, "play_events", timedelta(minutes=52), dict({end: 1}))
+		self.assertIn("Final time: 3120.0", output)
+		result = analysis(output)
+		minutes, end = ring()
+		expected = analysis(play(minutes, "play_events", 52, dict({end: 1})))
+		for t in ["t1", "t2", "t3"]:
+			self.assertEqual(result[(t, "Service sum")], expected[(t, "Service sum")])
+			self.assertAlmostEqual(float(result[(t, "Enabled time")]), 60*float(expected[(t, "Enabled time")]))
+		self.assertAlmostEqual(float(result[("t1", "Waiting time average (by fire)")]), 180)
+		self.assertEqual(result[("p0", "Queue length average (by time unit)")], expected[("p0", "Queue length average (by time unit)")])
+
+	def test_reset(self):
+		#The analysis and the marking are reset after a play
+		ptpn, end = ring()
+		play(ptpn, "play_events", 20, dict({end: 1}))
+		self.assertEqual([p.marking for p in ptpn.places], [2, 0, 0, 0])
+		self.assertEqual(ptpn.transitions[0].analysis["fire_sum"], 0)
+
+
+class TestEnabling(unittest.TestCase):
+
+	def test_indexed_set(self):
+		items = IndexedSet(["a", "b", "c"])
+		items.add("a")
+		self.assertEqual(len(items), 3)
+		#Swap-remove: the last item takes the position of the removed one
+		items.discard("a")
+		self.assertEqual(items.items, ["c", "b"])
+		self.assertEqual(items.index, dict({"c": 0, "b": 1}))
+		items.discard("a")
+		items.discard("b")
+		self.assertEqual(list(items), ["c"])
+		self.assertNotIn("b", items)
+		items.add("b")
+		self.assertEqual(items.index["b"], 1)
+		random.seed(0)
+		self.assertIn(items.choice(), ["b", "c"])
+		self.assertEqual(IndexedSet(["x"]).choice(key=str), "x")
+
+	def test_missing(self):
+		#Arc weights 2 and 1: the counter changes when a marking crosses the weight
+		ptpn = ProbabilisticTimePetriNet("weights")
+		p = ptpn.add_place("p", 1)
+		q = ptpn.add_place("q", 0)
+		t = ptpn.add_transition("t", 4, "time")
+		ptpn.add_edge(p, t, 2)
+		ptpn.add_edge(q, t, 1)
+		ptpn.reset()
+		self.assertEqual(t.missing, 2)
+		self.assertEqual(p.add_token(3, 0), [])
+		self.assertEqual(t.missing, 1)
+		self.assertEqual(q.add_token(1, 0), [t])
+		self.assertTrue(t.is_enabled())
+		self.assertEqual(t.fire_time, 4)
+		self.assertEqual(p.remove_token(1, 1), [])
+		self.assertEqual(p.remove_token(2, 1), [t])
+		self.assertEqual(t.missing, 1)
+		self.assertIsNone(t.fire_time)
+
+	def test_disable_enable(self):
+		#The firing of a self-loop disables then enables again the transition: new fire time
+		ptpn = ProbabilisticTimePetriNet("loop")
+		p = ptpn.add_place("p", 1)
+		t = ptpn.add_transition("t", 3, "time")
+		ptpn.add_edge(p, t, 1)
+		ptpn.add_distribution(t, [{p: 1}], [1.0])
+		ptpn.reset()
+		self.assertNotIn(t, ptpn.firable)
+		ptpn.advance_time(3)
+		self.assertIn(t, ptpn.firable)
+		self.assertEqual(t.fire(3), [t, t])
+		self.assertEqual(t.missing, 0)
+		self.assertEqual(t.fire_time, 6)
+		ptpn.update_firable([t])
+		self.assertNotIn(t, ptpn.firable)
+		self.assertEqual(ptpn.next_fire_time(), 6)
+
+	def test_traces(self):
+		#Seeded traces of the engines which filtered all the transitions at each firing
+		expected = dict({
+			"play": "@0 @1 @2 @3 t1 t1 @4 @5 t2 t3 t2 @6 @7 @8 t1 t1 @9 @10 t2 t2 t3 @11 @12 @13 t1 t1 @14 @15 t2 t2 t4 "
+				"@16 @17 t2 t4 @18 t1 @19 t2 t2 @20",
+			"play_events": "@3.0:t1 @3.0:t1 @5.0:t2 @5.0:t4 @5.0:t2 @5.0:t2 @5.0:t4 @7.0:t2 @8.0:t1 @8.0:t1 @10.0:t2 "
+				"@10.0:t2 @10.0:t4 @12.0:t2 @12.0:t4 @13.0:t1 @14.0:t2 @14.0:t2 @14.0:t3 @17.0:t1 @17.0:t1 @19.0:t2 "
+				"@19.0:t3 @19.0:t2"
+		})
+		for method, kwargs in [("play", dict()), ("play_events", dict({"verbose": True}))]:
+			random.seed(4)
+			ptpn, end = conflict()
+			self.assertEqual(trace(play(ptpn, method, 20, dict({end: 1}), **kwargs)), expected[method])
+
+
+class TestOnlineStatistic(unittest.TestCase):
+
+	values = [2, 4, 4, 4, 5, 5, 7, 9, 1.5]
+
+	def statistic(self, values, bins=None):
+		statistic = OnlineStatistic(bins)
+		for value in values:
+			statistic.add(value)
+		return statistic
+
+	def test_mean_variance(self):
+		statistic = self.statistic(self.values)
+		self.assertEqual(statistic.count, len(self.values))
+		self.assertAlmostEqual(statistic.get_mean(), statistics.mean(self.values))
+		self.assertAlmostEqual(statistic.get_variance(), statistics.variance(self.values))
+		self.assertAlmostEqual(statistic.get_std(), statistics.stdev(self.values))
+		self.assertEqual((statistic.minimum, statistic.maximum), (1.5, 9))
+		self.assertIsNone(OnlineStatistic().get_mean())
+		self.assertIsNone(self.statistic([3]).get_variance())
+		self.assertIsNone(statistic.quantile(0.5))
+
+	def test_durations(self):
+		statistic = self.statistic([timedelta(seconds=v) for v in self.values])
+		self.assertIsInstance(statistic.get_mean(), timedelta)
+		self.assertAlmostEqual(statistic.get_mean().total_seconds(), statistics.mean(self.values), places=6)
+		self.assertAlmostEqual(statistic.get_variance(), statistics.variance(self.values))
+		self.assertAlmostEqual(statistic.get_std().total_seconds(), statistics.stdev(self.values), places=6)
+
+	def test_quantile(self):
+		#One value by bin: interpolation inside the bin of the value
+		values = list(range(101))
+		statistic = self.statistic(values, [i + 0.5 for i in range(100)])
+		self.assertEqual(statistic.quantile(0), 0)
+		self.assertEqual(statistic.quantile(1), 100)
+		self.assertAlmostEqual(statistic.quantile(0.5), numpy.quantile(values, 0.5))
+		for q in [0.1, 0.25, 0.75, 0.95]:
+			self.assertAlmostEqual(statistic.quantile(q), numpy.quantile(values, q), delta=1)
+		#Outer bins bounded by the minimum and the maximum
+		values = [1, 2, 3, 25, 30]
+		statistic = self.statistic(values, [10, 20])
+		self.assertEqual(statistic.histogram, [3, 0, 2])
+		self.assertEqual(statistic.quantile(0), 1)
+		self.assertEqual(statistic.quantile(1), 30)
+		self.assertAlmostEqual(statistic.quantile(0.2), 1 + 9*(1/3))
+		self.assertAlmostEqual(statistic.quantile(0.9), 20 + 10*(1.5/2))
+		self.assertAlmostEqual(statistic.quantile(0.9), numpy.quantile(values, 0.9), delta=1)
+		#Durations (and bins) as timedelta
+		statistic = self.statistic([timedelta(seconds=v) for v in values], [timedelta(seconds=10), timedelta(seconds=20)])
+		self.assertEqual(statistic.quantile(1), timedelta(seconds=30))
+		self.assertAlmostEqual(statistic.quantile(0.9).total_seconds(), 27.5)
+
+
+class TestBatch(unittest.TestCase):
+
+	def test_deterministic(self):
+		#Same firings as play_events in every replication
+		ptpn, end = ring()
+		expected = analysis(play(ptpn, "play_events", 52, dict({end: 1})))
+		result = ptpn.play_batch(3, 52, dict({end: 1}), seed=1)
+		for t in ptpn.transitions:
+			self.assertEqual(list(result[t]["fire_sum"]), [int(expected[(t.name, "Service sum")])]*3)
+			self.assertAlmostEqual(result[t]["throughput"], int(expected[(t.name, "Service sum")])/52)
+
+	def test_self_loop(self):
+		#The firing disables and enables again the transition: a new firing time is sampled each time
+		ptpn, t = loop()
+		self.assertEqual(len(ptpn.play_batch(5, 100, seed=1)[t]["fire_sum"]), 5)
+		result = ptpn.play_batch(200, 100, seed=1)[t]
+		self.assertAlmostEqual(result["throughput"], 1.0, delta=0.05)
+		samples = ptpn.sample_replications(200, 100, rng=numpy.random.default_rng(1))
+		self.assertAlmostEqual(numpy.nanmean(samples["waiting_time"]), 1.0, delta=0.05)
+
+
+class TestReplications(unittest.TestCase):
+
+	def estimates(self, result):
+		#Estimates by place/transition name
+		return dict({(n.name, key): value for kind in ["transitions", "places"] for n, values in result[kind].items()
+			for key, value in values.items()})
+
+	def test_repeatable(self):
+		ptpn = stochastic_ring()
+		sequential = ptpn.play_replications(2000, replications=40, batch_size=10, jobs=1, seed=7)
+		parallel = ptpn.play_replications(2000, replications=40, batch_size=10, jobs=2, seed=7)
+		self.assertEqual(sequential["replications"], 40)
+		self.assertEqual(self.estimates(sequential), self.estimates(parallel))
+		other = ptpn.play_replications(2000, replications=40, batch_size=10, jobs=1, seed=8)
+		self.assertNotEqual(self.estimates(sequential), self.estimates(other))
+
+	def test_precision(self):
+		ptpn = stochastic_ring()
+		result = ptpn.play_replications(2000, replications=400, batch_size=20, jobs=2, seed=7, precision=0.05)
+		self.assertLess(result["replications"], 400)
+		self.assertEqual(result["replications"] % 20, 0)
+		for mean, low, high in self.estimates(result).values():
+			if mean:
+				self.assertLessEqual((high - low)/2, 0.05*mean)
+		#The stop only depends on the seed and the batch size
+		self.assertEqual(ptpn.play_replications(2000, replications=400, batch_size=20, jobs=1, seed=7, precision=0.05), result)
+
+	def test_arguments(self):
+		ptpn = stochastic_ring()
+		with self.assertRaises(Exception):
+			ptpn.play_replications(2000, replications=0)
+		with self.assertRaises(Exception):
+			ptpn.play_replications(2000, replications=10, batch_size=0)
+		#Time function which cannot be pickled: played in the process
+		ptpn.transitions[1].time_function = lambda: 20.0
+		ptpn.transitions[1].time_function_type = "function"
+		result = ptpn.play_replications(2000, replications=4, batch_size=2, seed=7)
+		self.assertEqual(result["transitions"][ptpn.transitions[1]]["waiting_time"][0], 20.0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,66 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the src.ptpnbound module (CLI startup):
+- the solver backend (cplex, scipy, numpy) and graphviz are not imported by the CLI module,
+  by --help and by a failed file-existence check
+- import time of the CLI module within a budget
+- parameter edits of the daemon client (parse_edits)
+"""
+
+import unittest
+import os
+import sys
+import subprocess
+from src.ptpnbound import parse_edits
+
+#Import time budget of the CLI module (seconds)
+IMPORT_BUDGET = 0.3
+
+HEAVY_MODULES = ['cplex', 'scipy', 'numpy', 'graphviz']
+
+#Runs the CLI with the given arguments and prints the heavy modules imported
+RUN_CLI = """
+import sys
+from src.ptpnbound import ptpnbound
+try:
+	ptpnbound(sys.argv[1:])
+except SystemExit:
+	pass
+print(sorted(m for m in {0} if m in sys.modules))
+"""
+
+
+class TestPtpnbound(unittest.TestCase):
+
+	def run_python(self, args):
+		env = dict(os.environ, PYTHONPATH=os.getcwd())
+		return subprocess.run([sys.executable] + args, cwd=os.getcwd(), env=env, capture_output=True, text=True, check=True)
+
+	def heavy_modules(self, *cli_args):
+		out = self.run_python(["-c", RUN_CLI.format(HEAVY_MODULES)] + list(cli_args)).stdout
+		return out.strip().splitlines()[-1]
+
+	def test_lazy_imports(self):
+		self.assertEqual(self.heavy_modules("--help"), "[]")
+		self.assertEqual(self.heavy_modules("bound", "--help"), "[]")
+		self.assertEqual(self.heavy_modules("missing_net", "T1"), "[]")
+
+	def test_import_budget(self):
+		#Cumulative import time (microseconds) reported by -X importtime
+		err = self.run_python(["-X", "importtime", "-c", "import src.ptpnbound"]).stderr
+		cumulative = [int(line.split("|")[1]) for line in err.splitlines() if line.rstrip().endswith("| src.ptpnbound")]
+		self.assertEqual(len(cumulative), 1)
+		self.assertLess(cumulative[0] / 1e6, IMPORT_BUDGET)
+
+	def test_parse_edits(self):
+		edits = parse_edits(["T0.lambda=0.5", "a.T9.k=2"], ["P0=3"], ["arc1=0.25"])
+		self.assertEqual(edits['transitions'], dict({'T0': dict({'lambda': 0.5}), 'a.T9': dict({'k': 2.0})}))
+		self.assertEqual(edits['places'], dict({'P0': 3}))
+		self.assertEqual(edits['arcs'], dict({'arc1': 0.25}))
+		self.assertIsNone(parse_edits([], [], []))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,77 @@
+"""
+@Author: Simona Bernardi
+@Date: 19/10/2026
+
+It tests the ranking of the slowest subnets (CPLEX_LPsolver.rank_slowest_subnets):
+- the LP_CT model is re-solved with cuts excluding the supports already found
+- the candidates with a support already found are branched too (Lawler enumeration)
+- the optimal solution of the LP_CT model is restored from its basis
+"""
+
+import unittest
+import os
+import tempfile
+from src.net.PTPN import PTPN
+from src.solver.CPLEX_LPsolver import CPLEX_LPsolver
+from src.generator.PTPNgenerator import PTPNgenerator
+
+path = "/examples/"
+net = "example1_distrib"
+
+#Net whose subnet {P3, P4} is found only by branching a candidate with a support already ranked
+DUPLICATES = [('place', 'P0', 0), ('place', 'P1', 3), ('place', 'P2', 1), ('place', 'P3', 0), ('place', 'P4', 2),
+	('transition', 'T0', 'constant', dict({'k': 2.0})), ('arc', 'P2', 'T0', 1, None, None), ('arc', 'T0', 'P2', 1, None, None),
+	('transition', 'T1', 'constant', dict({'k': 3.0})), ('arc', 'P3', 'T1', 1, None, None), ('arc', 'P0', 'T1', 1, None, None),
+	('arc', 'P2', 'T1', 1, None, None), ('arc', 'T1', 'P4', 1, None, None)]
+
+
+class TestSubnetRanking(unittest.TestCase):
+
+	def setUp(self):
+		self.ptpn = PTPN(net)
+		self.ptpn.import_pnml(os.getcwd() + path + net + '.pnml')
+		self.lpgen = CPLEX_LPsolver('T9','T9','max')
+		self.lpgen.populate_lp(self.ptpn)
+		self.lpgen.solve_lp(self.ptpn)
+
+	def test_ranking(self):
+		ct = self.lpgen.get_LpminCT().solution.get_objective_value()
+		ranking = self.lpgen.rank_slowest_subnets(self.ptpn, 5)
+		#example1_distrib has two P-semiflows
+		self.assertEqual(len(ranking), 2)
+		self.assertAlmostEqual(ranking[0]['cycle_time'], ct)
+		self.assertGreaterEqual(ranking[0]['cycle_time'], ranking[1]['cycle_time'])
+		self.assertNotEqual(ranking[0]['places'], ranking[1]['places'])
+		#The critical subnet is the first of the ranking
+		self.assertEqual(self.ptpn.get_critical_subnet(), ranking[0])
+		#The LP_CT optimal solution is restored from its basis
+		self.assertAlmostEqual(self.lpgen.get_LpminCT().solution.get_objective_value(), ct)
+		self.assertEqual(self.lpgen.get_LpminCT().solution.progress.get_num_iterations(), 0)
+
+	def test_duplicate_supports(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			filename = os.path.join(tmp, "duplicates.pnml")
+			PTPNgenerator().write_pnml(DUPLICATES, filename)
+			ptpn = PTPN("duplicates")
+			ptpn.import_pnml(filename)
+		lpgen = CPLEX_LPsolver('T0', 'T0', 'max', precheck=False)
+		lpgen.populate_lp(ptpn)
+		lpgen.solve_lp(ptpn)
+		ranking = lpgen.rank_slowest_subnets(ptpn, 10)
+		self.assertEqual(sorted(sorted(p.get_id() for p in s['places']) for s in ranking),
+			[['P0', 'P4'], ['P1'], ['P2', 'P4'], ['P3', 'P4']])
+
+	def test_export_ranking(self):
+		self.lpgen.rank_slowest_subnets(self.ptpn, 2)
+		filename = os.getcwd() + path + net + '_ranking.pnml'
+		self.ptpn.export_pnml(filename)
+		with open(filename) as f:
+			content = f.read()
+		os.remove(filename)
+		self.assertIn('<critical_subnet rank="1"', content)
+		self.assertIn('<critical_subnet rank="2"', content)
+
+
+if __name__ == '__main__':
+
+	unittest.main()